@@ -1,14 +1,20 @@
 # simulator.py
 import random
+import math
 import heapq
-from copy import deepcopy
-from helper_classes import Block, Event, Peer, Transaction
-from helper_functions import extract_network_data, generate_random_p2p_graph, visualize_graph
+import itertools
+import time as _time
+import numpy as np
+from helper_classes import ArrivalTable, Block, BlockStore, Event, FenwickTree, Peer, PeerTable, RandomStreams, Topology, \
+    Transaction
+from helper_classes.Block import BLOCK_HEADER_SIZE
+from helper_functions import generate_random_p2p_graph, visualize_graph
 from dotenv import load_dotenv
 
-# web3 / on-chain helpers
-from web3_client import send_signed_tx, miningwars, miningtoken, w3
-from web3 import Web3
+# on-chain backends: the web3 one connects (and imports web3) on first use only
+from chain_backend import BACKENDS, ChainBackend, EmulatorBackend, Web3Backend, synthetic_address
+from tracing import TraceLog, Tracer
+from analytics import ChainAnalytics
 import os
 
 load_dotenv()
@@ -18,9 +24,66 @@ EVENT_TX_GEN      = "TX_GEN"      # schedule a new transaction creation
 EVENT_TX_RECV     = "TX_RECV"     # a peer receives a transaction
 EVENT_BLOCK_MINED = "BLOCK_MINED" # a peer finishes mining a block
 EVENT_BLOCK_RECV  = "BLOCK_RECV"  # a peer receives a block
+EVENT_MINING_RACE = "MINING_RACE" # someone in the network finds a block (race mode)
+EVENT_INV_FLUSH   = "INV_FLUSH"   # a peer's announcement window closes (inv gossip)
+EVENT_TX_INV      = "TX_INV"      # a peer receives a batch of tx announcements
+EVENT_TX_GETDATA  = "TX_GETDATA"  # a peer is asked for the bodies of announced txs
+EVENT_TX_DATA     = "TX_DATA"     # a peer receives the tx bodies it asked for
+
+# integer type codes used by the compact engine (index into the dispatch table)
+TX_GEN, TX_RECV, BLOCK_MINED, BLOCK_RECV, MINING_RACE, INV_FLUSH, TX_INV, TX_GETDATA, TX_DATA = range(9)
+EVENT_NAMES = (EVENT_TX_GEN, EVENT_TX_RECV, EVENT_BLOCK_MINED, EVENT_BLOCK_RECV, EVENT_MINING_RACE,
+               EVENT_INV_FLUSH, EVENT_TX_INV, EVENT_TX_GETDATA, EVENT_TX_DATA)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+# events that carry the sending peer along with their data
+RELAY_CODES = frozenset((TX_RECV, TX_INV, TX_GETDATA, TX_DATA))
+# sender of a TX_RECV that hands a reorged-out tx back to its block's miner
+# (not gossip: kept out of the tx gossip counters)
+REINSTATED = -1
+
+# event engines:
+#   "legacy"  - helper_classes.Event objects, string dispatch, dict payloads
+#   "compact" - (time, seq, code, peer, data, src) tuples, table dispatch
+# both break time ties by scheduling order (FIFO), so they replay each other exactly
+ENGINES = ("legacy", "compact")
+
+# link delay multiplier for peers that are not fast
+SLOW_FACTOR = 1.5
+
+# block propagation modes:
+#   "flood"    - hop-by-hop BLOCK_RECV to every neighbour on first receipt
+#   "analytic" - one BLOCK_RECV per peer at its precomputed flood arrival time
+PROPAGATION_MODES = ("flood", "analytic")
+
+# mining modes:
+#   "per_peer" - one exponential timer per peer at rate hash_power / D
+#   "race"     - one exponential timer for the whole network at rate total_hash / D,
+#                winner drawn in proportion to hash power (Fenwick tree, O(log N))
+MINING_MODES = ("per_peer", "race")
+
+# transaction gossip modes:
+#   "flood" - every peer pushes each new tx body to all its neighbours
+#   "inv"   - new tx ids are announced once per inv_window in one TX_INV per
+#             link; receivers request (TX_GETDATA) only the bodies they lack
+TX_GOSSIP_MODES = ("flood", "inv")
+# per-run tx gossip counters (see gossip_stats)
+GOSSIP_COUNTERS = ("tx_relay_events", "tx_deliveries", "tx_dup_deliveries", "inv_ids", "inv_dup_ids")
 
 class Simulator:
-    def __init__(self, G, fast_frac=0.8, high_cpu_frac=0.7, Ttx=10.0, I=12.0):
+    def __init__(self, G, fast_frac=0.8, high_cpu_frac=0.7, Ttx=10.0, I=12.0, engine="legacy",
+                 propagation="flood", arrival_cache_rows=128, max_block_size=None,
+                 mempool_max_count=None, mempool_max_bytes=None, max_tx_fee=10,
+                 mining="per_peer", onchain_queue_size=1024, onchain_policy="block",
+                 tx_gossip="flood", inv_window=1.0, tracer=None, analytics=None, chain_backend=None, seed=None):
+        # per-simulator random streams (peers, topology, tx, mining, race): a
+        # seed makes the run reproducible on its own; without one it is drawn
+        # from the global random module
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = RandomStreams(self.seed)
+        # buffered hot-path variates: standard exponential / uniform [0, 1)
+        self._mining_gap = self.rng.exponential("mining")
+        self._race_u = self.rng.uniform("race")
+
         # clock & counters
         self.time = 0.0
         self.tx_counter = 0
@@ -28,38 +91,117 @@ class Simulator:
         self.block_reward = 1
         self.event_queue = []
 
-        # logging for later consumption (FastAPI / debugging)
-        self.logs = []
+        # event engine selection
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+        self.engine = engine
+        self._seq = itertools.count()
+
+        if propagation not in PROPAGATION_MODES:
+            raise ValueError(f"unknown propagation {propagation!r}, expected one of {PROPAGATION_MODES}")
+        self.propagation = propagation
+        if mining not in MINING_MODES:
+            raise ValueError(f"unknown mining mode {mining!r}, expected one of {MINING_MODES}")
+        self.mining = mining
+        if tx_gossip not in TX_GOSSIP_MODES:
+            raise ValueError(f"unknown tx gossip {tx_gossip!r}, expected one of {TX_GOSSIP_MODES}")
+        self.tx_gossip = tx_gossip
+        self.inv_window = inv_window
+        self._bind_handlers()
+
+        # tx gossip counters: heap events spent relaying txs (TX_RECV plus the
+        # inv-mode events), tx bodies delivered and those the receiver already
+        # had, announced ids and those the receiver already had
+        self.tx_relay_events = 0
+        self.tx_deliveries = 0
+        self.tx_dup_deliveries = 0
+        self.inv_ids = 0
+        self.inv_dup_ids = 0
+
+        # throughput counters (accumulated over every run() call)
+        self.events_processed = 0
+        self.run_wall_time = 0.0
+
+        # mining timer bookkeeping: each peer has at most one live BLOCK_MINED
+        # event; superseded ones stay in the heap and are dropped when popped
+        self.mining_pops = 0
+        self.stale_pops = 0
+        self._stale_pending = 0
+        self.peak_queue_size = 0
+
+        # structured trace for later consumption (FastAPI / debugging): by
+        # default the last records of the retarget, season and onchain
+        # categories in a ring buffer; a channel is None when its category is off
+        self.tracer = tracer if tracer is not None else Tracer()
+        self._trace_retarget = self.tracer.channel("retarget")
+        self._trace_season = self.tracer.channel("season")
+        self._trace_onchain = self.tracer.channel("onchain")
+        self._trace_block = self.tracer.channel("block")
+        self._trace_reorg = self.tracer.channel("reorg")
 
         # simulation params (assign early)
         self.Ttx = Ttx
         self.I = I
 
-        # network topology
-        self.adj, self.rho = extract_network_data(G)
-
-        # on-chain toggle and owner creds
-        self.onchain = os.getenv("ONCHAIN")
-        owner_addr_raw = os.getenv("OWNER_ADDR")
-        self.owner_addr = Web3.to_checksum_address(owner_addr_raw) if owner_addr_raw else None
+        # block template limit (bytes, header included; None = unbounded) and tx fee range 1..max_tx_fee
+        self.max_block_size = max_block_size
+        self.max_tx_fee = max_tx_fee
+
+        # network topology: G may be a networkx graph or an already compiled Topology
+        self.topology = G if isinstance(G, Topology) else \
+            Topology.from_networkx(G, rng=self.rng.generator("topology"))
+
+        # on-chain backend: chain_backend is "web3", "emulator", a ChainBackend,
+        # False for none, or None to follow the ONCHAIN env toggle (web3)
+        if chain_backend is None and os.getenv("ONCHAIN"):
+            chain_backend = "web3"
+        elif chain_backend is False:
+            chain_backend = None
+        if chain_backend is not None and not isinstance(chain_backend, ChainBackend) \
+                and chain_backend not in BACKENDS:
+            raise ValueError(f"unknown chain backend {chain_backend!r}, expected one of {BACKENDS}")
+        self.onchain = chain_backend is not None
+        # addresses are checksummed by the chain client when first used
+        self.owner_addr = os.getenv("OWNER_ADDR")
         self.owner_pk = os.getenv("OWNER_PRIVKEY")
 
         # optional auto-register toggle
         self.auto_register_peers = os.getenv("AUTO_REGISTER_PEERS", "true").lower() == "true"
 
-        if self.onchain:
+        if chain_backend == "web3":
             if not self.owner_addr or not self.owner_pk:
                 raise RuntimeError("OWNER_ADDR and OWNER_PRIVKEY must be set in .env for onchain owner ops")
-
-        # create peers
+            # transactions are queued to a background sender so the event loop
+            # never waits on an RPC round trip; statuses land in the trace
+            chain_backend = Web3Backend(log=self._log_onchain, queue_size=onchain_queue_size,
+                                        policy=onchain_policy)
+        elif chain_backend == "emulator":
+            self.owner_addr = self.owner_addr or synthetic_address(-1)
+            chain_backend = EmulatorBackend(self.owner_addr, log=self._log_onchain)
+        self.chain = chain_backend
+
+        # every block is stored once, network-wide; peers only keep a
+        # known-block bitset, arrival times and their tip number
+        self.block_store = BlockStore()
+
+        # create peers: scalar state (balance, hash power, flags, tip, season
+        # score) lives in one table of columns, each Peer is a view of its row
+        traits = self.rng.generator("peers").random((self.topology.n, 2))
+        self.peer_table = PeerTable(self.topology.n, is_fast=traits[:, 0] < fast_frac,
+                                    is_high_cpu=traits[:, 1] < high_cpu_frac)
         self.peers = {}
-        for pid in G.nodes():
-            is_fast     = (random.random() < fast_frac)
-            is_high_cpu = (random.random() < high_cpu_frac)
-            peer = Peer(pid, is_fast=is_fast, is_high_cpu=is_high_cpu)
-            # ensure peer has required attributes in constructor: balance, hash_power, mempool, etc.
-            # e.g., Peer should initialize: balance, hash_power, mempool (dict), block_tree (dict), heights (dict), mined_blocks (list), block_arrival (dict)
-            self.peers[pid] = peer
+        for pid in range(self.topology.n):
+            self.peers[pid] = Peer(pid, mempool_max_count=mempool_max_count, mempool_max_bytes=mempool_max_bytes,
+                                   block_store=self.block_store, table=self.peer_table)
+        # every peer draws its tx timing, receivers and fees from a counter-based
+        # sub-stream of its own (draw counts in the tx_draws column), so its txs
+        # do not depend on the order in which peers act
+        self._tx_u = self.rng.keyed_uniform("tx", self.peer_table.tx_draws)
+        self._txs_sent = [0] * self.topology.n
+        # inv gossip: per peer, (tx, sender) pairs awaiting the next announcement
+        # window, and ids requested but not delivered yet
+        self._inv_queue = [[] for _ in range(self.topology.n)]
+        self._inv_requested = [set() for _ in range(self.topology.n)]
 
         # peer -> account mapping using .env names MINER{pid}_ADDR / MINER{pid}_PRIVKEY
         self.peer_accounts = {}
@@ -67,35 +209,54 @@ class Simulator:
             addr = os.getenv(f"MINER{pid}_ADDR")
             pk = os.getenv(f"MINER{pid}_PRIVKEY")
             if addr and pk:
-                self.peer_accounts[pid] = {"addr": Web3.to_checksum_address(addr), "pk": pk}
-                # Register on-chain immediately (optional)
-                if self.onchain and self.auto_register_peers:
-                    try:
-                        fn = miningwars.functions.registerMiner()
-                        tx = fn.build_transaction({"from": self.peer_accounts[pid]["addr"]})
-                        receipt = send_signed_tx(self.peer_accounts[pid]["addr"], self.peer_accounts[pid]["pk"], tx)
-                        msg = f"On-chain registerMiner for peer {pid} succeeded, status: {receipt.status}"
-                        print(msg)
-                        self.logs.append(msg)
-                    except Exception as e:
-                        err = f"onchain register failed for peer {pid}: {e}"
-                        print(err)
-                        self.logs.append(err)
-
-        # authoritative ledger (after peers exist)
-        self.ledger = {pid: getattr(self.peers[pid], "balance", 0) for pid in self.peers}
-
-        # genesis block for every peer's local view
-        genesis = Block("genesis", None, -1, [])
-        for peer in self.peers.values():
-            peer.block_tree["genesis"] = genesis
-            peer.heights["genesis"] = 0
-            peer.current_tip = "genesis"
+                self.peer_accounts[pid] = {"addr": addr, "pk": pk}
+            elif self.onchain and self.chain.synthetic_accounts:
+                self.peer_accounts[pid] = {"addr": synthetic_address(pid), "pk": None}
+
+        # Register on-chain immediately (optional): one JSON-RPC batch for all
+        # peers; the shared client's nonces keep later submitBlocks behind it
+        if self.onchain and self.auto_register_peers and self.peer_accounts:
+            pids = list(self.peer_accounts)
+            results = self.chain.register_miners([(self.peer_accounts[pid]["addr"], self.peer_accounts[pid]["pk"])
+                                                  for pid in pids])
+            for pid, res in zip(pids, results):
+                if isinstance(res, Exception):
+                    self._log_onchain(f"onchain register failed for peer {pid}: {res}")
+                else:
+                    self._log_onchain(f"On-chain registerMiner for peer {pid} succeeded, status: {res.status}")
+
+        # effective per-directed-edge delays are fixed once peer speeds are known
+        # (on a copy: the caller's topology may be shared with other runs)
+        self.topology = self.topology.with_slow_factor(self.peer_table.is_fast, SLOW_FACTOR)
+        self.arrival_table = None
+        if propagation == "analytic":
+            self.arrival_table = ArrivalTable(self.topology, max_rows=arrival_cache_rows)
+
+        # canonical (longest) chain over the block store, by block number;
+        # confirmed_txs maps tx id -> id of the canonical block that includes it.
+        # each peer drops a block's txs from its mempool when the block arrives
+        self.canonical_index = 0
+        self.confirmed_txs = {}
+        self.reorg_count = 0
+        self.reinstated_txs = 0
+        # running fork / orphan / propagation metrics: True for the defaults,
+        # a ChainAnalytics, or None for none (nothing is reported then)
+        if analytics is True:
+            analytics = ChainAnalytics()
+        self.analytics = analytics or None
+        if self.analytics is not None:
+            self.analytics.start(self.topology.n)
 
         # difficulty & retarget params
-        total_hash = sum(getattr(p, "hash_power", 0) for p in self.peers.values())
+        total_hash = self.peer_table.total_hash_power
         self.D = self.I * total_hash if total_hash > 0 else 1.0
         self.retarget_interval = 10
+        # race mode: cumulative hash power for O(log N) winner selection
+        self.hash_tree = None
+        self._race_gen = 0
+        self._race_pending = False
+        if mining == "race":
+            self.hash_tree = FenwickTree(self.peer_table.hash_power.tolist())
         self.min_adjust = 0.5
         self.max_adjust = 2.0
         self.recent_block_timestamps = []
@@ -103,18 +264,88 @@ class Simulator:
         # season params
         self.season_block_length = int(os.getenv("SEASON_BLOCK_LENGTH", "50"))
         self.season_block_counter = 0
-        self.season_scores = {pid: 0 for pid in self.peers}
 
         # schedule initial events
+        first_tx = self._tx_u.take(np.arange(self.topology.n)).tolist()
         for pid, peer in self.peers.items():
-            t_tx = random.expovariate(1.0 / self.Ttx) if self.Ttx > 0 else float("inf")
-            heapq.heappush(self.event_queue, Event(t_tx, EVENT_TX_GEN, pid))
+            t_tx = -math.log(1.0 - first_tx[pid]) * self.Ttx if self.Ttx > 0 else float("inf")
+            self._schedule(t_tx, TX_GEN, pid)
+
+            if mining == "per_peer":
+                self._restart_mining(peer, 0.0)
+        if mining == "race":
+            self._restart_race(0.0)
+
+
+    def _bind_handlers(self):
+        """Engine and gossip specific bound methods (rebuilt when a checkpoint is restored)."""
+        if self.engine == "compact":
+            self._schedule = self._schedule_compact
+        else:
+            self._schedule = self._schedule_legacy
+        # handlers indexed by event type code
+        self._dispatch_table = (
+            self._handle_tx_gen,
+            self._handle_tx_recv,
+            self._handle_block_mined,
+            self._handle_block_recv,
+            self._handle_mining_race,
+            self._handle_inv_flush,
+            self._handle_tx_inv,
+            self._handle_tx_getdata,
+            self._handle_tx_data,
+        )
+        self._relay_tx = self._relay_inv if self.tx_gossip == "inv" else self._relay_flood
+
+
+    def __getstate__(self):
+        # bound methods are rebuilt on restore and the tie-breaking counter
+        # travels as its next value; a live chain's state lives outside the run
+        if isinstance(self.chain, Web3Backend):
+            raise TypeError("a run submitting to a live chain (web3 backend) cannot be checkpointed")
+        state = self.__dict__.copy()
+        for name in ("_schedule", "_dispatch_table", "_relay_tx"):
+            del state[name]
+        seq = next(self._seq)
+        self._seq = itertools.count(seq)
+        state["_seq"] = seq
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._seq = itertools.count(state["_seq"])
+        self._bind_handlers()
+
 
-            rate = self._miner_rate(peer)
-            if rate > 0:
-                t_blk = random.expovariate(rate)
-                heapq.heappush(self.event_queue,
-                               Event(t_blk, EVENT_BLOCK_MINED, pid, peer.current_tip))
+    def save_checkpoint(self, path, level=1):
+        """Snapshot the whole run to path (see checkpoint.save_checkpoint)."""
+        from checkpoint import save_checkpoint
+        return save_checkpoint(self, path, level=level)
+
+
+    @property
+    def ledger(self):
+        """{peer: balance}: the authoritative ledger, kept in the peer table's balance column."""
+        return self.peer_table.column("balance")
+
+
+    @property
+    def season_scores(self):
+        """{peer: blocks mined this season} (peer table column)."""
+        return self.peer_table.column("season_score")
+
+
+    @property
+    def adj(self):
+        """{peer: [neighbors]} built from the compiled topology (compatibility view)."""
+        return self.topology.adjacency()
+
+
+    @property
+    def rho(self):
+        """{(u, v): base delay} for u < v (compatibility view)."""
+        return self.topology.rho()
 
 
     def peer_id_to_addr(self, pid):
@@ -132,16 +363,169 @@ class Simulator:
         return peer.hash_power / self.D if getattr(peer, "hash_power", 0) > 0 else 0.0
 
 
+    def _restart_mining(self, peer, t):
+        """
+        Supersede the peer's pending mining timer (if any) and draw a fresh one.
+        The old BLOCK_MINED event is not removed from the heap; bumping the
+        generation makes it stale so the handler drops it when it is popped.
+        """
+        if peer.mining_pending:
+            self._stale_pending += 1
+        peer.mining_gen += 1
+        rate = self._miner_rate(peer)
+        if rate > 0:
+            self._schedule(t + self._mining_gap() / rate, BLOCK_MINED, peer.id, peer.mining_gen)
+            peer.mining_pending = True
+        else:
+            peer.mining_pending = False
+
+
+    def _restart_race(self, t):
+        """Race mode: supersede the network-wide mining timer and draw a fresh one."""
+        if self._race_pending:
+            self._stale_pending += 1
+        self._race_gen += 1
+        total = self.hash_tree.total
+        rate = total / self.D if self.D > 0 else total
+        if rate > 0:
+            self._schedule(t + self._mining_gap() / rate, MINING_RACE, -1, self._race_gen)
+            self._race_pending = True
+        else:
+            self._race_pending = False
+
+
+    def _reset_mining_timers(self, t):
+        """Every miner's rate changed (retarget): restart all pending timers."""
+        if self.mining == "race":
+            self._restart_race(t)
+        else:
+            for p in self.peers.values():
+                self._restart_mining(p, t)
+
+
+    def set_hash_power(self, pid, hash_power):
+        """Change a peer's hash power mid-run and reschedule the affected timer."""
+        peer = self.peers[pid]
+        peer.hash_power = hash_power
+        if self.mining == "race":
+            self.hash_tree.set(pid, hash_power)
+            self._restart_race(self.time)
+        else:
+            self._restart_mining(peer, self.time)
+
+
+    def mempool_stats(self):
+        """Per-peer mempool occupancy, evictions and high-water marks, plus totals."""
+        per_peer = {pid: p.mempool.stats() for pid, p in self.peers.items()}
+        return {
+            "peers": per_peer,
+            "evictions": sum(s["evictions"] for s in per_peer.values()),
+            "peak_count": max((s["peak_count"] for s in per_peer.values()), default=0),
+            "peak_bytes": max((s["peak_bytes"] for s in per_peer.values()), default=0),
+        }
+
+
+    def queue_stats(self):
+        """Heap occupancy and how many popped mining events were stale."""
+        size = len(self.event_queue)
+        return {
+            "heap_size": size,
+            "live_heap_size": size - self._stale_pending,
+            "peak_heap_size": max(self.peak_queue_size, size),
+            "mining_pops": self.mining_pops,
+            "stale_pops": self.stale_pops,
+            "stale_ratio": self.stale_pops / self.mining_pops if self.mining_pops else 0.0,
+        }
+
+
+    def _schedule_legacy(self, t, code, pid, data=None, src=None):
+        payload = {"tx": data, "from": src} if code in RELAY_CODES else data
+        heapq.heappush(self.event_queue, Event(t, EVENT_NAMES[code], pid, payload, next(self._seq)))
+
+
+    def _schedule_compact(self, t, code, pid, data=None, src=None):
+        heapq.heappush(self.event_queue, (t, next(self._seq), code, pid, data, src))
+
+
     def run(self, end_time):
         """
         Process events until no events left or time exceeds end_time.
         """
-        while self.event_queue and self.time < end_time:
-            ev = heapq.heappop(self.event_queue)
-            # advance clock
-            self.time = ev.time
-            # dispatch
-            self.dispatch(ev)
+        started = _time.perf_counter()
+        processed = 0
+        peak = self.peak_queue_size
+        queue = self.event_queue
+        pop = heapq.heappop
+        if self.engine == "compact":
+            table = self._dispatch_table
+            while queue and self.time < end_time:
+                if len(queue) > peak:
+                    peak = len(queue)
+                t, _, code, pid, data, src = pop(queue)
+                # advance clock
+                self.time = t
+                table[code](t, pid, data, src)
+                processed += 1
+        else:
+            while queue and self.time < end_time:
+                if len(queue) > peak:
+                    peak = len(queue)
+                ev = pop(queue)
+                # advance clock
+                self.time = ev.time
+                # dispatch
+                self.dispatch(ev)
+                processed += 1
+        self.events_processed += processed
+        self.peak_queue_size = peak
+        self.run_wall_time += _time.perf_counter() - started
+        # results should include every on-chain status of this run
+        if self.onchain:
+            self.chain.flush()
+
+
+    def _log_onchain(self, msg):
+        # may run on the on-chain sender thread
+        if self._trace_onchain:
+            self._trace_onchain(self.time, None, None, {"msg": msg})
+
+
+    @property
+    def logs(self):
+        """
+        Formatted records the trace sink still holds, as a list-like TraceLog:
+        logs.append(line) traces line (category "log"), and assigning a list
+        clears the held records and appends its lines.
+        """
+        return TraceLog(self.tracer, lambda: self.time)
+
+    @logs.setter
+    def logs(self, lines):
+        log = self.logs
+        log.clear()
+        log.extend(lines)
+
+
+    @property
+    def blocks(self):
+        """Read-only {block id: Block} view of every mined block."""
+        return self.block_store
+
+    @property
+    def block_height(self):
+        """Read-only {block id: height} view."""
+        return self.block_store.heights
+
+    @property
+    def canonical_tip(self):
+        return self.block_store.id_of(self.canonical_index)
+
+    @property
+    def events_per_sec(self):
+        """Events handled per wall-clock second across all run() calls."""
+        if self.run_wall_time <= 0:
+            return 0.0
+        return self.events_processed / self.run_wall_time
 
 
     def write_results(self, filename="results.txt"):
@@ -152,126 +536,234 @@ class Simulator:
                     f.write(f"  {blk} @ {t:.2f}\n")
 
 
+    def export_results(self, path, compress=True, chunk_rows=256):
+        """Columnar .npz export of blocks, the arrival matrix and peer summaries (see results_export)."""
+        from results_export import export_results
+        return export_results(self, path, compress=compress, chunk_rows=chunk_rows)
+
+
     def dispatch(self, ev):
-        if ev.type == EVENT_TX_GEN:
-            self._handle_tx_gen(ev)
-        elif ev.type == EVENT_TX_RECV:
-            self._handle_tx_recv(ev)
-        elif ev.type == EVENT_BLOCK_MINED:
-            self._handle_block_mined(ev)
-        elif ev.type == EVENT_BLOCK_RECV:
-            self._handle_block_recv(ev)
-        else:
-            pass
+        """Legacy entry point: unpack an Event and hand it to the typed handler."""
+        code = EVENT_CODES.get(ev.type)
+        if code is None:
+            return
+        data, src = ev.data, None
+        if code in RELAY_CODES and isinstance(ev.data, dict):
+            data, src = ev.data["tx"], ev.data.get("from")
+        self._dispatch_table[code](ev.time, ev.peer, data, src)
 
 
-    def _handle_tx_gen(self, ev):
-        peer = self.peers[ev.peer]
+    def _handle_tx_gen(self, t, pid, data=None, src=None):
+        peer = self.peers[pid]
         # schedule next TX_GEN
-        next_t = ev.time + (random.expovariate(1.0 / self.Ttx) if self.Ttx > 0 else float("inf"))
-        heapq.heappush(self.event_queue, Event(next_t, EVENT_TX_GEN, peer.id))
+        draw = self._tx_u
+        next_t = t + (-math.log(1.0 - draw(pid)) * self.Ttx if self.Ttx > 0 else float("inf"))
+        self._schedule(next_t, TX_GEN, peer.id)
 
         # create transaction if enough balance in ledger (authoritative)
         amount = 1
-        if self.ledger.get(peer.id, 0) < amount:
+        balance = self.peer_table.balance
+        if balance[pid] < amount:
             return
 
-        receiver = random.choice([pid for pid in self.peers if pid != peer.id])
-        tx_id = f"tx{self.tx_counter}"
+        # uniform over the other peers (ids 0..n-1) without building a list
+        receiver = int(draw(pid) * (self.topology.n - 1))
+        if receiver >= peer.id:
+            receiver += 1
+        # ids are per origin ("tx<peer>.<k>"), independent of other peers' activity
+        tx_id = f"tx{pid}.{self._txs_sent[pid]}"
+        self._txs_sent[pid] += 1
         self.tx_counter += 1
 
-        tx = Transaction(tx_id, peer.id, receiver, amount)
+        fee = 1 + int(draw(pid) * self.max_tx_fee)
+        tx = Transaction(tx_id, peer.id, receiver, amount, fee=fee)
+
+        # deduct from ledger (authoritative; peer.balance reads the same column)
+        balance[pid] -= amount
 
-        # deduct from ledger (authoritative) and sync local view
-        self.ledger[peer.id] = self.ledger.get(peer.id, 0) - amount
-        peer.balance = self.ledger[peer.id]
+        # add to origin mempool (the origin broadcasts even if its own pool is full)
+        peer.mempool.add(tx)
+        self._relay_tx(t, peer, tx, None)
 
-        # add to origin mempool
-        peer.mempool[tx.id] = tx
 
-        # forward to neighbors, include 'from' so neighbors don't echo back
-        for nbr in self.adj[peer.id]:
-            base = self.rho[(min(peer.id, nbr), max(peer.id, nbr))]
-            if not peer.is_fast:
-                base *= 1.5
-            recv_t = ev.time + base
-            heapq.heappush(self.event_queue,
-                           Event(recv_t, EVENT_TX_RECV, nbr, {"tx": tx, "from": peer.id}))
+    def _handle_tx_recv(self, t, pid, tx, from_peer=None):
+        if from_peer == REINSTATED:
+            self._accept_tx(t, self.peers[pid], tx, None)
+            return
+        self.tx_relay_events += 1
+        self._deliver_tx(t, pid, tx, from_peer)
 
 
-    def _handle_tx_recv(self, ev):
-        peer = self.peers[ev.peer]
-        # ev.data may be dict with 'tx' and 'from'
-        if isinstance(ev.data, dict):
-            tx = ev.data["tx"]
-            from_peer = ev.data.get("from")
-        else:
-            tx = ev.data
-            from_peer = None
+    def _deliver_tx(self, t, pid, tx, from_peer):
+        self.tx_deliveries += 1
+        if not self._accept_tx(t, self.peers[pid], tx, from_peer):
+            self.tx_dup_deliveries += 1
 
-        # if already have it, ignore
-        if tx.id in peer.mempool:
-            return
 
-        # add to local mempool
-        peer.mempool[tx.id] = tx
+    def _accept_tx(self, t, peer, tx, from_peer):
+        """Add tx to peer's mempool and relay it on. False if peer already had it."""
+        # if already have it (or it is already on the canonical chain), ignore
+        if tx.id in peer.mempool or tx.id in self.confirmed_txs:
+            return False
 
-        # forward to neighbors (avoid sending back to sender)
-        for nbr in self.adj[peer.id]:
+        # add to local mempool; txs evicted on arrival are not relayed
+        if peer.mempool.add(tx):
+            self._relay_tx(t, peer, tx, from_peer)
+        return True
+
+
+    def _relay_flood(self, t, peer, tx, from_peer):
+        # forward to neighbors (avoid sending back to sender), include 'from' so they don't echo back
+        nbrs, delays = self.topology.links(peer.id)
+        for nbr, delay in zip(nbrs, delays):
             if nbr == from_peer:
                 continue
-            base = self.rho[(min(peer.id, nbr), max(peer.id, nbr))]
-            if not peer.is_fast:
-                base *= 1.5
-            recv_t = ev.time + base
-            heapq.heappush(self.event_queue,
-                           Event(recv_t, EVENT_TX_RECV, nbr, {"tx": tx, "from": peer.id}))
-
-
-    def _handle_block_mined(self, ev):
-        peer = self.peers[ev.peer]
-        # ev.data carries the tip the miner started on (we stored it when scheduling)
-        start_tip = ev.data if ev.data is not None else peer.current_tip
-
-        # if the tip changed while the peer was mining, abort this outcome and reschedule
-        if start_tip != peer.current_tip:
-            rate = self._miner_rate(peer)
-            if rate > 0:
-                next_t = ev.time + random.expovariate(rate)
-                heapq.heappush(self.event_queue,
-                               Event(next_t, EVENT_BLOCK_MINED, peer.id, peer.current_tip))
+            self._schedule(t + delay, TX_RECV, nbr, tx, peer.id)
+
+
+    def _relay_inv(self, t, peer, tx, from_peer):
+        # queue the id for the next announcement window (opened by the first one queued)
+        queue = self._inv_queue[peer.id]
+        if not queue:
+            self._schedule(t + self.inv_window, INV_FLUSH, peer.id)
+        queue.append((tx, from_peer))
+
+
+    def _handle_inv_flush(self, t, pid, data=None, src=None):
+        # one announcement per link for everything queued during the window,
+        # leaving out txs the neighbour sent us
+        self.tx_relay_events += 1
+        queue = self._inv_queue[pid]
+        self._inv_queue[pid] = []
+        nbrs, delays = self.topology.links(pid)
+        for nbr, delay in zip(nbrs, delays):
+            txs = [tx for tx, from_peer in queue if from_peer != nbr]
+            if txs:
+                self._schedule(t + delay, TX_INV, nbr, txs, pid)
+
+
+    def _handle_tx_inv(self, t, pid, txs, src=None):
+        # ask the announcer for the txs we neither hold nor already requested
+        self.tx_relay_events += 1
+        mempool, confirmed = self.peers[pid].mempool, self.confirmed_txs
+        requested = self._inv_requested[pid]
+        wanted = []
+        for tx in txs:
+            if tx.id in mempool or tx.id in confirmed or tx.id in requested:
+                continue
+            requested.add(tx.id)
+            wanted.append(tx)
+        self.inv_ids += len(txs)
+        self.inv_dup_ids += len(txs) - len(wanted)
+        if wanted:
+            self._schedule(t + self.topology.link_delay(pid, src), TX_GETDATA, src, wanted, pid)
+
+
+    def _handle_tx_getdata(self, t, pid, txs, src=None):
+        # bodies are served from what was announced, even if since evicted
+        # or confirmed (like a node's relay memory)
+        self.tx_relay_events += 1
+        self._schedule(t + self.topology.link_delay(pid, src), TX_DATA, src, txs, pid)
+
+
+    def _handle_tx_data(self, t, pid, txs, src=None):
+        self.tx_relay_events += 1
+        requested = self._inv_requested[pid]
+        for tx in txs:
+            requested.discard(tx.id)
+            self._deliver_tx(t, pid, tx, src)
+
+
+    def gossip_stats(self):
+        """Heap events spent relaying txs, and how many deliveries and announcements were redundant."""
+        return {
+            "mode": self.tx_gossip,
+            "relay_events": self.tx_relay_events,
+            "relay_events_per_tx": self.tx_relay_events / self.tx_counter if self.tx_counter else 0.0,
+            "deliveries": self.tx_deliveries,
+            "duplicate_deliveries": self.tx_dup_deliveries,
+            "duplicate_ratio": self.tx_dup_deliveries / self.tx_deliveries if self.tx_deliveries else 0.0,
+            "announced_ids": self.inv_ids,
+            "duplicate_announcements": self.inv_dup_ids,
+        }
+
+
+    def _handle_block_mined(self, t, pid, gen, src=None):
+        peer = self.peers[pid]
+        self.mining_pops += 1
+        # a tip change or retarget superseded this timer after it was scheduled
+        if gen != peer.mining_gen:
+            self.stale_pops += 1
+            self._stale_pending -= 1
+            return
+        peer.mining_pending = False
+        self._mine_block(peer, t)
+
+
+    def _handle_mining_race(self, t, pid, gen, src=None):
+        self.mining_pops += 1
+        if gen != self._race_gen:
+            self.stale_pops += 1
+            self._stale_pending -= 1
             return
+        self._race_pending = False
+        # superposition of the per-peer exponential timers: the winner is drawn
+        # in proportion to hash power and mines on whatever tip it holds now
+        tree = self.hash_tree
+        winner = tree.find(self._race_u() * tree.total)
+        self._mine_block(self.peers[winner], t)
 
-        # Successful mine on start_tip (which equals current_tip)
+
+    def _mine_block(self, peer, t):
+        # Successful mine on the current tip (any tip change would have bumped the generation)
         blk_id = f"blk{self.block_counter}"
-        self.block_counter += 1
-        parent = start_tip
-        txns = list(peer.mempool.values())
+        parent = peer.current_tip
+        # block template: best fee rate first up to the size limit, skipping
+        # (and dropping) txs confirmed on a branch this peer has not seen
+        room = None if self.max_block_size is None else self.max_block_size - BLOCK_HEADER_SIZE
+        txns = peer.mempool.template(room, self.confirmed_txs)
 
         block = Block(blk_id, parent, peer.id, txns)
 
-        # update miner's local block tree & heights
-        peer.block_tree[blk_id] = block
-        peer.heights[blk_id] = peer.heights.get(parent, 0) + 1
-        peer.current_tip = blk_id
+        # store the block once; the miner knows it (arrival time t) and builds on it
+        idx = self.block_store.add(block)
+        peer.learn(idx, t)
+        peer.tip = idx
         peer.mined_blocks.append(blk_id)
 
-        # record arrival time for miner (local)
-        peer.block_arrival[blk_id] = ev.time
+        # included txs leave the miner's mempool; other peers drop them on receipt
+        for tx in txns:
+            peer.mempool.discard(tx.id)
 
-        # --- ECONOMY: update global ledger ONCE (authoritative) ---
-        # coinbase to miner
-        self.ledger[peer.id] = self.ledger.get(peer.id, 0) + self.block_reward
+        # broadcast the new block (blocks are immutable, so every peer shares this object)
+        if self.arrival_table is not None:
+            # analytic mode: deliver straight to every peer at its flood arrival time
+            for nbr, recv_t in self.arrival_table.arrivals(peer.id, t):
+                self._schedule(recv_t, BLOCK_RECV, nbr, block)
+        else:
+            nbrs, delays = self.topology.links(peer.id)
+            for nbr, delay in zip(nbrs, delays):
+                self._schedule(t + delay, BLOCK_RECV, nbr, block)
 
-        # transaction payouts (credit receivers)
-        for tx in txns:
-            # send amounts to receivers in ledger
-            self.ledger[tx.receiver] = self.ledger.get(tx.receiver, 0) + tx.amount
+        self._settle_block(idx, t)
 
-        # sync local balances for miner and receivers (so their local view is up-to-date)
-        affected_pids = {peer.id} | {tx.receiver for tx in txns}
-        for pid in affected_pids:
-            self.peers[pid].balance = self.ledger.get(pid, self.peers[pid].balance)
+
+    def _settle_block(self, idx, t):
+        """
+        Network-wide consequences of stored block number idx, mined at t:
+        ledger, canonical chain, season, difficulty and the next mining timer.
+        Reads and writes only global state (not the miner's mempool or tip).
+        """
+        block = self.block_store.blocks[idx]
+        peer = self.peers[block.miner]
+        txns = block.txns
+        self.block_counter += 1
+
+        # --- ECONOMY: coinbase to the miner (authoritative ledger; peer
+        # balances are views of the same column). Receivers are paid when
+        # the block joins the canonical chain (_extend_global_chain).
+        table = self.peer_table
+        table.balance[peer.id] += self.block_reward
 
         # determine a sensible difficulty to report on-chain
         block_difficulty = getattr(peer, "hash_power", 100)
@@ -283,149 +775,186 @@ class Simulator:
         # inside _handle_block_mined, after ledger update -> submitBlock on-chain (if mapped)
         if self.onchain and peer.id in self.peer_accounts:
             acct = self.peer_accounts[peer.id]
-            try:
-                fn = miningwars.functions.submitBlock(int(block_difficulty))
-                tx = fn.build_transaction({"from": acct["addr"]})
-                receipt = send_signed_tx(acct["addr"], acct["pk"], tx)
-                msg = f"submitBlock onchain tx status: {receipt.status} (peer {peer.id})"
-                print(msg)
-                self.logs.append(msg)
-            except Exception as e:
-                err = f"submitBlock onchain failed for peer {peer.id}: {e}"
-                print(err)
-                self.logs.append(err)
-
-        # remove included txs from mempool of all peers (prevents re-inclusion)
-        for tx in txns:
-            for p in self.peers.values():
-                if tx.id in p.mempool:
-                    del p.mempool[tx.id]
+            self.chain.set_time(t)
+            self.chain.submit_block(acct["addr"], acct["pk"], block_difficulty,
+                                    label=f"submitBlock (peer {peer.id})")
 
-        # clear miner's mempool (already removed above, but keep consistent)
-        peer.mempool.clear()
+        if self.analytics is not None:
+            self.analytics.block_mined(idx, t, peer.id)
+        self._extend_global_chain(idx, t)
+        if self._trace_block:
+            self._trace_block(t, peer.id, block.id, {"height": self.block_store.height[idx], "txs": len(txns)})
 
         # season scoring + bookkeeping
-        self.season_scores[peer.id] = self.season_scores.get(peer.id, 0) + 1
+        table.season_score[peer.id] += 1
         self.season_block_counter += 1
 
-        # track timestamp for retarget
-        self.recent_block_timestamps.append(ev.time)
-
-        # broadcast the new block to neighbors (payload is a deepcopy of the block to avoid mutation issues)
-        for nbr in self.adj[peer.id]:
-            base = self.rho[(min(peer.id, nbr), max(peer.id, nbr))]
-            if not peer.is_fast:
-                base *= 1.5
-            recv_t = ev.time + base
-            heapq.heappush(self.event_queue,
-                           Event(recv_t, EVENT_BLOCK_RECV, nbr, deepcopy(block)))
-
-        # retarget difficulty if needed
-        if len(self.recent_block_timestamps) >= self.retarget_interval:
-            t0 = self.recent_block_timestamps[-self.retarget_interval]
-            t1 = self.recent_block_timestamps[-1]
-            # observed average interval between consecutive blocks in the window
-            # (note: retarget based on observed_interval / target I)
-            observed_interval = (t1 - t0) / max(1, (self.retarget_interval - 1))
-            factor = 1.0
-            if observed_interval > 0:
-                factor = observed_interval / self.I
-            factor = max(self.min_adjust, min(self.max_adjust, factor))
-            oldD = self.D
-            self.D = self.D * factor
-            self.recent_block_timestamps = self.recent_block_timestamps[-self.retarget_interval:]
-            self.logs.append(f"Retarget: D {oldD:.3f} -> {self.D:.3f} (factor {factor:.3f})")
+        # track timestamp for retarget, and retarget difficulty if needed
+        self.recent_block_timestamps.append(t)
+        retargeted = self._retarget(t)
 
         # end-of-season check
         if self.season_block_counter >= self.season_block_length:
             self._end_season()
 
-        # schedule next mining attempt (use current tip)
-        rate = self._miner_rate(peer)
-        if rate > 0:
-            next_t = ev.time + random.expovariate(rate)
-            heapq.heappush(self.event_queue,
-                           Event(next_t, EVENT_BLOCK_MINED, peer.id, peer.current_tip))
+        # schedule next mining attempt on the new tip
+        if not retargeted:
+            if self.mining == "race":
+                self._restart_race(t)
+            else:
+                self._restart_mining(peer, t)
 
 
-    def _handle_block_recv(self, ev):
-        peer = self.peers[ev.peer]
-        block = ev.data  # expecting a Block object
-        if block.id in peer.block_tree:
+    def _retarget(self, t):
+        """
+        Rescale D once retarget_interval block timestamps have been collected.
+        The expected block interval is D / total hash power, so D is scaled by
+        I / observed interval: slower blocks than target I lower D, faster
+        ones raise it (within [min_adjust, max_adjust] per retarget).
+        Windows do not overlap: the last timestamp opens the next one, so each
+        interval is corrected for once instead of on every following block.
+        Returns True if D changed (all mining timers were restarted).
+        """
+        if len(self.recent_block_timestamps) < self.retarget_interval:
+            return False
+        t0 = self.recent_block_timestamps[-self.retarget_interval]
+        t1 = self.recent_block_timestamps[-1]
+        # observed average interval between consecutive blocks in the window
+        observed_interval = (t1 - t0) / max(1, (self.retarget_interval - 1))
+        factor = 1.0
+        if observed_interval > 0:
+            factor = self.I / observed_interval
+        factor = max(self.min_adjust, min(self.max_adjust, factor))
+        oldD = self.D
+        self.D = self.D * factor
+        self.recent_block_timestamps = self.recent_block_timestamps[-1:]
+        if self._trace_retarget:
+            self._trace_retarget(t, None, None, {"old": oldD, "new": self.D, "factor": factor})
+        # every peer's rate changed: supersede all pending timers (exponential
+        # draws are memoryless, so restarting them is distributionally exact)
+        self._reset_mining_timers(t)
+        return True
+
+
+    def _handle_block_recv(self, t, pid, block, src=None):
+        peer = self.peers[pid]
+        store = self.block_store
+        # block is expected to be a Block object already in the store
+        idx = store.index[block.id]
+        if not peer.learn(idx, t):
             return
+        if self.analytics is not None:
+            self.analytics.block_seen(t, idx)
 
-        # add block to local tree
-        peer.block_tree[block.id] = block
-        parent = block.parent
-        peer.heights[block.id] = peer.heights.get(parent, 0) + 1
-
-        # record arrival time locally
-        peer.block_arrival[block.id] = ev.time
-
-        # update this peer's local balances from ledger for affected participants
-        # (ledger already updated at mining time)
+        # balances need no update here (peer.balance reads the ledger); the
+        # block's txs leave this peer's mempool, so pools only hold txs the
+        # peer has not seen included (a reorg hands orphaned ones back)
+        mempool = peer.mempool
         for tx in block.txns:
-            # update receiver's local view if this peer is the receiver
-            if tx.receiver == peer.id:
-                peer.balance = self.ledger.get(tx.receiver, peer.balance)
-            # remove included txns from this peer's mempool (if present)
-            if tx.id in peer.mempool:
-                del peer.mempool[tx.id]
+            mempool.discard(tx.id)
 
         # fork resolution: follow longest chain
-        if peer.heights[block.id] > peer.heights.get(peer.current_tip, 0):
-            peer.current_tip = block.id
-            rate = self._miner_rate(peer)
-            if rate > 0:
-                next_t = ev.time + random.expovariate(rate)
-                heapq.heappush(self.event_queue,
-                               Event(next_t, EVENT_BLOCK_MINED, peer.id, peer.current_tip))
+        if store.height[idx] > store.height[peer.tip]:
+            peer.tip = idx
+            # race mode needs no reschedule: the network timer is memoryless
+            # and the winner always mines on its tip at firing time
+            if self.mining == "per_peer":
+                self._restart_mining(peer, t)
+
+        # analytic mode already scheduled this block for every peer
+        if self.arrival_table is not None:
+            return
 
         # forward block to neighbours (avoid immediate echo back to miner)
-        for nbr in self.adj[peer.id]:
+        nbrs, delays = self.topology.links(peer.id)
+        for nbr, delay in zip(nbrs, delays):
             if nbr == block.miner:
                 continue
-            base = self.rho[(min(peer.id, nbr), max(peer.id, nbr))]
-            if not peer.is_fast:
-                base *= 1.5
-            recv_t = ev.time + base
-            heapq.heappush(self.event_queue,
-                           Event(recv_t, EVENT_BLOCK_RECV, nbr, deepcopy(block)))
+            self._schedule(t + delay, BLOCK_RECV, nbr, block)
+
+
+    def _extend_global_chain(self, idx, t):
+        """
+        Move the canonical tip to freshly stored block number idx if it is now
+        the longest chain, paying the receivers of the txs it confirms. On a
+        reorg, txs of the abandoned branch leave the confirmed index and their
+        payouts are reversed; those not re-included on the new branch go back
+        to the orphaned block's miner and are gossiped again from there.
+        """
+        store = self.block_store
+        heights, parents, blocks = store.height, store.parent, store.blocks
+        if heights[idx] <= heights[self.canonical_index]:
+            return
+
+        new_branch, old_branch = [], []
+        a, b = idx, self.canonical_index
+        while heights[a] > heights[b]:
+            new_branch.append(a)
+            a = parents[a]
+        while a != b:
+            new_branch.append(a)
+            old_branch.append(b)
+            a = parents[a]
+            b = parents[b]
+        self.canonical_index = idx
+        if self.analytics is not None:
+            self.analytics.canonical_changed(new_branch, old_branch)
+
+        # a tx pays its receiver while it is confirmed: payouts of the
+        # abandoned branch are taken back, those of the new one made
+        confirmed = self.confirmed_txs
+        dropped = []
+        receivers, amounts = [], []
+        for i in old_branch:
+            blk = blocks[i]
+            for tx in blk.txns:
+                if confirmed.get(tx.id) == blk.id:
+                    del confirmed[tx.id]
+                    dropped.append((tx, blk.miner))
+                    receivers.append(tx.receiver)
+                    amounts.append(-tx.amount)
+        for i in reversed(new_branch):
+            blk = blocks[i]
+            for tx in blk.txns:
+                if confirmed.setdefault(tx.id, blk.id) == blk.id:
+                    receivers.append(tx.receiver)
+                    amounts.append(tx.amount)
+        if receivers:
+            self.peer_table.credit(receivers, amounts)
+
+        reinstated = 0
+        for tx, miner in dropped:
+            if tx.id not in confirmed:
+                reinstated += 1
+                self._schedule(t, TX_RECV, miner, tx, REINSTATED)
+        self.reinstated_txs += reinstated
+        if old_branch:
+            self.reorg_count += 1
+            if self._trace_reorg:
+                self._trace_reorg(t, None, blocks[idx].id, {"depth": len(old_branch), "reinstated": reinstated})
 
 
     def _end_season(self):
-        # compute top-3 winners by season_scores
-        ranked = sorted(self.season_scores.items(), key=lambda kv: kv[1], reverse=True)
-        winners = [pid for pid, _ in ranked[:3]]
+        # compute top-3 winners by season score (ties: lower peer id first)
+        scores = self.peer_table.season_score
+        winners = np.argsort(-scores, kind="stable")[:3].tolist()
         rewards = [3, 2, 1]  # example reward amounts for 1st/2nd/3rd
 
-        # log
-        msg = f"[SEASON END] block_counter={self.block_counter}, winners={ranked[:3]}"
-        print(msg)
-        self.logs.append(msg)
+        if self._trace_season:
+            self._trace_season(self.time, None, None, {"block_counter": self.block_counter,
+                                                       "winners": [(pid, int(scores[pid])) for pid in winners]})
 
-        # credit ledger & sync local views
-        for pid, amt in zip(winners, rewards):
-            self.ledger[pid] = self.ledger.get(pid, 0) + amt
-            self.peers[pid].balance = self.ledger[pid]
+        # credit ledger (peer balances are views of it)
+        self.peer_table.credit(winners, rewards[:len(winners)])
 
         # reset season counters
-        self.season_scores = {pid: 0 for pid in self.peers}
+        scores[:] = 0
         self.season_block_counter = 0
 
         # on-chain: call contract owner to distribute prizes
         if self.onchain:
-            try:
-                fn = miningwars.functions.endSeasonAndDistribute()
-                tx = fn.build_transaction({"from": self.owner_addr})
-                receipt = send_signed_tx(self.owner_addr, self.owner_pk, tx)
-                msg = f"onchain endSeasonAndDistribute status: {receipt.status}"
-                print(msg)
-                self.logs.append(msg)
-            except Exception as e:
-                err = f"onchain endSeason failed: {e}"
-                print(err)
-                self.logs.append(err)
+            self.chain.set_time(self.time)
+            self.chain.end_season(self.owner_addr, self.owner_pk)
 
         # optional: return winners/rewards for external use
         return winners, rewards
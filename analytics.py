@@ -0,0 +1,133 @@
+# analytics.py
+#
+# Fork, orphan and propagation metrics kept up to date while a run goes on,
+# instead of post-processing every peer's arrivals afterwards:
+#
+#   sim = Simulator(G, analytics=True)      # or analytics=ChainAnalytics(...)
+#   sim.run(3600)
+#   sim.analytics.stale_rate, sim.analytics.propagation_quantiles()
+#   sim.analytics.summary()
+#
+# The Simulator reports three things: a block was mined (_settle_block),
+# the canonical chain moved (_extend_global_chain, with the blocks that
+# joined and left it) and a peer saw a block for the first time
+# (_handle_block_recv). Each report is O(1) per block involved, and every
+# query is O(1) except the quantiles, which walk a fixed set of sketch
+# buckets, and the whole-network share vector, which is O(peers).
+import numpy as np
+
+from helper_classes import QuantileSketch
+
+
+class ChainAnalytics:
+    """
+    Running chain metrics of one simulation:
+
+      canonical chain and orphan set (blocks mined but not on it now),
+      stale rate, reorg count and depth histogram, first-arrival
+      propagation delays (t seen - t mined) in a QuantileSketch, and each
+      miner's count of canonical blocks (its share of the coinbase rewards).
+
+    Block numbers are positions in the simulator's block store. sketch
+    parameters are passed on to the propagation QuantileSketch.
+    """
+
+    def __init__(self, **sketch):
+        self.propagation = QuantileSketch(**sketch)
+        self.mined_at = [0.0]          # by block number; genesis is block 0
+        self.orphans = set()
+        self.mined = 0
+        self.canonical_length = 0      # blocks on the canonical chain, genesis excluded
+        self.reorg_count = 0
+        self.reorg_depths = {}         # depth -> number of reorgs
+        self.max_reorg_depth = 0
+        self.miners = [-1]             # by block number (-1 for genesis)
+        self.canonical_blocks = np.zeros(0, dtype=np.int64)
+
+    def start(self, n_peers):
+        """Size the per-miner counts for a network of n_peers."""
+        self.canonical_blocks = np.zeros(n_peers, dtype=np.int64)
+
+    # --- reports from the simulator ---
+    def block_mined(self, idx, t, miner):
+        mined_at = self.mined_at
+        while len(mined_at) <= idx:
+            mined_at.append(0.0)
+            self.miners.append(-1)
+        mined_at[idx] = t
+        self.miners[idx] = miner
+        self.mined += 1
+        # off the canonical chain until canonical_changed says otherwise
+        self.orphans.add(idx)
+
+    def canonical_changed(self, joined, left):
+        """joined / left: block numbers that joined and left the canonical chain."""
+        orphans, miners, counts = self.orphans, self.miners, self.canonical_blocks
+        for i in joined:
+            orphans.discard(i)
+            counts[miners[i]] += 1
+        for i in left:
+            orphans.add(i)
+            counts[miners[i]] -= 1
+        self.canonical_length += len(joined) - len(left)
+        if left:
+            depth = len(left)
+            self.reorg_count += 1
+            self.reorg_depths[depth] = self.reorg_depths.get(depth, 0) + 1
+            if depth > self.max_reorg_depth:
+                self.max_reorg_depth = depth
+
+    def block_seen(self, t, idx):
+        self.propagation.add(t - self.mined_at[idx])
+
+    # --- queries ---
+    @property
+    def orphan_count(self):
+        return len(self.orphans)
+
+    @property
+    def stale_rate(self):
+        """Fraction of mined blocks that are off the canonical chain."""
+        return len(self.orphans) / self.mined if self.mined else 0.0
+
+    def is_canonical(self, idx):
+        return idx == 0 or (idx < len(self.miners) and idx not in self.orphans)
+
+    def reorg_histogram(self):
+        """{depth: number of reorgs}, by depth."""
+        return dict(sorted(self.reorg_depths.items()))
+
+    def propagation_quantiles(self, q=(0.5, 0.9, 0.99)):
+        """{quantile: first-arrival delay in seconds} over every peer a block reached."""
+        return self.propagation.quantiles(q)
+
+    def reward_share(self, pid):
+        """pid's fraction of the canonical chain's blocks (and coinbase rewards)."""
+        return self.canonical_blocks[pid].item() / self.canonical_length if self.canonical_length else 0.0
+
+    def reward_shares(self):
+        """Every peer's reward_share, as an array by peer id."""
+        return self.canonical_blocks / self.canonical_length if self.canonical_length \
+            else np.zeros(len(self.canonical_blocks))
+
+    def merge_propagation(self, other):
+        """Add other's propagation delays (e.g. from another shard of the same run)."""
+        self.propagation.merge(other.propagation)
+
+    def summary(self, q=(0.5, 0.9, 0.99)):
+        shares = self.canonical_blocks
+        top = int(np.argmax(shares)) if shares.size else None
+        return {
+            "mined_blocks": self.mined,
+            "canonical_length": self.canonical_length,
+            "orphan_blocks": len(self.orphans),
+            "stale_rate": self.stale_rate,
+            "reorgs": self.reorg_count,
+            "max_reorg_depth": self.max_reorg_depth,
+            "reorg_depths": self.reorg_histogram(),
+            "propagation_samples": self.propagation.count,
+            "propagation_mean": self.propagation.mean,
+            "propagation_quantiles": self.propagation_quantiles(q),
+            "top_miner": top,
+            "top_miner_share": self.reward_share(top) if top is not None else 0.0,
+        }
@@ -0,0 +1,330 @@
+# bench.py
+#
+# Reproducible performance benchmarks of the simulator's hot paths:
+#
+#   python bench.py run --suite quick --out bench_quick.json
+#   python bench.py compare bench_base.json bench_quick.json --threshold 0.15
+#
+# A suite is a fixed list of cases with fixed seeds:
+#
+#   scenario  one Simulator run along one scaling axis (peer count 10 to
+#             100k, average degree, Ttx, block interval I, run length,
+#             engine); reports wall time, events/sec and peak RSS
+#   micro     generate_random_p2p_graph, extract_network_data and
+#             write_results (best of a few timed calls), and the mean time
+#             of each event handler during a run (timer overhead subtracted)
+#
+# Every case runs in a fresh (spawned) process, so its peak RSS is its own
+# and no case warms caches for the next. Results are written as JSON with
+# the commit, Python / NumPy versions and machine, so runs can be compared
+# across commits; compare exits non-zero when a case got slower (or larger)
+# than the baseline by more than the threshold.
+import argparse
+import fnmatch
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_VERSION = 1
+
+# scenario defaults: race mining on the compact engine, the large-run setup
+SCENARIO_DEFAULTS = {"min_deg": 3, "max_deg": 8, "Ttx": 200.0, "I": 12.0, "end_time": 600.0,
+                     "engine": "compact", "mining": "race", "graph_seed": 1, "seed": 1}
+
+# per-peer Ttx grows with n where needed: flooded tx work is ~ n^2 / Ttx
+QUICK = (
+    {"name": "peers-10", "kind": "scenario", "n": 10, "Ttx": 10.0, "end_time": 3600.0},
+    {"name": "peers-100", "kind": "scenario", "n": 100},
+    {"name": "peers-1000", "kind": "scenario", "n": 1000, "Ttx": 2000.0},
+    {"name": "degree-2-4", "kind": "scenario", "n": 300, "min_deg": 2, "max_deg": 4, "Ttx": 600.0},
+    {"name": "degree-8-16", "kind": "scenario", "n": 300, "min_deg": 8, "max_deg": 16, "Ttx": 600.0},
+    {"name": "ttx-10", "kind": "scenario", "n": 100, "Ttx": 10.0, "end_time": 300.0},
+    {"name": "interval-2", "kind": "scenario", "n": 100, "I": 2.0},
+    {"name": "length-7200", "kind": "scenario", "n": 100, "end_time": 7200.0},
+    {"name": "legacy-per-peer", "kind": "scenario", "n": 100, "engine": "legacy", "mining": "per_peer"},
+    {"name": "generate-graph-1000", "kind": "micro", "target": "generate_random_p2p_graph", "n": 1000},
+    {"name": "extract-network-1000", "kind": "micro", "target": "extract_network_data", "n": 1000},
+    {"name": "write-results-300", "kind": "micro", "target": "write_results", "n": 300},
+    {"name": "handlers-flood", "kind": "micro", "target": "handlers", "n": 300, "Ttx": 300.0,
+     "mining": "per_peer"},
+    {"name": "handlers-inv", "kind": "micro", "target": "handlers", "n": 300, "Ttx": 300.0,
+     "tx_gossip": "inv"},
+)
+FULL = QUICK + (
+    {"name": "peers-10000", "kind": "scenario", "n": 10_000, "Ttx": 50_000.0, "end_time": 300.0},
+    {"name": "peers-100000", "kind": "scenario", "n": 100_000, "Ttx": 1_000_000.0, "end_time": 60.0},
+    {"name": "generate-graph-10000", "kind": "micro", "target": "generate_random_p2p_graph", "n": 10_000},
+)
+SUITES = {"quick": QUICK, "full": FULL}
+
+# figures compare checks, and whether a larger value is better (a scenario's
+# wall time is the inverse of its events/sec, so it is reported, not checked)
+METRICS = {"events_per_sec": True, "peak_rss_mb": False, "us_per_call": False}
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _simulator(case, chain_backend=False, **overrides):
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+
+    params = dict(SCENARIO_DEFAULTS, **case, **overrides)
+    topology = generate_p2p_topology(params["n"], min_deg=params["min_deg"], max_deg=params["max_deg"],
+                                     seed=params["graph_seed"])
+    kwargs = {k: params[k] for k in ("Ttx", "I", "engine", "mining", "seed")}
+    if "tx_gossip" in params:
+        kwargs["tx_gossip"] = params["tx_gossip"]
+    return Simulator(topology, chain_backend=chain_backend, **kwargs), params
+
+
+def _run_scenario(case):
+    started = _time.perf_counter()
+    sim, params = _simulator(case)
+    setup = _time.perf_counter() - started
+    sim.run(params["end_time"])
+    return {"setup_s": setup, "wall_s": sim.run_wall_time, "events": sim.events_processed,
+            "events_per_sec": sim.events_per_sec, "blocks": len(sim.block_store) - 1,
+            "peak_queue": sim.peak_queue_size}
+
+
+def _best_call(fn, repeat=5):
+    """Fastest of repeat calls to fn, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = _time.perf_counter()
+        fn()
+        best = min(best, _time.perf_counter() - started)
+    return best * 1e6
+
+
+def _timed_dispatch(table, calls, spent):
+    perf = _time.perf_counter
+
+    def timed(code, handler):
+        def call(t, pid, data, src):
+            started = perf()
+            handler(t, pid, data, src)
+            spent[code] += perf() - started
+            calls[code] += 1
+        return call
+
+    return tuple(timed(code, handler) for code, handler in enumerate(table))
+
+
+def _timer_overhead(rounds=100_000):
+    """Seconds the timing wrapper adds to one handler call."""
+    calls, spent = [0], [0.0]
+    (noop,) = _timed_dispatch((lambda t, pid, data, src: None,), calls, spent)
+    for _ in range(rounds):
+        noop(0.0, 0, None, None)
+    return spent[0] / rounds
+
+
+def _run_handlers(case):
+    from Simulator import EVENT_NAMES
+
+    sim, params = _simulator(case)
+    calls, spent = [0] * len(EVENT_NAMES), [0.0] * len(EVENT_NAMES)
+    sim._dispatch_table = _timed_dispatch(sim._dispatch_table, calls, spent)
+    overhead = _timer_overhead()
+    sim.run(params["end_time"])
+    handlers = {name: {"calls": calls[code], "us_per_call": max(0.0, spent[code] / calls[code] - overhead) * 1e6}
+                for code, name in enumerate(EVENT_NAMES) if calls[code]}
+    return {"wall_s": sim.run_wall_time, "events": sim.events_processed, "handlers": handlers,
+            "timer_overhead_us": overhead * 1e6}
+
+
+def _run_micro(case):
+    import random
+
+    from helper_functions import extract_network_data, generate_random_p2p_graph
+
+    n = case["n"]
+    target = case["target"]
+    if target == "handlers":
+        return _run_handlers(case)
+    if target == "generate_random_p2p_graph":
+        us = _best_call(lambda: generate_random_p2p_graph(n, n, 3, 8, seed=1))
+    elif target == "extract_network_data":
+        G = generate_random_p2p_graph(n, n, 3, 8, seed=1)
+        random.seed(1)
+        us = _best_call(lambda: extract_network_data(G))
+    elif target == "write_results":
+        sim, params = _simulator(case)
+        sim.run(params["end_time"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.txt")
+            us = _best_call(lambda: sim.write_results(path), repeat=3)
+    else:
+        raise ValueError(f"unknown micro-benchmark target {target!r}")
+    return {"us_per_call": us}
+
+
+def _quiet():
+    # trace records and on-chain logs would land in the benchmark's output
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_case(case):
+    """Run one case (in the current process) and return its result row."""
+    run = _run_scenario if case["kind"] == "scenario" else _run_micro
+    started = _time.perf_counter()
+    row = {"name": case["name"], "kind": case["kind"], "params": case}
+    row.update(run(case))
+    row["total_s"] = _time.perf_counter() - started
+    row["peak_rss_mb"] = _peak_rss_mb()
+    return row
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def environment():
+    import numpy as np
+    return {"commit": _git_commit(), "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def select(suite="quick", only=None):
+    """The cases of suite whose names match any of the glob patterns in only."""
+    cases = SUITES[suite]
+    if only:
+        cases = tuple(c for c in cases if any(fnmatch.fnmatch(c["name"], pattern) for pattern in only))
+    return cases
+
+
+def _score(row):
+    """Sort key of a result row: smaller is a better (less noisy) run of the case."""
+    if "events_per_sec" in row:
+        return -row["events_per_sec"]
+    if "us_per_call" in row:
+        return row["us_per_call"]
+    return row["wall_s"]
+
+
+def run_suite(cases, out=None, repeat=1, log=print):
+    """
+    Run every case repeat times, one fresh process each, and keep its best
+    run; write {environment, results} to out (JSON) if given.
+    """
+    ctx = mp.get_context("spawn")
+    report = {"version": BENCH_VERSION, "created": _time.time(), "environment": environment(),
+              "repeat": repeat, "results": []}
+    for case in cases:
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_quiet) as pool:
+                runs.append(pool.submit(run_case, case).result())
+        row = min(runs, key=_score)
+        report["results"].append(row)
+        if log:
+            log(_format_row(row))
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    return report
+
+
+def _format_row(row):
+    if row["kind"] == "scenario":
+        return (f"{row['name']:>22}  {row['events']:>10} ev  {row['events_per_sec']:>10.0f} ev/s"
+                f"  {row['wall_s']:>8.2f} s  {row['peak_rss_mb']:>7.1f} MB")
+    if "handlers" in row:
+        parts = "  ".join(f"{name} {h['us_per_call']:.2f}" for name, h in row["handlers"].items())
+        return f"{row['name']:>22}  us/call: {parts}"
+    return f"{row['name']:>22}  {row['us_per_call'] / 1000:>10.2f} ms/call"
+
+
+def _figures(row):
+    """{metric: value} compare checks for one result row (handlers count one by one)."""
+    out = {m: row[m] for m in METRICS if m in row}
+    for name, handler in row.get("handlers", {}).items():
+        out[f"{name}.us_per_call"] = handler["us_per_call"]
+    return out
+
+
+def compare(baseline, current, threshold=0.15):
+    """
+    Rows (name, metric, baseline, current, relative change, regressed) for
+    every case and metric in both reports. A change is relative to the
+    baseline and signed so that positive means worse; a case whose
+    parameters changed is not compared.
+    """
+    base = {row["name"]: row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        old = base.get(row["name"])
+        if old is None or old["params"] != row["params"]:
+            continue
+        old_figures = _figures(old)
+        for metric, value in _figures(row).items():
+            if metric not in old_figures or not old_figures[metric]:
+                continue
+            higher_better = METRICS[metric.rsplit(".", 1)[-1]]
+            change = (value - old_figures[metric]) / old_figures[metric]
+            if higher_better:
+                change = -change
+            rows.append((row["name"], metric, old_figures[metric], value, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulator benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run a suite and write its JSON report")
+    run.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    run.add_argument("--only", nargs="+", help="glob patterns of case names to run")
+    run.add_argument("--out", default=None, help="JSON report path (default bench_<suite>.json)")
+    run.add_argument("--repeat", type=int, default=1, help="runs per case; the best one is kept")
+    run.add_argument("--baseline", default=None, help="compare against this report when done")
+    run.add_argument("--threshold", type=float, default=0.15)
+    cmp = commands.add_parser("compare", help="compare two JSON reports")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        out = args.out or f"bench_{args.suite}.json"
+        current = run_suite(select(args.suite, args.only), out=out, repeat=args.repeat)
+        print(f"wrote {out}")
+        if args.baseline is None:
+            return 0
+        baseline_path = args.baseline
+    else:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        baseline_path = args.baseline
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    regressions = [r for r in rows if r[5]]
+    for name, metric, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:>22}  {metric:<24} {old:>14.4g} -> {new:<14.4g} {change:+8.1%}  {flag}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# chain_backend.py
+#
+# The contract calls Simulator makes in on-chain mode, behind one interface:
+#   Web3Backend     - the deployed contracts over RPC (SubmissionPipeline)
+#   EmulatorBackend - contract_emulator's in-memory MiningWars/MiningToken,
+#                     executed synchronously at simulation speed
+from abc import ABC, abstractmethod
+
+from contract_emulator import EmulatedChain, MiningTokenEmulator, MiningWarsEmulator
+
+BACKENDS = ("web3", "emulator")
+
+
+class ChainBackend(ABC):
+    """
+    Contract calls used by the simulator. Transactions are fire-and-forget
+    from the simulator's point of view: statuses and failures are reported
+    through log(msg). Views return plain values.
+    """
+
+    # peers without a MINER{pid}_ADDR account get a generated one
+    synthetic_accounts = False
+
+    def __init__(self, log=None):
+        self.log = log or print
+
+    @abstractmethod
+    def register_miners(self, accounts):
+        """registerMiner for every (addr, pk); one receipt (with .status) or exception per account."""
+
+    @abstractmethod
+    def submit_block(self, addr, pk, difficulty, label="submitBlock"):
+        """submitBlock(difficulty) from addr."""
+
+    @abstractmethod
+    def end_season(self, addr, pk, label="endSeasonAndDistribute"):
+        """endSeasonAndDistribute from addr (the owner)."""
+
+    @abstractmethod
+    def get_score(self, addr):
+        """Season score of addr."""
+
+    @abstractmethod
+    def balance_of(self, addr):
+        """MiningToken balance of addr."""
+
+    def set_time(self, t):
+        """Simulation clock moved to t seconds (only meaningful for emulated chains)."""
+
+    def flush(self, timeout=None):
+        """Wait (at most timeout seconds, if given) for outstanding transactions."""
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+
+
+class Web3Backend(ChainBackend):
+    """Deployed contracts over RPC; transactions go through a background SubmissionPipeline."""
+
+    def __init__(self, log=None, queue_size=1024, policy="block", receipt_timeout=120.0):
+        super().__init__(log)
+        import web3_client
+        from submission_pipeline import SubmissionPipeline
+        self.web3_client = web3_client
+        self.pipeline = SubmissionPipeline(web3_client.w3, maxsize=queue_size, policy=policy, log=self.log,
+                                           receipt_timeout=receipt_timeout, client=web3_client.client)
+
+    def register_miners(self, accounts):
+        return self.web3_client.register_miners(accounts)
+
+    def submit_block(self, addr, pk, difficulty, label="submitBlock"):
+        self.pipeline.submit(addr, pk, self.web3_client.miningwars.functions.submitBlock(int(difficulty)),
+                             label=label, key=("submitBlock", addr))
+
+    def end_season(self, addr, pk, label="endSeasonAndDistribute"):
+        self.pipeline.submit(addr, pk, self.web3_client.miningwars.functions.endSeasonAndDistribute(),
+                             label=label)
+
+    def get_score(self, addr):
+        from web3 import Web3
+        return self.web3_client.miningwars.functions.getScore(Web3.to_checksum_address(addr)).call()
+
+    def balance_of(self, addr):
+        from web3 import Web3
+        return self.web3_client.miningtoken.functions.balanceOf(Web3.to_checksum_address(addr)).call()
+
+    def _report_pending(self, drained):
+        if not drained:
+            labels = self.pipeline.pending_labels()
+            self.log(f"{len(labels)} onchain transactions still pending: {', '.join(labels)}")
+        return drained
+
+    def flush(self, timeout=None):
+        return self._report_pending(self.pipeline.flush(timeout))
+
+    def close(self, timeout=None):
+        return self._report_pending(self.pipeline.close(timeout))
+
+
+class EmulatorBackend(ChainBackend):
+    """
+    In-memory MiningWars + MiningToken, set up the way the deployment
+    scripts do it (token minted by MiningWars, per-block reward, first
+    season started). Block timestamps follow simulation time, offset by
+    start_timestamp. Only reverts are logged unless log_success is set:
+    a status line per block would dominate long runs.
+    """
+
+    synthetic_accounts = True
+
+    def __init__(self, owner, log=None, per_block_reward=10, season_days=60,
+                 prizes=(1000, 500, 250), start_timestamp=1_700_000_000, log_success=False):
+        super().__init__(log)
+        self.start_timestamp = start_timestamp
+        self.log_success = log_success
+        self.chain = EmulatedChain(timestamp=start_timestamp)
+        chain = self.chain
+        self.miningwars = chain.deploy(MiningWarsEmulator, owner)
+        self.miningtoken = chain.deploy(MiningTokenEmulator, owner, self.miningwars.address)
+        mw = self.miningwars
+        for method, args in (("setToken", (self.miningtoken.address,)),
+                             ("setPerBlockReward", (per_block_reward,)),
+                             ("setSeasonTime", (season_days,)),
+                             ("startSeason", ()),
+                             ("setSeasonPrizes", tuple(prizes))):
+            receipt = chain.transact(owner, mw, method, *args)
+            if not receipt.status:
+                raise RuntimeError(f"emulated contract setup failed at {method}: {receipt.reason}")
+        self.reverted = 0
+
+    def _transact(self, addr, method, args, label):
+        receipt = self.chain.transact(addr, self.miningwars, method, *args)
+        if not receipt.status:
+            self.reverted += 1
+            self.log(f"{label} onchain tx status: 0 ({receipt.reason or 'reverted'})")
+        elif self.log_success:
+            self.log(f"{label} onchain tx status: 1")
+        return receipt
+
+    def register_miners(self, accounts):
+        return [self.chain.transact(addr, self.miningwars, "registerMiner") for addr, _ in accounts]
+
+    def submit_block(self, addr, pk, difficulty, label="submitBlock"):
+        self._transact(addr, "submitBlock", (int(difficulty),), label)
+
+    def end_season(self, addr, pk, label="endSeasonAndDistribute"):
+        self._transact(addr, "endSeasonAndDistribute", (), label)
+
+    def get_score(self, addr):
+        return self.miningwars.getScore(addr)
+
+    def balance_of(self, addr):
+        return self.miningtoken.balanceOf(addr)
+
+    def set_time(self, t):
+        self.chain.timestamp = self.start_timestamp + int(t)
+
+
+def synthetic_address(pid):
+    """Deterministic stand-in account for peer pid on an emulated chain."""
+    return "0x" + f"{0xA11CE000000 + pid:040x}"
@@ -0,0 +1,289 @@
+# chain_client.py
+import threading
+import time
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TransactionNotFound, Web3TypeError
+
+
+def is_nonce_error(exc):
+    """Node rejected a tx for its nonce ("nonce too low", "invalid transaction nonce", ...)."""
+    return "nonce" in str(exc).lower()
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces per sender from a local counter, asking the
+    node ("pending" count) only the first time a sender is seen and after
+    resync().
+    """
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._next = {}
+        self._lock = threading.Lock()
+        self.resyncs = 0
+
+    def next(self, addr):
+        with self._lock:
+            nonce = self._next.get(addr)
+            if nonce is None:
+                nonce = self.w3.eth.get_transaction_count(addr, "pending")
+            self._next[addr] = nonce + 1
+            return nonce
+
+    def known(self, addr):
+        return addr in self._next
+
+    def seed(self, addr, nonce):
+        """Start addr's counter at nonce (e.g. from a batched transaction count) unless already tracked."""
+        with self._lock:
+            self._next.setdefault(addr, nonce)
+
+    def resync(self, addr):
+        """Forget the local counter for addr; the next call asks the node again."""
+        with self._lock:
+            self._next.pop(addr, None)
+            self.resyncs += 1
+
+
+class ChainClient:
+    """
+    Transaction layer over a Web3 instance that avoids per-tx lookups.
+
+    Chain id and gas price are fetched once, nonces come from a NonceManager,
+    and gas is estimated once per (contract, function selector) and reused
+    with a safety margin. Every transaction is therefore fully specified
+    before build_transaction/signing, so sending costs one RPC call.
+    send_many, receipts and call_many bundle their requests into one JSON-RPC
+    batch when the provider supports it and fall back to one call each
+    otherwise.
+    """
+
+    def __init__(self, w3, gas_margin=1.25, default_gas=300000, gas_price=None):
+        self.w3 = w3
+        self.nonces = NonceManager(w3)
+        self.gas_margin = gas_margin
+        self.default_gas = default_gas
+        self._gas = {}                 # (to, selector) -> gas limit
+        self._chain_id = None
+        self._gas_price = gas_price
+        self._batching = True
+        self.gas_estimates = 0
+        self.batches = 0
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    @property
+    def gas_price(self):
+        if self._gas_price is None:
+            self._gas_price = self.w3.eth.gas_price
+        return self._gas_price
+
+    def refresh_gas_price(self):
+        self._gas_price = None
+        return self.gas_price
+
+    def gas_for(self, tx):
+        """Gas limit for tx, estimated once per (to, function selector)."""
+        data = tx.get("data") or "0x"
+        if not isinstance(data, str):
+            data = Web3.to_hex(data)
+        key = (tx.get("to"), data[:10])
+        gas = self._gas.get(key)
+        if gas is None:
+            probe = {k: v for k, v in tx.items() if k not in ("gas", "nonce")}
+            try:
+                gas = int(self.w3.eth.estimate_gas(probe) * self.gas_margin)
+            except Exception:
+                gas = self.default_gas
+            self.gas_estimates += 1
+            self._gas[key] = gas
+        return gas
+
+    # --- single transactions ---
+    def prepare(self, sender, call):
+        """
+        Fully specified tx dict for call (a contract function or a partial tx
+        dict). Allocates a nonce unless the dict already carries one.
+        """
+        sender = Web3.to_checksum_address(sender)
+        if hasattr(call, "build_transaction"):
+            # gas=0 keeps build_transaction from estimating; filled in below
+            tx = call.build_transaction({"from": sender, "chainId": self.chain_id,
+                                         "gasPrice": self.gas_price, "gas": 0, "nonce": 0})
+            tx.pop("gas")
+            tx.pop("nonce")
+        else:
+            tx = dict(call)
+            tx.setdefault("from", sender)
+            tx.setdefault("chainId", self.chain_id)
+            if "maxFeePerGas" not in tx:
+                tx.setdefault("gasPrice", self.gas_price)
+        if "gas" not in tx:
+            tx["gas"] = self.gas_for(tx)
+        if "nonce" not in tx:
+            tx["nonce"] = self.nonces.next(sender)
+        return tx
+
+    def sign(self, sender, pk, call):
+        try:
+            tx = self.prepare(sender, call)
+            return self.w3.eth.account.sign_transaction(tx, private_key=pk).raw_transaction
+        except Exception:
+            # the allocated nonce was never used
+            self.nonces.resync(Web3.to_checksum_address(sender))
+            raise
+
+    def send(self, sender, pk, call, wait_receipt=True):
+        """Sign and send; on a nonce rejection resync from the node and retry once."""
+        sender = Web3.to_checksum_address(sender)
+        for attempt in (0, 1):
+            raw = self.sign(sender, pk, call)
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(raw)
+                break
+            except Exception as e:
+                self.nonces.resync(sender)
+                if attempt or not is_nonce_error(e) or _has_nonce(call):
+                    raise
+        if wait_receipt:
+            return self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        return tx_hash
+
+    # --- bulk operations ---
+    def send_many(self, jobs, wait_receipt=True, timeout=120):
+        """
+        Sign every (sender, pk, call) job and send them in one batch. Returns
+        one entry per job: its receipt (or tx hash when not waiting), or the
+        exception that job raised.
+        """
+        results = [None] * len(jobs)
+        # first-seen senders: fetch all their nonces in one batch as well
+        fresh = list(dict.fromkeys(Web3.to_checksum_address(sender) for sender, _, _ in jobs
+                                   if not self.nonces.known(Web3.to_checksum_address(sender))))
+        counts = self._batch([lambda a=a: self.w3.eth.get_transaction_count(a, "pending") for a in fresh])
+        for addr, count in zip(fresh, counts):
+            if not isinstance(count, Exception):
+                self.nonces.seed(addr, count)
+        raws = []
+        for k, (sender, pk, call) in enumerate(jobs):
+            try:
+                raws.append((k, self.sign(sender, pk, call)))
+            except Exception as e:
+                results[k] = e
+        sent = self._send_raw_many([raw for _, raw in raws])
+        for (k, _), res in zip(raws, sent):
+            results[k] = res
+            if isinstance(res, Exception):
+                self.nonces.resync(Web3.to_checksum_address(jobs[k][0]))
+        if wait_receipt:
+            hashes = [(k, h) for k, h in enumerate(results) if not isinstance(h, Exception)]
+            receipts = self.wait_receipts([h for _, h in hashes], timeout=timeout)
+            for (k, _), receipt in zip(hashes, receipts):
+                results[k] = receipt
+        return results
+
+    def receipts(self, tx_hashes):
+        """Receipts for tx_hashes in one batch; None where not mined yet, the exception where the lookup failed."""
+        out = self._batch([lambda h=h: self.w3.eth.get_transaction_receipt(h) for h in tx_hashes])
+        return [None if isinstance(r, TransactionNotFound) else r for r in out]
+
+    def wait_receipts(self, tx_hashes, timeout=120, poll_interval=0.1):
+        """Block until every hash has a receipt (TimeoutError in place of those that never do)."""
+        out = [None] * len(tx_hashes)
+        todo = list(range(len(tx_hashes)))
+        deadline = time.monotonic() + timeout
+        if todo:
+            # the last one mined usually means the whole batch is in
+            try:
+                self.w3.eth.wait_for_transaction_receipt(tx_hashes[todo[-1]], timeout=timeout,
+                                                         poll_latency=poll_interval)
+            except Exception:
+                pass
+        while todo:
+            for k, receipt in zip(todo, self.receipts([tx_hashes[k] for k in todo])):
+                out[k] = receipt
+            todo = [k for k in todo if out[k] is None]
+            if todo:
+                if time.monotonic() >= deadline:
+                    for k in todo:
+                        out[k] = TimeoutError(f"no receipt for {Web3.to_hex(tx_hashes[k])}")
+                    break
+                time.sleep(poll_interval)
+        return out
+
+    def call_many(self, calls):
+        """eth_call every contract function in calls in one batch."""
+        return self._batch([lambda fn=fn: fn for fn in calls])
+
+    def _send_raw_many(self, raws):
+        """
+        eth_sendRawTransaction for every raw tx in one batch. Sends are not
+        idempotent, so this uses the provider's raw batch call to get an
+        outcome per request instead of redoing a partly failed batch.
+        """
+        make_batch_request = getattr(self.w3.provider, "make_batch_request", None)
+        if make_batch_request is None:
+            self._batching = False
+        if self._batching and raws:
+            try:
+                responses = make_batch_request(
+                    [("eth_sendRawTransaction", [Web3.to_hex(raw)]) for raw in raws])
+            except NotImplementedError:
+                self._batching = False
+            else:
+                self.batches += 1
+                if not isinstance(responses, list):
+                    # the node rejected the batch as a whole
+                    return [ValueError(responses.get("error", responses))] * len(raws)
+                return [HexBytes(r["result"]) if r.get("result") else ValueError(r.get("error", r))
+                        for r in responses]
+        results = []
+        for raw in raws:
+            try:
+                results.append(self.w3.eth.send_raw_transaction(raw))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _batch(self, requests):
+        """
+        Run read-only request thunks as one JSON-RPC batch (falling back to
+        one call each). Each thunk issues a w3 call or returns a contract
+        function to eth_call. Results come back in order, with exceptions in
+        place.
+        """
+        if not requests:
+            return []
+        if self._batching:
+            try:
+                with self.w3.batch_requests() as batch:
+                    for request in requests:
+                        batch.add(request())
+                    results = batch.execute()
+                self.batches += 1
+                return list(results)
+            except Web3TypeError:
+                # provider cannot batch at all
+                self._batching = False
+            except Exception:
+                # one failing request fails the whole batch: redo them one by one
+                pass
+        results = []
+        for request in requests:
+            try:
+                res = request()
+                results.append(res.call() if hasattr(res, "call") else res)
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def _has_nonce(call):
+    return isinstance(call, dict) and "nonce" in call
@@ -0,0 +1,277 @@
+# chain_indexer.py
+#
+# Tails MiningWars' BlockMined / RewardPaid / SeasonStarted / SeasonEnd logs
+# into a local SQLite file, so leaderboards and histories are SQL queries
+# instead of getAllBlocks() reads that grow with every submission.
+#
+#   indexer = ChainIndexer(web3_client.w3, web3_client.miningwars, "miningwars.sqlite")
+#   indexer.sync()                      # catch up; call again (or follow()) to tail
+#   indexer.leaderboard(season=1)
+import sqlite3
+import time
+
+from web3 import Web3
+
+EVENTS = ("BlockMined", "RewardPaid", "SeasonStarted", "SeasonEnd")
+
+# RewardPaid carries keccak256 of one of these
+REWARD_REASONS = {Web3.keccak(text=r): r for r in ("PER_BLOCK", "FIRST_WINNER", "SECOND_WINNER", "THIRD_WINNER")}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS headers (number INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blocks (
+    id INTEGER, miner TEXT, difficulty INTEGER, season INTEGER,
+    block_number INTEGER, log_index INTEGER, tx_hash TEXT,
+    PRIMARY KEY (block_number, log_index));
+CREATE TABLE IF NOT EXISTS rewards (
+    recipient TEXT, amount INTEGER, reason TEXT, season INTEGER,
+    block_number INTEGER, log_index INTEGER, tx_hash TEXT,
+    PRIMARY KEY (block_number, log_index));
+CREATE TABLE IF NOT EXISTS seasons (
+    season INTEGER PRIMARY KEY, start INTEGER, end INTEGER, per_block_reward INTEGER,
+    block_number INTEGER, log_index INTEGER);
+CREATE TABLE IF NOT EXISTS season_ends (
+    season INTEGER, first TEXT, second TEXT, third TEXT,
+    first_prize INTEGER, second_prize INTEGER, third_prize INTEGER,
+    block_number INTEGER, log_index INTEGER,
+    PRIMARY KEY (block_number, log_index));
+CREATE INDEX IF NOT EXISTS blocks_miner ON blocks (miner, season);
+CREATE INDEX IF NOT EXISTS blocks_season ON blocks (season, miner);
+CREATE INDEX IF NOT EXISTS rewards_recipient ON rewards (recipient, season);
+CREATE INDEX IF NOT EXISTS rewards_season ON rewards (season);
+"""
+
+EVENT_TABLES = ("blocks", "rewards", "seasons", "season_ends")
+
+
+class ReorgTooDeep(RuntimeError):
+    """The chain diverged below the oldest block hash the indexer kept."""
+
+
+class ChainIndexer:
+    """
+    Incremental MiningWars event index.
+
+    sync() fetches the four events for [last indexed block + 1, head -
+    confirmations] with one eth_getLogs per range of batch_blocks blocks
+    (halved when the node refuses a range as too large, grown again after
+    quiet ranges). Each range end's block hash is recorded; the next sync
+    first compares the newest recorded hash with the chain and, on a
+    mismatch, walks back to the newest block both agree on, drops every
+    row above it and re-indexes from there. Hashes are kept for the last
+    reorg_depth blocks.
+
+    BlockMined and RewardPaid have no season field: rows are attributed to
+    the latest SeasonStarted before them. Addresses are stored lowercase.
+    """
+
+    def __init__(self, w3, contract, db_path="miningwars_index.sqlite", start_block=0,
+                 batch_blocks=2000, confirmations=0, reorg_depth=128):
+        self.w3 = w3
+        self.contract = contract
+        self.address = Web3.to_checksum_address(contract.address)
+        self.start_block = start_block
+        self.batch_blocks = self.max_batch_blocks = batch_blocks
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self._events = {}
+        for name in EVENTS:
+            event = getattr(contract.events, name)()
+            self._events[Web3.to_hex(hexstr=event.topic)] = event
+        self.get_logs_calls = 0
+        self.reorgs = 0
+        if self._meta("last_block") is None:
+            self._set_meta("last_block", start_block - 1)
+            self._set_meta("base_season", self._season_before(start_block))
+            self.db.commit()
+
+    # --- bookkeeping ---
+    def _meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _season_before(self, block):
+        """Season in progress when indexing starts mid-chain (0 from genesis)."""
+        if block <= 0:
+            return 0
+        try:
+            return self.contract.functions.currentSeason().call(block_identifier=block - 1)
+        except Exception:
+            return 0
+
+    def _current_season(self):
+        row = self.db.execute("SELECT MAX(season) FROM seasons").fetchone()
+        return row[0] if row[0] is not None else self._meta("base_season")
+
+    @property
+    def last_block(self):
+        return self._meta("last_block")
+
+    # --- syncing ---
+    def sync(self, to_block=None):
+        """Index up to to_block (default: head - confirmations). Returns the number of new events."""
+        self._unwind_reorg()
+        head = self.w3.eth.block_number - self.confirmations
+        to_block = head if to_block is None else min(to_block, head)
+        added = 0
+        start = self.last_block + 1
+        while start <= to_block:
+            end = min(start + self.batch_blocks - 1, to_block)
+            try:
+                logs = self._get_logs(start, end)
+            except Exception as e:
+                if end > start and _range_too_large(e):
+                    self.batch_blocks = max(1, (end - start + 1) // 2)
+                    continue
+                raise
+            end_hash = self.w3.eth.get_block(end)["hash"]
+            with self.db:
+                added += self._store(logs)
+                self.db.execute("INSERT OR REPLACE INTO headers (number, hash) VALUES (?, ?)",
+                                (end, Web3.to_hex(end_hash)))
+                if self.db.execute("DELETE FROM headers WHERE number < ?", (end - self.reorg_depth,)).rowcount:
+                    self._set_meta("pruned", 1)
+                self._set_meta("last_block", end)
+            if not logs:
+                self.batch_blocks = min(self.max_batch_blocks, self.batch_blocks * 2)
+            start = end + 1
+        return added
+
+    def follow(self, poll_interval=2.0, stop=None):
+        """sync() every poll_interval seconds until stop() returns true."""
+        while stop is None or not stop():
+            self.sync()
+            time.sleep(poll_interval)
+
+    def _get_logs(self, start, end):
+        self.get_logs_calls += 1
+        return self.w3.eth.get_logs({"fromBlock": start, "toBlock": end, "address": self.address,
+                                     "topics": [list(self._events)]})
+
+    def _unwind_reorg(self):
+        """Roll back to the newest recorded block whose hash still matches the chain."""
+        headers = self.db.execute("SELECT number, hash FROM headers ORDER BY number DESC").fetchall()
+        if not headers or self._hash_matches(*headers[0]):
+            return
+        self.reorgs += 1
+        fork = None
+        for number, block_hash in headers[1:]:
+            if self._hash_matches(number, block_hash):
+                fork = number
+                break
+        if fork is None:
+            if self._meta("pruned"):
+                raise ReorgTooDeep(f"chain diverged below block {headers[-1][0]}; rebuild the index")
+            fork = self.start_block - 1
+        with self.db:
+            for table in EVENT_TABLES:
+                self.db.execute(f"DELETE FROM {table} WHERE block_number > ?", (fork,))
+            self.db.execute("DELETE FROM headers WHERE number > ?", (fork,))
+            self._set_meta("last_block", fork)
+
+    def _hash_matches(self, number, block_hash):
+        try:
+            block = self.w3.eth.get_block(number)
+        except Exception:
+            # chain is now shorter than our record
+            return False
+        return Web3.to_hex(block["hash"]) == block_hash
+
+    def _store(self, logs):
+        season = self._current_season()
+        count = 0
+        for log in sorted(logs, key=lambda l: (l["blockNumber"], l["logIndex"])):
+            if log.get("removed"):
+                continue
+            event = self._events.get(Web3.to_hex(log["topics"][0]))
+            if event is None:
+                continue
+            args = event.process_log(log)["args"]
+            where = (log["blockNumber"], log["logIndex"])
+            tx_hash = Web3.to_hex(log["transactionHash"])
+            name = event.event_name
+            if name == "BlockMined":
+                self.db.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                (args["id"], args["miner"].lower(), args["difficulty"], season, *where, tx_hash))
+            elif name == "RewardPaid":
+                reason = REWARD_REASONS.get(bytes(args["reason"]), Web3.to_hex(args["reason"]))
+                self.db.execute("INSERT OR REPLACE INTO rewards VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                (args["to"].lower(), args["amount"], reason, season, *where, tx_hash))
+            elif name == "SeasonStarted":
+                season = args["seasonId"]
+                self.db.execute("INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?, ?, ?)",
+                                (season, args["start"], args["end"], args["perblockReward"], *where))
+            else:
+                winners = [w.lower() for w in args["winners"]]
+                self.db.execute("INSERT OR REPLACE INTO season_ends VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (args["seasonId"], *winners, *args["amounts"], *where))
+            count += 1
+        return count
+
+    # --- queries ---
+    def leaderboard(self, season, limit=10):
+        """[(miner, score, blocks)] for season, best first (ties by first block mined)."""
+        return self.db.execute(
+            "SELECT miner, SUM(difficulty) AS score, COUNT(*) FROM blocks WHERE season = ? "
+            "GROUP BY miner ORDER BY score DESC, MIN(id) LIMIT ?", (season, limit)).fetchall()
+
+    def miner_history(self, miner, season=None, limit=None):
+        """[(block id, difficulty, season, chain block number, tx hash)] for miner, oldest first."""
+        sql = "SELECT id, difficulty, season, block_number, tx_hash FROM blocks WHERE miner = ?"
+        params = [miner.lower()]
+        if season is not None:
+            sql += " AND season = ?"
+            params.append(season)
+        sql += " ORDER BY block_number, log_index"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def reward_totals(self, season=None, miner=None):
+        """{recipient: {reason: amount}} over all rewards, optionally filtered."""
+        sql = "SELECT recipient, reason, SUM(amount) FROM rewards WHERE 1 = 1"
+        params = []
+        if season is not None:
+            sql += " AND season = ?"
+            params.append(season)
+        if miner is not None:
+            sql += " AND recipient = ?"
+            params.append(miner.lower())
+        totals = {}
+        for recipient, reason, amount in self.db.execute(sql + " GROUP BY recipient, reason", params):
+            totals.setdefault(recipient, {})[reason] = amount
+        return totals
+
+    def scores(self, season=None):
+        """{miner: total difficulty}, all time or for one season (getScore / seasonScore)."""
+        sql = "SELECT miner, SUM(difficulty) FROM blocks"
+        params = ()
+        if season is not None:
+            sql += " WHERE season = ?"
+            params = (season,)
+        return dict(self.db.execute(sql + " GROUP BY miner", params))
+
+    def seasons(self):
+        """[(season, start, end, per-block reward, (first, second, third) or None)]."""
+        ends = {row[0]: row[1:4] for row in self.db.execute("SELECT season, first, second, third FROM season_ends")}
+        return [(*row, ends.get(row[0]))
+                for row in self.db.execute("SELECT season, start, end, per_block_reward FROM seasons ORDER BY season")]
+
+    def block_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+def _range_too_large(exc):
+    """Node refused an eth_getLogs range (result or block-range limits differ per client)."""
+    msg = str(exc).lower()
+    return any(s in msg for s in ("too many", "limit", "range", "exceed", "timeout", "-32005"))
@@ -0,0 +1,272 @@
+# contract_emulator.py
+#
+# Pure-Python, in-memory stand-ins for Contract/src/MiningWars.sol and
+# Contract/src/MiningToken.sol. State changes, require() checks, revert
+# reasons and emitted events follow the Solidity; gas, ABI encoding and
+# uint256 overflow are not modelled. Every require of a transaction is
+# checked before its first state change, so a revert leaves no trace.
+from collections import namedtuple
+
+ZERO_ADDRESS = "0x" + "0" * 40
+DAY = 24 * 60 * 60
+
+Receipt = namedtuple("Receipt", "status reason events block_number timestamp")
+
+
+class Revert(Exception):
+    """A require() failed; str(exc) is the revert reason."""
+
+
+def _addr(a):
+    return a.lower()
+
+
+def _require(cond, reason=""):
+    if not cond:
+        raise Revert(reason)
+
+
+class EmulatedChain:
+    """
+    Holds the emulated contracts by address, the block timestamp seen by
+    their time checks, and the event log. Every transaction is mined in a
+    block of its own, like anvil's automine.
+    """
+
+    def __init__(self, timestamp=1):
+        self.timestamp = timestamp
+        self.block_number = 0
+        self.contracts = {}
+        self.logs = []          # (block_number, contract address, event name, args)
+        self._events = None
+        self._deployed = 0
+
+    def deploy(self, factory, sender, *args, address=None):
+        if address is None:
+            self._deployed += 1
+            address = "0x" + f"{0xC0DE0000 + self._deployed:040x}"
+        contract = factory(self, _addr(address), _addr(sender), *args)
+        self.contracts[contract.address] = contract
+        return contract
+
+    def at(self, address):
+        contract = self.contracts.get(_addr(address))
+        # calling into an address without code reverts in Solidity
+        _require(contract is not None)
+        return contract
+
+    def transact(self, sender, contract, method, *args):
+        """Run contract.method(sender, *args) as one transaction; returns a Receipt."""
+        self.block_number += 1
+        self._events = []
+        try:
+            getattr(contract, method)(_addr(sender), *args)
+        except Revert as e:
+            self._events = None
+            return Receipt(0, str(e), [], self.block_number, self.timestamp)
+        events, self._events = self._events, None
+        self.logs.extend((self.block_number, addr, name, fields) for addr, name, fields in events)
+        return Receipt(1, "", events, self.block_number, self.timestamp)
+
+    def emit(self, contract, name, **fields):
+        if self._events is not None:
+            self._events.append((contract.address, name, fields))
+
+
+class MiningTokenEmulator:
+    """MiningToken: OpenZeppelin ERC20 ("pratyCoin", "PMT") with a single minter."""
+
+    name = "pratyCoin"
+    symbol = "PMT"
+    decimals = 18
+
+    def __init__(self, chain, address, deployer, minter):
+        self.chain = chain
+        self.address = address
+        self.minter = _addr(minter)
+        self.totalSupply = 0
+        self.balances = {}
+
+    def balanceOf(self, account):
+        return self.balances.get(_addr(account), 0)
+
+    def check_mint(self, sender, to):
+        _require(_addr(sender) == self.minter, "Not authorized to mint")
+        _require(_addr(to) != ZERO_ADDRESS, "ERC20InvalidReceiver")
+
+    def mint(self, sender, to, amount):
+        self.check_mint(sender, to)
+        to = _addr(to)
+        self.totalSupply += amount
+        self.balances[to] = self.balances.get(to, 0) + amount
+        self.chain.emit(self, "Transfer", **{"from": ZERO_ADDRESS, "to": to, "value": amount})
+
+    def setMinter(self, sender, minter):
+        _require(sender == self.minter, "Not authorized to mint")
+        self.minter = _addr(minter)
+
+    def transfer(self, sender, to, amount):
+        to = _addr(to)
+        _require(to != ZERO_ADDRESS, "ERC20InvalidReceiver")
+        _require(self.balances.get(sender, 0) >= amount, "ERC20InsufficientBalance")
+        self.balances[sender] -= amount
+        self.balances[to] = self.balances.get(to, 0) + amount
+        self.chain.emit(self, "Transfer", **{"from": sender, "to": to, "value": amount})
+
+
+class MiningWarsEmulator:
+    """MiningWars: registration, per-season scores with a top-3 leaderboard, per-block mint, season prizes."""
+
+    def __init__(self, chain, address, deployer):
+        self.chain = chain
+        self.address = address
+        self.owner = deployer
+        self.blocks = []                 # Allblocks: (id, miner, difficulty, timestamp)
+        self.blockCounter = 0
+        self.scores = {}
+        self.registered = set()
+        self.minerBlocks = {}
+        self.seasonScore = {}            # season -> {miner: score}
+        self.seasonParticipants = {}     # season -> [miner]
+        self.miners = []
+        self.rewardsToken = ZERO_ADDRESS
+        self.perBlockReward = 0
+        self.seasonStartTime = 0
+        self.seasonEndTime = 0
+        self.currentSeason = 0
+        self.seasonDuration = 60 * DAY
+        self.firstPrize = self.secondPrize = self.thirdPrize = 0
+        self.first = self.second = self.third = ZERO_ADDRESS
+        self.currentSeasonPlayers = 0
+        self.pause = False
+
+    # --- modifiers ---
+    def _only_owner(self, sender):
+        _require(sender == self.owner, "You are not the owner")
+
+    def _season_active(self):
+        now = self.chain.timestamp
+        _require(now <= self.seasonEndTime, "Season has ended")
+        _require(now >= self.seasonStartTime, "Season not yet started")
+
+    def _season_ended(self):
+        _require(self.chain.timestamp > self.seasonEndTime, "Season is still active")
+
+    def _token(self):
+        _require(self.rewardsToken != ZERO_ADDRESS, "Rewards token not set")
+        return self.chain.at(self.rewardsToken)
+
+    # --- views ---
+    def getScore(self, miner):
+        return self.scores.get(_addr(miner), 0)
+
+    def getSeasonScore(self, season, miner):
+        return self.seasonScore.get(season, {}).get(_addr(miner), 0)
+
+    def isRegistered(self, miner):
+        return _addr(miner) in self.registered
+
+    def getBlock(self, block_id):
+        _require(0 < block_id <= self.blockCounter, "Invalid block ID")
+        return self.blocks[block_id - 1]
+
+    # --- transactions (sender first) ---
+    def registerMiner(self, sender):
+        _require(sender not in self.registered, "Already registered")
+        self.registered.add(sender)
+        self.miners.append(sender)
+        self.chain.emit(self, "MinerRegistered", miner=sender)
+
+    def submitBlock(self, sender, difficulty):
+        _require(sender in self.registered, "You are not registered")
+        self._season_active()
+        _require(difficulty > 0, "difficulty should be greater than zero")
+        _require(not self.pause)
+        token = self._token()
+        token.check_mint(self.address, sender)
+
+        season = self.currentSeason
+        participants = self.seasonParticipants.setdefault(season, [])
+        season_scores = self.seasonScore.setdefault(season, {})
+        if sender not in season_scores:
+            participants.append(sender)
+            self.currentSeasonPlayers += 1
+            season_scores[sender] = 0
+
+        self.blockCounter += 1
+        self.blocks.append((self.blockCounter, sender, difficulty, self.chain.timestamp))
+        season_scores[sender] += difficulty
+        self.scores[sender] = self.scores.get(sender, 0) + difficulty
+        self._update_leaderboard(sender)
+        self.minerBlocks.setdefault(sender, []).append(self.blockCounter)
+        self.chain.emit(self, "BlockMined", id=self.blockCounter, miner=sender, difficulty=difficulty)
+        token.mint(self.address, sender, self.perBlockReward)
+        self.chain.emit(self, "RewardPaid", to=sender, amount=self.perBlockReward, reason="PER_BLOCK")
+
+    def _update_leaderboard(self, miner):
+        scores = self.seasonScore[self.currentSeason]
+        score = scores[miner]
+        if score > scores.get(self.first, 0):
+            self.third = self.second
+            self.second = self.first
+            self.first = miner
+        elif score > scores.get(self.second, 0) and miner != self.first:
+            self.third = self.second
+            self.second = miner
+        elif score > scores.get(self.third, 0) and miner != self.first and miner != self.second:
+            self.third = miner
+
+    def setToken(self, sender, token):
+        self._only_owner(sender)
+        self.rewardsToken = _addr(token)
+        self.chain.emit(self, "TokenSet", token=self.rewardsToken)
+
+    def setPerBlockReward(self, sender, amount):
+        self._only_owner(sender)
+        self.perBlockReward = amount
+
+    def setSeasonTime(self, sender, days):
+        self._only_owner(sender)
+        self.seasonDuration = days * DAY
+
+    def startSeason(self, sender):
+        self._only_owner(sender)
+        self._season_ended()
+        self.currentSeason += 1
+        self.seasonStartTime = self.chain.timestamp
+        self.seasonEndTime = self.chain.timestamp + self.seasonDuration
+        self.chain.emit(self, "SeasonStarted", seasonId=self.currentSeason, start=self.seasonStartTime,
+                        end=self.seasonEndTime, perblockReward=self.perBlockReward)
+
+    def setSeasonPrizes(self, sender, first, second, third):
+        self._only_owner(sender)
+        self._season_active()
+        self.firstPrize, self.secondPrize, self.thirdPrize = first, second, third
+
+    def endSeasonAndDistribute(self, sender):
+        self._only_owner(sender)
+        self._season_ended()
+        token = self._token()
+        places = [(w, p, r) for w, p, r in ((self.first, self.firstPrize, "FIRST_WINNER"),
+                                            (self.second, self.secondPrize, "SECOND_WINNER"),
+                                            (self.third, self.thirdPrize, "THIRD_WINNER"))
+                  if w != ZERO_ADDRESS]
+        for winner, _, _ in places:
+            token.check_mint(self.address, winner)
+        for winner, prize, reason in places:
+            token.mint(self.address, winner, prize)
+            self.chain.emit(self, "RewardPaid", to=winner, amount=prize, reason=reason)
+
+        self.currentSeasonPlayers = 0
+        winners = [self.first, self.second, self.third]
+        self.first = self.second = self.third = ZERO_ADDRESS
+        self.chain.emit(self, "SeasonEnd", seasonId=self.currentSeason, winners=winners,
+                        amounts=[self.firstPrize, self.secondPrize, self.thirdPrize])
+
+    def setPause(self, sender, p):
+        self._only_owner(sender)
+        self.pause = bool(p)
+
+    def setOwner(self, sender, new_owner):
+        self._only_owner(sender)
+        self.owner = _addr(new_owner)
@@ -1,12 +1,31 @@
+# fixed per-block overhead counted against the block size limit
+BLOCK_HEADER_SIZE = 80
+
+
 class Block:
+    # Blocks are shared by reference between every peer that knows them, so
+    # they are frozen after construction; per-peer state lives on the Peer.
+    __slots__ = ("id", "parent", "miner", "txns", "size")
+
     def __init__(self, blk_id, parent_id, miner_id, transactions):
+        init = object.__setattr__
         # Unique ID for this block
-        self.id = blk_id
+        init(self, "id", blk_id)
         # The block it builds on (its parent)
-        self.parent = parent_id
+        init(self, "parent", parent_id)
         # Who mined it
-        self.miner = miner_id
-        # A list of Transaction objects it includes
-        self.txns = list(transactions)
-        # Optional: size could be proportional to number of txns
-        self.size = max(512, len(transactions) * 256)
\ No newline at end of file
+        init(self, "miner", miner_id)
+        # A tuple of Transaction objects it includes
+        init(self, "txns", tuple(transactions))
+        # Size in bytes: header plus the included transactions
+        init(self, "size", BLOCK_HEADER_SIZE + sum(tx.size for tx in self.txns))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Block is immutable (cannot set {name!r})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Block is immutable (cannot delete {name!r})")
+
+    def __reduce__(self):
+        # pickled through the constructor (shard processes exchange blocks)
+        return (Block, (self.id, self.parent, self.miner, self.txns))
@@ -0,0 +1,81 @@
+from array import array
+from collections.abc import Mapping
+
+from .Block import Block
+
+GENESIS = 0
+
+
+class BlockStore(Mapping):
+    """
+    Every block in the network, stored once and numbered in the order it was
+    added (genesis is 0). Parent index and height are computed on insertion
+    and kept in flat arrays, so peers can refer to blocks by number and only
+    track which numbers they know.
+
+    Reads like a {block id: Block} mapping.
+    """
+
+    def __init__(self, genesis=None):
+        self.blocks = []            # index -> Block
+        self.index = {}             # block id -> index
+        self.parent = array("l")    # index -> parent index (-1 for genesis)
+        self.height = array("l")    # index -> height (genesis is 0)
+        self.add(genesis if genesis is not None else Block("genesis", None, -1, []))
+
+    def add(self, block):
+        """Insert block (its parent must already be stored) and return its index."""
+        i = self.index.get(block.id)
+        if i is not None:
+            return i
+        i = len(self.blocks)
+        if block.parent is None:
+            p, h = -1, 0
+        else:
+            p = self.index[block.parent]
+            h = self.height[p] + 1
+        self.blocks.append(block)
+        self.index[block.id] = i
+        self.parent.append(p)
+        self.height.append(h)
+        return i
+
+    def id_of(self, i):
+        return self.blocks[i].id
+
+    # --- read-only mapping over block ids ---
+    def __getitem__(self, blk_id):
+        return self.blocks[self.index[blk_id]]
+
+    def __contains__(self, blk_id):
+        return blk_id in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.blocks)
+
+    @property
+    def heights(self):
+        """Read-only {block id: height} view."""
+        return _StoreHeights(self)
+
+
+class _StoreHeights(Mapping):
+    __slots__ = ("_store",)
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, blk_id):
+        return self._store.height[self._store.index[blk_id]]
+
+    def __contains__(self, blk_id):
+        return blk_id in self._store.index
+
+    def __iter__(self):
+        return iter(self._store.index)
+
+    def __len__(self):
+        return len(self._store.blocks)
@@ -1,7 +1,9 @@
 class Event:
-    def __init__(self, time, ev_type, peer_id, payload=None):
+    def __init__(self, time, ev_type, peer_id, payload=None, seq=0):
         # The simulated time this event occurs
         self.time = time
+        # Scheduling order: breaks ties between events at the same time (FIFO)
+        self.seq = seq
         # A string like "TX_GEN", "TX_RECV", "BLK_MINED", "BLK_RECV"
         self.type = ev_type
         # The integer ID of the peer handling this event
@@ -9,6 +11,6 @@ class Event:
         # Optional data attached (a Transaction or a Block)
         self.data = payload
 
-    # This makes Python compare events by time when pushing into a heap
+    # This makes Python compare events by time (then seq) when pushing into a heap
     def __lt__(self, other):
-        return self.time < other.time
\ No newline at end of file
+        return (self.time, self.seq) < (other.time, other.seq)
\ No newline at end of file
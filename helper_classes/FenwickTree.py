@@ -0,0 +1,61 @@
+class FenwickTree:
+    """
+    Binary indexed tree over non-negative weights w[0..n-1].
+
+    Supports point updates and prefix-sum search in O(log n), which is what
+    weighted sampling with changing weights needs: find(x) returns the index
+    i such that w[0] + ... + w[i-1] <= x < w[0] + ... + w[i].
+    """
+
+    def __init__(self, weights):
+        self.n = len(weights)
+        self.weights = [float(w) for w in weights]
+        tree = [0.0] + self.weights
+        for i in range(1, self.n + 1):
+            j = i + (i & -i)
+            if j <= self.n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._top = 1 << max(0, self.n.bit_length() - 1) if self.n else 0
+
+    @property
+    def total(self):
+        return self.prefix(self.n)
+
+    def prefix(self, i):
+        """Sum of w[0..i-1]."""
+        tree = self._tree
+        s = 0.0
+        while i > 0:
+            s += tree[i]
+            i -= i & -i
+        return s
+
+    def add(self, i, delta):
+        self.weights[i] += delta
+        tree = self._tree
+        i += 1
+        while i <= self.n:
+            tree[i] += delta
+            i += i & -i
+
+    def set(self, i, value):
+        self.add(i, float(value) - self.weights[i])
+
+    def find(self, x):
+        """Index whose cumulative weight interval contains x (0 <= x < total)."""
+        tree = self._tree
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and tree[nxt] <= x:
+                pos = nxt
+                x -= tree[nxt]
+            step >>= 1
+        # rounding can push x past the last positive weight; stay in range
+        if pos >= self.n:
+            pos = self.n - 1
+        while pos > 0 and self.weights[pos] <= 0:
+            pos -= 1
+        return pos
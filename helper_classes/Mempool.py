@@ -0,0 +1,194 @@
+import heapq
+from array import array
+
+
+class Mempool:
+    """
+    Bounded, fee-prioritised transaction pool keyed by tx id.
+
+    Transactions are ranked by fee rate (fee / size); among equal rates the
+    older one ranks higher. An indexed binary min-heap keeps the lowest-ranked
+    transaction at the root, so insert, evict and remove-by-id are O(log n).
+    When the pool exceeds max_count transactions or max_bytes bytes, the
+    lowest-ranked entries are evicted (possibly the one just offered).
+
+    It behaves like the dict it replaces for lookups: `tx_id in pool`,
+    pool[tx_id], len(pool), values() and del pool[tx_id] all work.
+    """
+
+    def __init__(self, max_count=None, max_bytes=None):
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self._heap = []   # entries: ((fee_rate, -seq), tx)
+        self._pos = {}    # tx id -> index in _heap
+        self._seq = 0
+        self.bytes = 0
+        self.evictions = 0
+        self.peak_count = 0
+        self.peak_bytes = 0
+
+    # --- dict-like access ---
+    def __contains__(self, tx_id):
+        return tx_id in self._pos
+
+    def __getitem__(self, tx_id):
+        return self._heap[self._pos[tx_id]][1]
+
+    def __setitem__(self, tx_id, tx):
+        self.add(tx)
+
+    def __delitem__(self, tx_id):
+        self._remove_at(self._pos[tx_id])
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        return iter(list(self._pos))
+
+    def get(self, tx_id, default=None):
+        i = self._pos.get(tx_id)
+        return default if i is None else self._heap[i][1]
+
+    def values(self):
+        return [entry[1] for entry in self._heap]
+
+    def discard(self, tx_id):
+        i = self._pos.get(tx_id)
+        if i is not None:
+            self._remove_at(i)
+
+    def clear(self):
+        self._heap.clear()
+        self._pos.clear()
+        self.bytes = 0
+
+    # --- pool operations ---
+    def add(self, tx):
+        """Insert tx, evicting the lowest-ranked entries if over capacity. Returns False if tx itself was evicted."""
+        if tx.id in self._pos:
+            return True
+        self._seq += 1
+        entry = ((getattr(tx, "fee", 0) / tx.size, -self._seq), tx)
+        heap = self._heap
+        heap.append(entry)
+        self._pos[tx.id] = len(heap) - 1
+        self._sift_up(len(heap) - 1)
+        self.bytes += tx.size
+
+        accepted = True
+        while ((self.max_count is not None and len(heap) > self.max_count) or
+               (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            victim = heap[0][1]
+            self._remove_at(0)
+            self.evictions += 1
+            if victim is tx:
+                accepted = False
+
+        if len(heap) > self.peak_count:
+            self.peak_count = len(heap)
+        if self.bytes > self.peak_bytes:
+            self.peak_bytes = self.bytes
+        return accepted
+
+    def template(self, max_bytes=None, exclude=()):
+        """
+        Highest fee-rate transactions whose sizes fit in max_bytes (None: no
+        limit). Entries are taken best first off a max-heap copy, so a block
+        costs O(n + k log n) for k visited entries, and the walk stops once no
+        pooled tx fits the remaining room. Visited entries whose id is in
+        exclude (e.g. already confirmed) are dropped from the pool.
+        """
+        if not self._heap:
+            return []
+        # (-fee_rate, seq): the best entry first, and seq is unique so txs are never compared
+        order = [(-key[0], -key[1], tx) for key, tx in self._heap]
+        heapq.heapify(order)
+        smallest = min(tx.size for _, tx in self._heap)
+        chosen = []
+        stale = []
+        room = max_bytes
+        while order and (room is None or room >= smallest):
+            tx = heapq.heappop(order)[2]
+            if tx.id in exclude:
+                stale.append(tx.id)
+                continue
+            if room is None:
+                chosen.append(tx)
+            elif tx.size <= room:
+                chosen.append(tx)
+                room -= tx.size
+        for tx_id in stale:
+            self.discard(tx_id)
+        return chosen
+
+    def stats(self):
+        return {
+            "count": len(self._heap),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+            "peak_count": self.peak_count,
+            "peak_bytes": self.peak_bytes,
+        }
+
+    # --- pickling (checkpoints): txs and their sequence numbers in heap order;
+    # fee rates and the id index are rebuilt ---
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        heap = state.pop("_heap")
+        del state["_pos"]
+        state["_txs"] = [entry[1] for entry in heap]
+        state["_seqs"] = array("q", [-entry[0][1] for entry in heap])
+        return state
+
+    def __setstate__(self, state):
+        txs, seqs = state.pop("_txs"), state.pop("_seqs")
+        self.__dict__.update(state)
+        self._heap = [((getattr(tx, "fee", 0) / tx.size, -seq), tx) for tx, seq in zip(txs, seqs)]
+        self._pos = {tx.id: i for i, tx in enumerate(txs)}
+
+    # --- indexed heap internals ---
+    def _remove_at(self, i):
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        del pos[entry[1].id]
+        self.bytes -= entry[1].size
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            pos[last[1].id] = i
+            self._sift_down(i)
+            self._sift_up(self._pos[last[1].id])
+
+    def _sift_up(self, i):
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            above = heap[parent]
+            if above[0] <= entry[0]:
+                break
+            heap[i] = above
+            pos[above[1].id] = i
+            i = parent
+        heap[i] = entry
+        pos[entry[1].id] = i
+
+    def _sift_down(self, i):
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            below = heap[child]
+            if entry[0] <= below[0]:
+                break
+            heap[i] = below
+            pos[below[1].id] = i
+            i = child
+        heap[i] = entry
+        pos[entry[1].id] = i
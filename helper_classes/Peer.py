@@ -1,24 +1,157 @@
-from .Block import Block
+from array import array
+from collections.abc import Mapping
+
+from .BlockStore import GENESIS, BlockStore
+from .Mempool import Mempool
+from .PeerTable import PeerTable
+
+NAN = float("nan")
+
 
 class Peer:
-    def __init__(self, peer_id, is_fast=True, is_high_cpu=True, initial_balance=100):
-        self.id = peer_id
-        self.is_fast = is_fast
-        self.is_high_cpu = is_high_cpu
-        self.hash_power = 2.0 if is_high_cpu else 1.0
-        # inside Peer.__init__, add:
-        self.block_arrival = {"genesis": 0.0}   # record arrival times (seconds); genesis at time 0
+    """
+    One peer: its mempool and chain view, plus a view of its row in a
+    PeerTable (balance, hash_power, is_fast, is_high_cpu, tip). Without a
+    table the peer gets a one-row table of its own built from the trait
+    arguments; with one, peer_id is its row and the row's values are used.
+    """
+    __slots__ = ("id", "table", "_row", "mempool", "store", "known", "arrival", "known_count",
+                 "mined_blocks", "mining_gen", "mining_pending")
 
-        # NEW: track coin balance
-        self.balance = initial_balance
+    def __init__(self, peer_id, is_fast=True, is_high_cpu=True, initial_balance=100,
+                 mempool_max_count=None, mempool_max_bytes=None, block_store=None, table=None):
+        self.id = peer_id
+        if table is None:
+            table, self._row = PeerTable(1, is_fast, is_high_cpu, initial_balance), 0
+        else:
+            self._row = peer_id
+        self.table = table
 
-        # mempool now holds full Transaction objects
-        self.mempool = {}
+        # mempool holds full Transaction objects, bounded and fee-ordered
+        self.mempool = Mempool(mempool_max_count, mempool_max_bytes)
 
-        # block tree and heights
-        self.block_tree = {"genesis": Block("genesis", None, None, [])}
-        self.heights = {"genesis": 0}
-        self.current_tip = "genesis"
+        # chain view: blocks live once in the (usually network-wide) store;
+        # the peer keeps a bitset of known block numbers, their arrival times
+        # (seconds, nan where unknown) and the number of its tip
+        self.store = block_store if block_store is not None else BlockStore()
+        self.known = bytearray()
+        self.arrival = array("d")
+        self.known_count = 0
+        self.tip = GENESIS
+        self.learn(GENESIS, 0.0)   # genesis at time 0
 
         # record blocks this peer mined
-        self.mined_blocks = []
\ No newline at end of file
+        self.mined_blocks = []
+
+        # mining timer generation: bumped whenever the pending BLOCK_MINED
+        # event is superseded (tip change, retarget) so stale ones are dropped
+        self.mining_gen = 0
+        self.mining_pending = False
+
+    # --- row of the peer table ---
+    @property
+    def balance(self):
+        return int(self.table.balance[self._row])
+
+    @balance.setter
+    def balance(self, value):
+        self.table.balance[self._row] = value
+
+    @property
+    def hash_power(self):
+        return float(self.table.hash_power[self._row])
+
+    @hash_power.setter
+    def hash_power(self, value):
+        self.table.hash_power[self._row] = value
+
+    @property
+    def is_fast(self):
+        return bool(self.table.is_fast[self._row])
+
+    @property
+    def is_high_cpu(self):
+        return bool(self.table.is_high_cpu[self._row])
+
+    @property
+    def tip(self):
+        return int(self.table.tip[self._row])
+
+    @tip.setter
+    def tip(self, i):
+        self.table.tip[self._row] = i
+
+    # --- compact chain view ---
+    def knows(self, i):
+        byte = i >> 3
+        return byte < len(self.known) and bool(self.known[byte] & (1 << (i & 7)))
+
+    def learn(self, i, t):
+        """Mark block number i as known, first seen at time t. Returns False if already known."""
+        known = self.known
+        byte = i >> 3
+        if byte >= len(known):
+            known.extend(bytes(max(byte + 1, 2 * len(known)) - len(known)))
+        mask = 1 << (i & 7)
+        if known[byte] & mask:
+            return False
+        known[byte] |= mask
+        arrival = self.arrival
+        if i >= len(arrival):
+            arrival.extend([NAN] * (max(i + 1, 2 * len(arrival)) - len(arrival)))
+        arrival[i] = t
+        self.known_count += 1
+        return True
+
+    def known_indices(self):
+        """Known block numbers in ascending order."""
+        for byte, bits in enumerate(self.known):
+            if bits:
+                base = byte << 3
+                for k in range(8):
+                    if bits & (1 << k):
+                        yield base + k
+
+    @property
+    def current_tip(self):
+        return self.store.blocks[self.tip].id
+
+    @current_tip.setter
+    def current_tip(self, blk_id):
+        self.tip = self.store.index[blk_id]
+
+    # --- read-only {block id: ...} views of what this peer knows ---
+    @property
+    def block_tree(self):
+        return _KnownBlocks(self, self.store.blocks.__getitem__)
+
+    @property
+    def heights(self):
+        return _KnownBlocks(self, self.store.height.__getitem__)
+
+    @property
+    def block_arrival(self):
+        return _KnownBlocks(self, self.arrival.__getitem__)
+
+
+class _KnownBlocks(Mapping):
+    """Maps the ids of the blocks a peer knows to value(block number)."""
+    __slots__ = ("_peer", "_value")
+
+    def __init__(self, peer, value):
+        self._peer = peer
+        self._value = value
+
+    def __getitem__(self, blk_id):
+        i = self._peer.store.index.get(blk_id)
+        if i is None or not self._peer.knows(i):
+            raise KeyError(blk_id)
+        return self._value(i)
+
+    def __iter__(self):
+        blocks = self._peer.store.blocks
+        for i in self._peer.known_indices():
+            yield blocks[i].id
+
+    def __len__(self):
+        return self._peer.known_count
@@ -0,0 +1,88 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+HIGH_CPU_HASH_POWER = 2.0
+LOW_CPU_HASH_POWER = 1.0
+
+
+class PeerTable:
+    """
+    Scalar state of peers 0..n-1 as NumPy columns, indexed by peer id:
+
+      balance       int64    coin balance (the authoritative ledger)
+      hash_power    float64  mining power
+      is_fast       bool     fast link (slow peers' links are SLOW_FACTOR longer)
+      is_high_cpu   bool     high-cpu miner (hash power 2 instead of 1)
+      tip           int64    block number of the peer's chain tip
+      season_score  int64    blocks mined in the current season
+      tx_draws      int64    variates computed for the peer's tx stream (see KeyedUniform)
+
+    Peer objects are thin views over one row; network-wide queries and
+    updates (ledger credits, total hash, balance distribution) work on
+    whole columns instead of looping over peers.
+    """
+
+    COLUMNS = ("balance", "hash_power", "is_fast", "is_high_cpu", "tip", "season_score", "tx_draws")
+
+    def __init__(self, n, is_fast=True, is_high_cpu=True, initial_balance=100):
+        self.n = int(n)
+        self.is_fast = np.empty(self.n, dtype=bool)
+        self.is_fast[:] = is_fast
+        self.is_high_cpu = np.empty(self.n, dtype=bool)
+        self.is_high_cpu[:] = is_high_cpu
+        self.hash_power = np.where(self.is_high_cpu, HIGH_CPU_HASH_POWER, LOW_CPU_HASH_POWER)
+        self.balance = np.full(self.n, initial_balance, dtype=np.int64)
+        self.tip = np.zeros(self.n, dtype=np.int64)
+        self.season_score = np.zeros(self.n, dtype=np.int64)
+        self.tx_draws = np.zeros(self.n, dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def credit(self, pids, amounts):
+        """Add amounts[i] to the balance of pids[i] (repeated ids accumulate)."""
+        np.add.at(self.balance, pids, amounts)
+
+    @property
+    def total_hash_power(self):
+        return float(self.hash_power.sum())
+
+    def balance_quantiles(self, q=(0.0, 0.25, 0.5, 0.75, 1.0)):
+        """Balance distribution across peers: {quantile: balance}."""
+        if not self.n:
+            return {}
+        return dict(zip(q, np.quantile(self.balance, q).tolist()))
+
+    def column(self, name):
+        """Read-only {peer id: value} view of one column (e.g. the ledger)."""
+        return ColumnView(self, name)
+
+
+class ColumnView(Mapping):
+    """{peer id: python value} view of a PeerTable column, as the dicts it replaces."""
+    __slots__ = ("_table", "_name")
+
+    def __init__(self, table, name):
+        self._table = table
+        self._name = name
+
+    def __getitem__(self, pid):
+        if not isinstance(pid, (int, np.integer)) or not 0 <= pid < self._table.n:
+            raise KeyError(pid)
+        return getattr(self._table, self._name)[pid].item()
+
+    def __iter__(self):
+        return iter(range(self._table.n))
+
+    def __len__(self):
+        return self._table.n
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def items(self):
+        return list(enumerate(getattr(self._table, self._name).tolist()))
+
+    def values(self):
+        return getattr(self._table, self._name).tolist()
@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles of non-negative values (HDR-histogram style).
+
+    Values are counted in log-spaced buckets: bucket k covers
+    [lowest * g**k, lowest * g**(k+1)) with g = 1 + 2 * precision, and a
+    quantile is answered with its bucket's midpoint, so it is within
+    precision (relative) of an exact value. Values below lowest share the
+    first bucket, values of highest and above the last one. add() is O(1);
+    quantile() walks the fixed set of buckets, independent of how many
+    values were added. Sketches with equal parameters merge by adding counts.
+    """
+
+    def __init__(self, lowest=1e-4, highest=1e5, precision=0.01):
+        if not 0 < lowest < highest:
+            raise ValueError("need 0 < lowest < highest")
+        if not 0 < precision < 0.5:
+            raise ValueError("precision must be in (0, 0.5)")
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self._scale = 1.0 / math.log1p(2 * precision)
+        self._offset = math.log(lowest) * self._scale
+        self._last = int(math.log(highest) * self._scale - self._offset)
+        self.counts = [0] * (self._last + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.count += 1
+        self.total += x
+        if x <= self.lowest:
+            self.counts[0] += 1
+        else:
+            k = int(math.log(x) * self._scale - self._offset)
+            self.counts[k if k < self._last else self._last] += 1
+
+    def merge(self, other):
+        """Add other's values (a sketch with the same parameters) to this one."""
+        if (other.lowest, other.highest, other.precision) != (self.lowest, self.highest, self.precision):
+            raise ValueError("can only merge sketches with the same lowest, highest and precision")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def quantiles(self, q=(0.5, 0.9, 0.99)):
+        """{quantile: value} (nan when empty), clamped to the exact min and max."""
+        if not self.count:
+            return {p: math.nan for p in q}
+        cumulative = np.cumsum(self.counts)
+        ks = np.searchsorted(cumulative, [p * self.count for p in q], side="left")
+        out = {}
+        for p, k in zip(q, ks.tolist()):
+            mid = math.exp((k + self._offset + 0.5) / self._scale)
+            out[p] = min(max(mid, self.min), self.max)
+        return out
+
+    def quantile(self, q):
+        return self.quantiles((q,))[q]
@@ -0,0 +1,164 @@
+from array import array
+
+import numpy as np
+
+STREAMS = ("peers", "topology", "tx", "mining", "race")
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15  # SplitMix64 increment
+# SplitMix64 finaliser constants
+_M1, _M2 = np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB)
+_S11, _S27, _S30, _S31 = (np.uint64(s) for s in (11, 27, 30, 31))
+
+
+def _mix64_array(z):
+    """SplitMix64 finaliser over a uint64 array (products wrap modulo 2**64): a bijection that avalanches every bit."""
+    z = (z ^ (z >> _S30)) * _M1
+    z = (z ^ (z >> _S27)) * _M2
+    return z ^ (z >> _S31)
+
+
+class _Chunked:
+    """Endless python floats from draw(chunk), pre-generated chunk values at a time (picklable mid-chunk)."""
+    __slots__ = ("draw", "chunk", "_next")
+
+    def __init__(self, draw, chunk):
+        self.draw = draw
+        self.chunk = chunk
+        self._next = iter(()).__next__
+
+    def __call__(self):
+        try:
+            return self._next()
+        except StopIteration:
+            self._next = iter(self.draw(self.chunk).tolist()).__next__
+            return self._next()
+
+
+class KeyedUniform:
+    """
+    Counter-based uniform [0, 1) variates for keys 0..n-1 (e.g. peer ids).
+    Key i is a SplitMix64 sequence started at a seed derived from (stream
+    key, i), and its draw k is the mixed (k + 1)-th state, so values depend
+    only on (seed, stream, key, k), however draws of different keys
+    interleave.
+
+    A key holds no generator object, only its 8-byte seed and a block of
+    chunk pre-computed values (8 * chunk bytes), refilled in one vectorised
+    step when used up. counters[i] counts the values computed for key i so
+    far (a multiple of chunk, usually a column shared with other per-key
+    state); the ones not drawn yet wait in the key's block.
+    """
+
+    def __init__(self, key, counters, chunk=32):
+        self.counters = counters
+        self.chunk = chunk
+        ids = np.arange(1, len(counters) + 1, dtype=np.uint64)
+        self.seeds = _mix64_array(np.uint64(key) + ids * np.uint64(GOLDEN))
+        self._buf = array("d", bytes(8 * chunk * len(counters)))
+        self._pos = bytearray([chunk]) * len(counters)   # next unread slot of each block
+        self._bind()
+
+    def _bind(self):
+        self._blocks = np.frombuffer(self._buf, dtype=np.float64).reshape(-1, self.chunk)
+        self._steps = np.arange(1, self.chunk + 1, dtype=np.uint64) * np.uint64(GOLDEN)
+        self._z = np.empty(self.chunk, dtype=np.uint64)
+        self._t = np.empty(self.chunk, dtype=np.uint64)
+
+    def __getstate__(self):
+        # the block view and scratch arrays are rebuilt over the unpickled buffer
+        return {name: getattr(self, name) for name in ("counters", "chunk", "seeds", "_buf", "_pos")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+
+    def __call__(self, i):
+        """Next variate of key i."""
+        j = self._pos[i]
+        if j == self.chunk:
+            self._refill(i)
+            j = 0
+        self._pos[i] = j + 1
+        return self._buf[i * self.chunk + j]
+
+    def _refill(self, i):
+        # _fill for one key, in place on preallocated arrays (the per-call
+        # overhead of numpy dominates at this size)
+        k = int(self.counters[i])
+        self.counters[i] = k + self.chunk
+        z, t = self._z, self._t
+        np.add(self._steps, np.uint64((int(self.seeds[i]) + k * GOLDEN) & MASK64), out=z)
+        np.right_shift(z, _S30, out=t)
+        z ^= t
+        z *= _M1
+        np.right_shift(z, _S27, out=t)
+        z ^= t
+        z *= _M2
+        np.right_shift(z, _S31, out=t)
+        z ^= t
+        z >>= _S11
+        np.multiply(z, 2.0 ** -53, out=self._blocks[i])
+
+    def _fill(self, ids):
+        """Refill the blocks of keys ids (distinct) with their next chunk values."""
+        k = self.counters[ids].astype(np.uint64)
+        self.counters[ids] += self.chunk
+        z = (self.seeds[ids] + k * np.uint64(GOLDEN))[:, None] + self._steps
+        self._blocks[ids] = (_mix64_array(z) >> _S11) * 2.0 ** -53
+
+    def take(self, ids):
+        """Next variate of every key in ids (distinct), as an array."""
+        ids = np.asarray(ids)
+        pos = np.frombuffer(self._pos, dtype=np.uint8)
+        due = ids[pos[ids] == self.chunk]
+        # in slices, so the temporaries stay small next to the blocks
+        for a in range(0, due.size, 4096):
+            self._fill(due[a:a + 4096])
+        pos[due] = 0
+        j = pos[ids]
+        pos[ids] = j + 1
+        return self._blocks[ids, j]
+
+
+class RandomStreams:
+    """
+    Independent numpy Generators, one per named stream, all spawned from a
+    single seed (numpy SeedSequence), so a run is reproducible from that
+    seed and drawing more from one stream never shifts another.
+
+    Hot-path variates come from per-stream buffers refilled chunk values at
+    a time: exponential(stream) and uniform(stream) return zero-argument
+    callables yielding standard exponential / uniform [0, 1) floats. The
+    values do not depend on the chunk size as long as each stream feeds a
+    single buffer (two buffers on one stream interleave their refills).
+    """
+
+    def __init__(self, seed, chunk=4096):
+        self.seed = seed
+        self.chunk = chunk
+        children = np.random.SeedSequence(seed).spawn(len(STREAMS))
+        self.generators = {name: np.random.default_rng(s) for name, s in zip(STREAMS, children)}
+
+    def generator(self, stream):
+        """The numpy Generator behind stream (for vectorised draws)."""
+        return self.generators[stream]
+
+    def exponential(self, stream):
+        """Callable returning standard exponential variates (mean 1) from stream."""
+        return _Chunked(self.generators[stream].standard_exponential, self.chunk)
+
+    def uniform(self, stream):
+        """Callable returning uniform [0, 1) variates from stream."""
+        return _Chunked(self.generators[stream].random, self.chunk)
+
+    def keyed_uniform(self, stream, counters, chunk=32):
+        """
+        KeyedUniform over keys 0..len(counters)-1 from stream's own key, for
+        variates that depend only on (seed, stream, key, draw number), not on
+        how draws for other keys are interleaved. counters (int64, usually
+        zeros) holds the number of values computed per key; chunk is the
+        per-key block size.
+        """
+        seq = np.random.SeedSequence(self.seed, spawn_key=(STREAMS.index(stream), 0))
+        return KeyedUniform(int(seq.generate_state(1, np.uint64)[0]), counters, chunk)
@@ -0,0 +1,119 @@
+import random
+
+import numpy as np
+
+
+class Topology:
+    """
+    Compiled peer graph in CSR form.
+
+    offsets[u]:offsets[u+1] indexes the directed edges leaving peer u;
+    neighbors holds their endpoints and base_delay the undirected link delay
+    (rho). delay is the effective per-directed-edge delay, i.e. base_delay
+    scaled by slow_factor when the sending peer is slow (see
+    with_slow_factor). Peers are labelled 0..n-1.
+    """
+
+    def __init__(self, n, offsets, neighbors, base_delay):
+        self.n = int(n)
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.base_delay = base_delay
+        self.delay = base_delay
+
+    @classmethod
+    def from_edges(cls, n, src, dst, delays=None, rng=None):
+        """
+        Build from undirected edges (src[i], dst[i]). delays gives one delay per
+        edge; when omitted they are drawn uniformly from [0.01, 0.5] seconds and
+        rounded to milliseconds, as extract_network_data does.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if src.shape != dst.shape:
+            raise ValueError("src and dst must have the same length")
+        if src.size and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+            raise ValueError(f"edge endpoints must lie in 0..{n - 1}")
+        if delays is None:
+            if rng is None:
+                rng = np.random.default_rng(random.getrandbits(64))
+            delays = np.round(rng.uniform(0.01, 0.5, size=src.size), 3)
+        delays = np.asarray(delays, dtype=np.float64)
+
+        # both directions of every link, grouped by sender and sorted by receiver
+        tails = np.concatenate((src, dst))
+        heads = np.concatenate((dst, src))
+        both = np.concatenate((delays, delays))
+        order = np.lexsort((heads, tails))
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=n), out=offsets[1:])
+        return cls(n, offsets, heads[order], both[order])
+
+    @classmethod
+    def from_networkx(cls, G, rho=None, rng=None):
+        """
+        Build from a networkx graph whose nodes are 0..n-1. rho optionally
+        supplies the {(u, v): delay} mapping produced by extract_network_data.
+        """
+        n = G.number_of_nodes()
+        if n and (min(G.nodes()) != 0 or max(G.nodes()) != n - 1):
+            raise ValueError("Topology needs nodes labelled 0..n-1 "
+                             "(see networkx.convert_node_labels_to_integers)")
+        m = G.number_of_edges()
+        flat = np.fromiter((x for edge in G.edges() for x in edge), dtype=np.int64, count=2 * m)
+        src, dst = flat[0::2], flat[1::2]
+        delays = None
+        if rho is not None:
+            delays = np.fromiter((rho[(min(u, v), max(u, v))] for u, v in zip(src.tolist(), dst.tolist())),
+                                 dtype=np.float64, count=m)
+        return cls.from_edges(n, src, dst, delays=delays, rng=rng)
+
+    def with_slow_factor(self, is_fast, slow_factor=1.5):
+        """
+        Copy whose delay makes edges sent by slow peers slow_factor times
+        longer. The graph arrays are shared and this topology is unchanged,
+        so several simulators can start from one Topology.
+        """
+        is_fast = np.asarray(is_fast, dtype=bool)
+        senders = np.repeat(np.arange(self.n), np.diff(self.offsets))
+        scaled = Topology(self.n, self.offsets, self.neighbors, self.base_delay)
+        scaled.delay = np.where(is_fast[senders], self.base_delay, self.base_delay * slow_factor)
+        return scaled
+
+    @property
+    def num_edges(self):
+        """Number of undirected links."""
+        return int(self.neighbors.size // 2)
+
+    @property
+    def min_delay(self):
+        return float(self.delay.min()) if self.delay.size else float("inf")
+
+    def degree(self, u):
+        return int(self.offsets[u + 1] - self.offsets[u])
+
+    def links(self, u):
+        """Return (neighbors, effective delays) of peer u as Python lists."""
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return self.neighbors[a:b].tolist(), self.delay[a:b].tolist()
+
+    def link_delay(self, u, v):
+        """Effective delay of the directed edge u -> v (KeyError if they are not linked)."""
+        a, b = int(self.offsets[u]), int(self.offsets[u + 1])
+        i = a + int(np.searchsorted(self.neighbors[a:b], v))
+        if i == b or self.neighbors[i] != v:
+            raise KeyError((u, v))
+        return float(self.delay[i])
+
+    def adjacency(self):
+        """{peer: [neighbors]} view, as returned by extract_network_data."""
+        nbrs = self.neighbors.tolist()
+        offs = self.offsets.tolist()
+        return {u: nbrs[offs[u]:offs[u + 1]] for u in range(self.n)}
+
+    def rho(self):
+        """{(u, v): delay} for u < v, as returned by extract_network_data."""
+        senders = np.repeat(np.arange(self.n), np.diff(self.offsets))
+        mask = senders < self.neighbors
+        return dict(zip(zip(senders[mask].tolist(), self.neighbors[mask].tolist()),
+                        self.base_delay[mask].tolist()))
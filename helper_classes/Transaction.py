@@ -1,7 +1,24 @@
 class Transaction:
-    def __init__(self, tx_id, origin_peer, receiver_peer, amount, size_bytes=1024):
-        self.id = tx_id
-        self.origin = origin_peer
-        self.receiver = receiver_peer
-        self.amount = amount
-        self.size = size_bytes
\ No newline at end of file
+    # Transactions travel by reference through mempools and blocks, so they
+    # are frozen after construction.
+    __slots__ = ("id", "origin", "receiver", "amount", "size", "fee")
+
+    def __init__(self, tx_id, origin_peer, receiver_peer, amount, size_bytes=1024, fee=0):
+        init = object.__setattr__
+        init(self, "id", tx_id)
+        init(self, "origin", origin_peer)
+        init(self, "receiver", receiver_peer)
+        init(self, "amount", amount)
+        init(self, "size", size_bytes)
+        # priority fee: orders mempools and block templates (not charged by the ledger)
+        init(self, "fee", fee)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Transaction is immutable (cannot set {name!r})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Transaction is immutable (cannot delete {name!r})")
+
+    def __reduce__(self):
+        # pickled through the constructor (shard processes exchange transactions)
+        return (Transaction, (self.id, self.origin, self.receiver, self.amount, self.size, self.fee))
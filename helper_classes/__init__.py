@@ -1,6 +1,14 @@
+from .ArrivalTable import ArrivalTable;
 from .Block import Block;
+from .BlockStore import BlockStore;
 from .Event import Event;
+from .FenwickTree import FenwickTree;
+from .Mempool import Mempool;
 from .Peer import Peer;
+from .PeerTable import PeerTable;
+from .QuantileSketch import QuantileSketch;
+from .RandomStreams import RandomStreams;
+from .Topology import Topology;
 from .Transaction import Transaction;
 
-__all__=["Block","Event","Peer","Transaction"]
\ No newline at end of file
+__all__=["ArrivalTable","Block","BlockStore","Event","FenwickTree","Mempool","Peer","PeerTable","QuantileSketch","RandomStreams","Topology","Transaction"]
\ No newline at end of file
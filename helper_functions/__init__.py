@@ -1,5 +1,7 @@
 from .extract_network_data import extract_network_data;
 from .generating_graph import generate_random_p2p_graph;
+from .partition_topology import edge_cut, partition_topology;
+from .topology_generators import generate_p2p_edges, generate_p2p_topology;
 from .visualize_graph import visualize_graph;
 
-__all__=["extract_network_data","generate_random_p2p_graph","visualize_graph"]
+__all__=["extract_network_data","generate_random_p2p_graph","generate_p2p_edges","generate_p2p_topology","edge_cut","partition_topology","visualize_graph"]
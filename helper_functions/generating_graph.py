@@ -1,63 +1,26 @@
 import random
-import networkx as nx    
 
-def generate_random_p2p_graph(min_peers=4, max_peers=5, min_deg=1, max_deg=2):
-    print("started G")
-    attempts = 0  
-    while True:
-        attempts += 1
+from .topology_generators import generate_p2p_edges
 
-        # Choose number of peers
-        n = random.randint(min_peers, max_peers)
-        print(n)
 
-        # Assign target degrees
-        target_degrees = {
-            node: random.randint(min_deg, max_deg)
-            for node in range(n)
-        }
-        print("started G")
+def generate_random_p2p_graph(min_peers=4, max_peers=5, min_deg=1, max_deg=2, family="random", seed=None):
+    """
+    Return a connected networkx graph with between min_peers and max_peers
+    nodes whose degrees all lie in [min_deg, max_deg].
 
-        # Create empty graph with n nodes
-        G = nx.Graph()
-        print("started G")
-        G.add_nodes_from(range(n))
-        print("started G")
+    The graph is built directly by generate_p2p_edges (configuration model plus
+    connectivity repair), so there is no rejection loop. seed defaults to a
+    draw from the global random module; for large graphs skip networkx and use
+    generate_p2p_topology instead.
+    """
+    import networkx as nx
 
-        # Add edges until targets reached or no valid pair remains
-        while True:
-            pool = [
-                node
-                for node, tgt in target_degrees.items()
-                if G.degree(node) < tgt
-            ]
-            if len(pool) < 2:
-                break
+    if seed is None:
+        seed = random.getrandbits(64)
+    n = random.Random(seed).randint(min_peers, max_peers)
+    src, dst = generate_p2p_edges(n, family, min_deg, max_deg, seed=seed)
 
-            u, v = random.sample(pool, 2)
-
-            if G.has_edge(u, v):
-                continue
-
-            if G.degree(u) < target_degrees[u] and G.degree(v) < target_degrees[v]:
-                G.add_edge(u, v)
-            else:
-                break
-
-        print("started G")    
-
-        # Validate degree constraints and connectivity
-        degrees_ok = all(
-            min_deg <= G.degree(node) <= max_deg
-            for node in G.nodes()
-        )
-        conn_ok = False
-        if degrees_ok:
-            try:
-                conn_ok = nx.is_connected(G)
-            except nx.NetworkXError:
-                conn_ok = False
-
-        if degrees_ok and conn_ok:
-            print(f"✅ Valid graph found after {attempts} attempt(s). n={n}")
-            return G
\ No newline at end of file
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(zip(src.tolist(), dst.tolist()))
+    return G
@@ -0,0 +1,75 @@
+from collections import deque
+
+import numpy as np
+
+
+def _bfs_order(topology, start):
+    """Peers in breadth-first order from start, restarting in unreached components."""
+    n = topology.n
+    offsets, neighbors = topology.offsets.tolist(), topology.neighbors.tolist()
+    seen = bytearray(n)
+    order = []
+    for root in [start, *range(n)]:
+        if seen[root]:
+            continue
+        seen[root] = 1
+        queue = deque([root])
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v in neighbors[offsets[u]:offsets[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    queue.append(v)
+    return order
+
+
+def edge_cut(topology, owner):
+    """Number of undirected links whose endpoints lie in different parts."""
+    senders = np.repeat(np.arange(topology.n), np.diff(topology.offsets))
+    return int(np.count_nonzero(owner[senders] != owner[topology.neighbors]) // 2)
+
+
+def partition_topology(topology, k, imbalance=0.03, passes=4):
+    """
+    Split peers 0..n-1 into k parts of near-equal size with few cut links.
+
+    Peers are laid out in breadth-first order from a pseudo-peripheral peer
+    (the last one reached by a BFS from peer 0) and cut into k equal runs,
+    which keeps neighbourhoods together. A few greedy passes then move
+    boundary peers to the part holding most of their neighbours, as long as
+    every part stays within imbalance of n/k. Returns owner, an int64 array
+    mapping each peer to its part.
+    """
+    n = topology.n
+    k = max(1, min(int(k), n)) if n else 1
+    owner = np.zeros(n, dtype=np.int64)
+    if k == 1 or n == 0:
+        return owner
+    order = _bfs_order(topology, _bfs_order(topology, 0)[-1])
+    owner[order] = np.arange(n) * k // n
+
+    sizes = np.bincount(owner, minlength=k)
+    cap = int(np.ceil(n / k * (1 + imbalance)))
+    floor = int(np.floor(n / k * (1 - imbalance)))
+    offsets, neighbors = topology.offsets, topology.neighbors
+    for _ in range(passes):
+        moved = 0
+        for u in order:
+            parts = owner[neighbors[offsets[u]:offsets[u + 1]]]
+            if parts.size == 0:
+                continue
+            own = owner[u]
+            counts = np.bincount(parts, minlength=k)
+            best = int(counts.argmax())
+            if best == own or counts[best] <= counts[own]:
+                continue
+            if sizes[best] >= cap or sizes[own] <= floor:
+                continue
+            owner[u] = best
+            sizes[best] += 1
+            sizes[own] -= 1
+            moved += 1
+        if not moved:
+            break
+    return owner
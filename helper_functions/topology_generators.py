@@ -0,0 +1,267 @@
+import numpy as np
+
+from helper_classes import Topology
+
+FAMILIES = ("random", "small_world", "scale_free")
+
+
+def _degree(n, src, dst):
+    return np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+
+
+def _simple(n, src, dst):
+    """Drop self-loops and duplicate links (result is sorted by (lo, hi))."""
+    lo = np.minimum(src, dst)
+    hi = np.maximum(src, dst)
+    keep = lo != hi
+    keys = np.sort(lo[keep] * n + hi[keep])
+    if keys.size:
+        keys = keys[np.append(True, keys[1:] != keys[:-1])]
+    return keys // n, keys % n
+
+
+def _even_sum(target, max_deg):
+    """Nudge one degree so the stub count is even."""
+    if target.sum() % 2:
+        below = np.flatnonzero(target < max_deg)
+        if below.size:
+            target[below[0]] += 1
+        else:
+            target[0] -= 1
+    return target
+
+
+def _pair_stubs(n, stubs, rng):
+    rng.shuffle(stubs)
+    stubs = stubs[: stubs.size - (stubs.size % 2)]
+    return stubs[0::2], stubs[1::2]
+
+
+def _configuration_model(n, target, rng, rounds=8):
+    """
+    Pair degree stubs at random, then re-pair the stubs lost to self-loops and
+    duplicates a few times. Nodes end up at or slightly below their target.
+    """
+    src, dst = _pair_stubs(n, np.repeat(np.arange(n), target), rng)
+    src, dst = _simple(n, src, dst)
+    for _ in range(rounds):
+        deficit = target - _degree(n, src, dst)
+        if deficit.sum() < 2:
+            break
+        s, d = _pair_stubs(n, np.repeat(np.arange(n), deficit), rng)
+        src, dst = _simple(n, np.concatenate((src, s)), np.concatenate((dst, d)))
+    return src, dst
+
+
+def _top_up(n, src, dst, min_deg, max_deg, rng):
+    """
+    Raise the few nodes still below min_deg. In order of preference a short
+    node u is linked to a random node with spare degree, spliced into a link,
+    (x, y) -> (u, x) + (u, y), shares a link with another short node v,
+    (x, y) -> (u, x) + (v, y), or takes over one end of a link whose other
+    endpoint can afford to lose it, (x, y) -> (u, x).
+    """
+    deg = _degree(n, src, dst)
+
+    def closed_nbhd(u):
+        incident = (src == u) | (dst == u)
+        taken = np.zeros(n, dtype=bool)
+        taken[src[incident]] = True
+        taken[dst[incident]] = True
+        taken[u] = True
+        return taken
+
+    for u in np.flatnonzero(deg < min_deg).tolist():
+        while deg[u] < min_deg:
+            near_u = closed_nbhd(u)
+            free = np.flatnonzero(~near_u & (deg < max_deg))
+            if free.size:
+                v = int(rng.choice(free))
+                src = np.append(src, u)
+                dst = np.append(dst, v)
+                deg[u] += 1
+                deg[v] += 1
+                continue
+
+            if min_deg - deg[u] >= 2:
+                cand = np.flatnonzero(~near_u[src] & ~near_u[dst])
+                if cand.size:
+                    e = int(rng.choice(cand))
+                    src = np.append(src, u)
+                    dst = np.append(dst, dst[e])
+                    dst[e] = u
+                    deg[u] += 2
+                    continue
+
+            others = np.flatnonzero(deg < min_deg)
+            others = others[others != u]
+            if others.size:
+                v = int(others[0])
+                near_v = closed_nbhd(v)
+                fwd = ~near_u[src] & ~near_v[dst]
+                rev = ~near_u[dst] & ~near_v[src]
+                cand = np.flatnonzero(fwd | rev)
+                if cand.size:
+                    e = int(rng.choice(cand))
+                    x, y = (src[e], dst[e]) if fwd[e] else (dst[e], src[e])
+                    src[e], dst[e] = u, x
+                    src = np.append(src, v)
+                    dst = np.append(dst, y)
+                    deg[u] += 1
+                    deg[v] += 1
+                    continue
+
+            fwd = ~near_u[src] & (dst != u) & (deg[dst] > min_deg)
+            rev = ~near_u[dst] & (src != u) & (deg[src] > min_deg)
+            cand = np.flatnonzero(fwd | rev)
+            if cand.size == 0:
+                raise RuntimeError(f"cannot give peer {u} degree {min_deg} with max_deg={max_deg}")
+            e = int(rng.choice(cand))
+            x, y = (src[e], dst[e]) if fwd[e] else (dst[e], src[e])
+            src[e], dst[e] = u, x
+            deg[u] += 1
+            deg[y] -= 1
+    return src, dst
+
+
+def connected_components(n, src, dst):
+    """Return a component label (its smallest node id) for every node."""
+    parent = np.arange(n)
+    while True:
+        ps, pd = parent[src], parent[dst]
+        lo = np.minimum(ps, pd)
+        hi = np.maximum(ps, pd)
+        cross = lo != hi
+        if not cross.any():
+            return parent
+        # hook roots onto smaller roots, then compress to full depth
+        np.minimum.at(parent, hi[cross], lo[cross])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def _connect(n, src, dst, max_deg, rng, max_rounds=64):
+    """
+    Merge components pairwise without breaking the degree bound: two
+    components are joined by a new link between nodes with spare degree, by
+    swapping one link from each, (a, b) + (x, y) -> (a, x) + (b, y), which
+    keeps every degree unchanged, or by splicing a node with two spare slots
+    into the other component's link, (x, y) -> (x, s) + (s, y).
+    """
+    for _ in range(max_rounds):
+        labels = connected_components(n, src, dst)
+        roots, comp = np.unique(labels, return_inverse=True)
+        k = roots.size
+        if k <= 1:
+            return src, dst
+
+        # one random spare-degree node per component (-1 when none)
+        deg = _degree(n, src, dst)
+        slack = np.append(max_deg - deg, 0)
+        nodes = rng.permutation(n)
+        nodes = nodes[deg[nodes] < max_deg]
+        spare = np.full(k, -1, dtype=np.int64)
+        spare[comp[nodes]] = nodes
+
+        # one random link per component (-1 when none)
+        edges = rng.permutation(src.size)
+        link = np.full(k, -1, dtype=np.int64)
+        link[comp[src[edges]]] = edges
+
+        order = rng.permutation(k)
+        a, b = order[0:k - 1:2], order[1:k:2]
+        add = (spare[a] >= 0) & (spare[b] >= 0)
+        swap = ~add & (link[a] >= 0) & (link[b] >= 0)
+        # splice: orient the pair so that a holds the two-slot node and b the link
+        rest = ~add & ~swap
+        flip = rest & (slack[spare[b]] >= 2) & (link[a] >= 0)
+        a[flip], b[flip] = b[flip], a[flip]
+        splice = rest & (slack[spare[a]] >= 2) & (link[b] >= 0)
+
+        new_src = [spare[a[add]]]
+        new_dst = [spare[b[add]]]
+        ea, eb = link[a[swap]], link[b[swap]]
+        new_src += [src[ea], dst[ea]]
+        new_dst += [src[eb], dst[eb]]
+        s, es = spare[a[splice]], link[b[splice]]
+        new_src += [src[es], s]
+        new_dst += [s, dst[es]]
+        keep = np.ones(src.size, dtype=bool)
+        keep[ea] = False
+        keep[eb] = False
+        keep[es] = False
+        src = np.concatenate([src[keep]] + new_src)
+        dst = np.concatenate([dst[keep]] + new_dst)
+    raise RuntimeError(f"graph still disconnected after {max_rounds} repair rounds")
+
+
+def random_bounded_degree_edges(n, min_deg, max_deg, rng):
+    """Configuration model on degrees drawn uniformly from [min_deg, max_deg]."""
+    target = _even_sum(rng.integers(min_deg, max_deg + 1, size=n), max_deg)
+    return _configuration_model(n, target, rng)
+
+
+def small_world_edges(n, k, p, rng):
+    """
+    Watts-Strogatz ring lattice (k nearest neighbours) with a fraction p of
+    the links rewired. Rewiring permutes the far endpoints of the chosen links,
+    so every node keeps degree k apart from the rare loop/duplicate dropped.
+    """
+    half = max(1, k // 2)
+    base = np.arange(n)
+    src = np.repeat(base, half)
+    dst = (src + np.tile(np.arange(1, half + 1), n)) % n
+    rewire = np.flatnonzero(rng.random(src.size) < p)
+    dst[rewire] = dst[rng.permutation(rewire)]
+    return _simple(n, src, dst)
+
+
+def scale_free_edges(n, min_deg, max_deg, rng, gamma=2.5):
+    """Configuration model on a power-law degree sequence clipped to [min_deg, max_deg]."""
+    raw = min_deg * rng.random(n) ** (-1.0 / (gamma - 1.0))
+    target = _even_sum(np.clip(np.floor(raw), min_deg, max_deg).astype(np.int64), max_deg)
+    return _configuration_model(n, target, rng)
+
+
+def generate_p2p_edges(n, family="random", min_deg=3, max_deg=8, seed=None, **kwargs):
+    """
+    Return (src, dst) arrays of a connected graph on peers 0..n-1 whose
+    degrees stay within [min_deg, max_deg].
+
+    family is one of FAMILIES; small_world accepts k (lattice degree, defaults
+    to min_deg rounded up to even) and p (rewiring probability, 0.1), and
+    scale_free accepts gamma (power-law exponent, 2.5).
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"unknown family {family!r}, expected one of {FAMILIES}")
+    if not 0 <= min_deg <= max_deg:
+        raise ValueError("need 0 <= min_deg <= max_deg")
+    if n > 2 and max_deg < 2:
+        raise ValueError("max_deg must be at least 2 for a connected graph of more than 2 peers")
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    if n <= 1:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    min_deg = min(min_deg, n - 1)
+    max_deg = min(max_deg, n - 1)
+    if family == "random":
+        src, dst = random_bounded_degree_edges(n, min_deg, max_deg, rng)
+    elif family == "small_world":
+        k = kwargs.get("k", min_deg + (min_deg % 2))
+        k = min(max(k, 2), max_deg - (max_deg % 2) or 2)
+        src, dst = small_world_edges(n, k, kwargs.get("p", 0.1), rng)
+    else:
+        src, dst = scale_free_edges(n, max(min_deg, 1), max_deg, rng, kwargs.get("gamma", 2.5))
+
+    src, dst = _top_up(n, src, dst, min_deg, max_deg, rng)
+    return _connect(n, src, dst, max_deg, rng)
+
+
+def generate_p2p_topology(n, family="random", min_deg=3, max_deg=8, seed=None, **kwargs):
+    """Generate a connected bounded-degree graph straight into a Topology (no networkx)."""
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    src, dst = generate_p2p_edges(n, family, min_deg, max_deg, seed=rng, **kwargs)
+    return Topology.from_edges(n, src, dst, rng=rng)
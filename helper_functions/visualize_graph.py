@@ -1,7 +1,8 @@
-import networkx as nx 
-import matplotlib.pyplot as plt  
-
 def visualize_graph(G, output_image="network.png"):
+    # plotting stack is only imported when a picture is actually drawn
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 10))
     pos = nx.spring_layout(G, seed=42)
     nx.draw_networkx_nodes(G, pos, node_size=100, node_color="skyblue", edgecolors="black")
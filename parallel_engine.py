@@ -0,0 +1,423 @@
+# parallel_engine.py
+#
+# Conservative parallel discrete-event simulation of race-mode runs:
+#
+#   sim = ParallelSimulator(G, workers=8, seed=1, Ttx=10.0, I=12.0)
+#   sim.run(end_time=3600)
+#   sim.close()
+#
+# EXPERIMENTAL: no measured speedup over the sequential engine yet, so
+# nothing else in the tree uses it and constructing one warns. Keep runs on
+# Simulator(mining="race", engine="compact") until a multi-core benchmark
+# shows a gain:
+#
+#   python parallel_engine.py --n 500 --end-time 120 --workers 1 2 4 8 16
+#
+# Measured so far on a 1-CPU Xeon VM only, Python 3.11, Ttx=20, I=12 (wall
+# seconds, speedup over the sequential compact engine in brackets):
+#
+#   n=200, 120 s   seq 7.1   1 worker 6.9 (1.02)  2: 14.5 (0.49)  4: 18.4 (0.39)
+#   n=500, 120 s   seq 63.2  1 worker 66.7 (0.95)  2: 103.0 (0.61)  4: 134.9 (0.47)
+#
+# With one core the shards cannot overlap, so every extra worker only adds
+# window synchronisation: ~7.4k windows at 2 workers (n=200), each one a
+# pipe round trip. The lookahead is the shortest cut link (16 ms there, the
+# median cut link being 250 ms), and bounding each shard pair by its own
+# shortest path instead only saved 1% of the windows. Fewer windows need a
+# partition that keeps short links inside shards.
+#
+# Peers are split into shards (partition_topology), each owned by a worker
+# process running a ShardSimulator: a full Simulator whose event queue only
+# holds events of its own peers. A TX_RECV/BLOCK_RECV for a peer of another
+# shard goes to an outbox instead, and the driver delivers it before that
+# shard's next window.
+#
+# Lookahead: a message sent at t over a link crossing shards lands no
+# earlier than t + L, L being the smallest cross-shard link delay. So when
+# the earliest pending event anywhere is at T, every shard can process its
+# events in [T, T + L) independently. Windows also stop at the next mining
+# time. Race mode draws one network-wide timer and a winner, and both
+# depend only on global state, so every shard holds the same timer. At a
+# mining time the owner of the winner mines the block, and every other
+# shard applies the block's network-wide effects (ledger, canonical chain,
+# season, retarget, next timer) itself. Global state is therefore
+# replicated, not merged; the exceptions are a peer's tip, its tx draw
+# count, and its ledger balance whose debits (tx creation) only happen at the
+# sender's shard, so these are read back from the shard that owns the peer.
+#
+# Peers draw their txs from per-peer random streams and blocks are mined
+# in a fixed global order, so a run matches Simulator(mining="race",
+# engine="compact") with the same seed, whatever the number of workers.
+import argparse
+import heapq
+import multiprocessing as mp
+import os
+import random
+import sys
+import time as _time
+import warnings
+
+import numpy as np
+
+from helper_classes import Topology
+from helper_functions import edge_cut, generate_p2p_topology, partition_topology
+from Simulator import GOSSIP_COUNTERS, MINING_RACE, Simulator
+
+INF = float("inf")
+
+
+class ShardSimulator(Simulator):
+    """The slice of a race-mode Simulator that owns the peers with owner[pid] == shard."""
+
+    def __init__(self, G, owner, shard, **kwargs):
+        self._owner = [int(o) for o in owner]
+        self.shard = shard
+        self.outbox = []
+        self.race_time = INF
+        self.race_processed = 0
+        # while replicating global work, events for other shards' peers are
+        # dropped: their owners schedule the same events themselves
+        self._replicating = True
+        super().__init__(G, engine="compact", mining="race", chain_backend=False, **kwargs)
+        self._replicating = False
+
+    def owns(self, pid):
+        return self._owner[pid] == self.shard
+
+    def _schedule_compact(self, t, code, pid, data=None, src=None):
+        if pid < 0 or self._owner[pid] == self.shard:
+            if code == MINING_RACE:
+                self.race_time = t
+            heapq.heappush(self.event_queue, (t, next(self._seq), code, pid, data, src))
+        elif not self._replicating:
+            self.outbox.append((t, code, pid, data, src))
+
+    def _restart_race(self, t):
+        self.race_time = INF
+        super()._restart_race(t)
+
+    def _settle_block(self, idx, t):
+        self._replicating = True
+        try:
+            super()._settle_block(idx, t)
+        finally:
+            self._replicating = False
+
+    def _handle_mining_race(self, t, pid, gen, src=None):
+        self.race_processed += 1
+        self.mining_pops += 1
+        if gen != self._race_gen:
+            self.stale_pops += 1
+            self._stale_pending -= 1
+            return
+        self._race_pending = False
+        tree = self.hash_tree
+        winner = tree.find(self._race_u() * tree.total)
+        if self.owns(winner):
+            self._mine_block(self.peers[winner], t)
+            self.mined = self.block_store.blocks[-1]
+        else:
+            self.mined = None
+
+    # --- driver commands ---
+    def status(self):
+        queue = self.event_queue
+        return queue[0][0] if queue else INF, self.race_time
+
+    def step(self, inbox, end, apply=None, single=False):
+        """
+        Apply a block mined elsewhere, take delivered messages, then process
+        every event with t < end (or just the first one when single is set).
+        Returns (outbox, next event time, race time, block mined here or None,
+        events processed, time of the last one).
+        """
+        if apply is not None:
+            block, t = apply
+            self.time = t
+            self._settle_block(self.block_store.add(block), t)
+        push, seq, queue = heapq.heappush, self._seq, self.event_queue
+        for t, code, pid, data, src in inbox:
+            push(queue, (t, next(seq), code, pid, data, src))
+        self.outbox = []
+        self.mined = None
+        table = self._dispatch_table
+        pop = heapq.heappop
+        processed = 0
+        last = None
+        while queue and queue[0][0] < end:
+            t, _, code, pid, data, src = pop(queue)
+            self.time = last = t
+            table[code](t, pid, data, src)
+            processed += 1
+            if single:
+                break
+        self.events_processed += processed
+        return (self.outbox, *self.status(), self.mined, processed, last)
+
+    def collect(self, with_globals):
+        """Owned peers, plus the replicated global state when with_globals is set."""
+        owned = [pid for pid in self.peers if self.owns(pid)]
+        table = self.peer_table
+        out = {"peers": {pid: self.peers[pid] for pid in owned},
+               "owned": owned, "balance": table.balance[owned], "tip": table.tip[owned],
+               "tx_draws": table.tx_draws[owned],
+               "tx_counter": self.tx_counter,
+               "events": self.events_processed - self.race_processed,
+               "race_events": self.race_processed,
+               "mining_pops": self.mining_pops, "stale_pops": self.stale_pops,
+               "gossip": {name: getattr(self, name) for name in GOSSIP_COUNTERS},
+               "analytics": self.analytics}
+        if with_globals:
+            out.update({name: getattr(self, name) for name in ParallelSimulator.GLOBALS})
+        return out
+
+
+def _shard_main(conn, topology, owner, shard, kwargs):
+    # trace records written to stdout would repeat once per shard
+    sys.stdout = open(os.devnull, "w")
+    sim = ShardSimulator(topology, owner, shard, **kwargs)
+    conn.send(sim.status())
+    while True:
+        cmd, args = conn.recv()
+        if cmd == "step":
+            conn.send(sim.step(*args))
+        elif cmd == "collect":
+            conn.send(sim.collect(*args))
+        else:
+            break
+    conn.close()
+
+
+class ParallelSimulator:
+    """
+    Race-mode Simulator run over `workers` processes (experimental: slower
+    than the sequential engine so far, see the module notes). Takes the
+    Simulator keyword arguments (engine, mining and chain_backend are
+    fixed), plus an optional precomputed owner array (peer -> shard). After
+    run(), the usual result attributes (peers, block_store, ledger,
+    canonical_tip, ...) hold the merged state.
+    """
+
+    # Simulator arguments every shard sets itself
+    FIXED = ("engine", "mining", "chain_backend")
+    GLOBALS = ("block_store", "peer_table", "confirmed_txs", "canonical_index", "reorg_count", "reinstated_txs",
+               "block_counter", "season_block_counter", "D", "logs", "seed")
+
+    def __init__(self, G, workers=2, owner=None, seed=None, **kwargs):
+        fixed = sorted(set(kwargs) & set(self.FIXED))
+        if fixed:
+            raise ValueError(f"parallel runs are always engine='compact', mining='race', chain_backend=False; "
+                             f"drop {', '.join(fixed)}")
+        warnings.warn("ParallelSimulator is experimental and has not beaten the sequential engine yet",
+                      stacklevel=2)
+        topology = G if isinstance(G, Topology) else Topology.from_networkx(G)
+        if seed is None:
+            # same default as Simulator: drawn from the global random module
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.topology = topology
+        self.owner = partition_topology(topology, workers) if owner is None else np.asarray(owner)
+        self.workers = int(self.owner.max()) + 1 if topology.n else 1
+        # smallest cross-shard link delay (slow senders only lengthen it)
+        senders = np.repeat(np.arange(topology.n), np.diff(topology.offsets))
+        cross = self.owner[senders] != self.owner[topology.neighbors]
+        self.lookahead = float(topology.base_delay[cross].min()) if cross.any() else INF
+        if self.lookahead <= 0:
+            raise ValueError("parallel runs need positive link delays between shards")
+
+        self.time = 0.0
+        self.windows = 0
+        self.run_wall_time = 0.0
+        self._conns, self._procs = [], []
+        for shard in range(self.workers):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_shard_main, args=(child, topology, self.owner, shard,
+                                                        dict(kwargs, seed=seed)), daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._status = [conn.recv() for conn in self._conns]
+        self._inbox = [[] for _ in range(self.workers)]
+
+    def _step(self, shards, end, apply=None, single=False):
+        """Run step on the given shards in parallel and route their outboxes."""
+        for s in shards:
+            inbox, self._inbox[s] = self._inbox[s], []
+            self._conns[s].send(("step", (inbox, end, apply, single)))
+        mined = None
+        owner = self.owner
+        for s in shards:
+            outbox, next_t, race_t, block, processed, last = self._conns[s].recv()
+            self._status[s] = (next_t, race_t)
+            if last is not None and last > self.time:
+                self.time = last
+            if block is not None:
+                mined = (block, s)
+            for msg in outbox:
+                self._inbox[owner[msg[2]]].append(msg)
+        return mined
+
+    def _next_time(self, s):
+        next_t = self._status[s][0]
+        inbox = self._inbox[s]
+        if inbox:
+            next_t = min(next_t, min(msg[0] for msg in inbox))
+        return next_t
+
+    def _mine(self, race_t):
+        """
+        Mining barrier: race_t is the earliest pending event, so the live
+        mining event tops every shard's queue. All shards pop it and draw the
+        same winner; the winner's owner mines and the others then settle its
+        block (two round trips).
+        """
+        everyone = range(self.workers)
+        mined = self._step(everyone, INF, single=True)
+        self.time = max(self.time, race_t)
+        if mined is not None:
+            block, owner_shard = mined
+            self._step([s for s in everyone if s != owner_shard], -INF, apply=(block, race_t))
+
+    def run(self, end_time):
+        """Process events until none are left or time exceeds end_time (like Simulator.run)."""
+        started = _time.perf_counter()
+        shards = range(self.workers)
+        while True:
+            next_times = [self._next_time(s) for s in shards]
+            race_t = self._status[0][1]
+            earliest = min(next_times)
+            if earliest == INF:
+                break
+            if self.time >= end_time:
+                break
+            if earliest >= end_time:
+                # Simulator.run also handles the first event at or past end_time
+                if race_t <= earliest:
+                    self._mine(race_t)
+                else:
+                    first = next_times.index(earliest)
+                    self._step([first], INF, single=True)
+                break
+            if race_t <= earliest:
+                self._mine(race_t)
+                continue
+            end = min(earliest + self.lookahead, race_t, end_time)
+            self.windows += 1
+            self._step([s for s in shards if next_times[s] < end], end)
+        self.run_wall_time += _time.perf_counter() - started
+        self._collect()
+
+    def _collect(self):
+        for s, conn in enumerate(self._conns):
+            conn.send(("collect", (s == 0,)))
+        parts = [conn.recv() for conn in self._conns]
+        for name in self.GLOBALS:
+            setattr(self, name, parts[0][name])
+        table = self.peer_table
+        self.peers = {}
+        for part in parts:
+            table.balance[part["owned"]] = part["balance"]
+            table.tip[part["owned"]] = part["tip"]
+            table.tx_draws[part["owned"]] = part["tx_draws"]
+            for pid, peer in part["peers"].items():
+                peer.store, peer.table = self.block_store, table
+                self.peers[pid] = peer
+        self.peers = dict(sorted(self.peers.items()))
+        self.tx_counter = sum(part["tx_counter"] for part in parts)
+        # the mining timer is replicated: count its events once
+        self.events_processed = sum(part["events"] for part in parts) + parts[0]["race_events"]
+        for name in GOSSIP_COUNTERS:
+            setattr(self, name, sum(part["gossip"][name] for part in parts))
+        self.mining_pops = parts[0]["mining_pops"]
+        self.stale_pops = parts[0]["stale_pops"]
+        # chain metrics are replicated; block arrivals are seen by the owner shards
+        self.analytics = parts[0]["analytics"]
+        if self.analytics is not None:
+            for part in parts[1:]:
+                self.analytics.merge_propagation(part["analytics"])
+
+    @property
+    def ledger(self):
+        return self.peer_table.column("balance")
+
+    @property
+    def season_scores(self):
+        return self.peer_table.column("season_score")
+
+    @property
+    def blocks(self):
+        return self.block_store
+
+    @property
+    def canonical_tip(self):
+        return self.block_store.id_of(self.canonical_index)
+
+    @property
+    def events_per_sec(self):
+        return self.events_processed / self.run_wall_time if self.run_wall_time > 0 else 0.0
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(("close", ()))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._conns, self._procs = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(n=500, end_time=120.0, workers=(1, 2, 4), seed=1, graph_seed=1, **kwargs):
+    """
+    Wall time of one race-mode run, sequential and then for each worker
+    count. Returns rows of {"workers", "wall", "speedup", "windows",
+    "edge_cut", "same"}; workers 0 is the sequential engine and same tells
+    whether a parallel run mined the same blocks and ledger.
+    """
+    topology = generate_p2p_topology(n, seed=graph_seed)
+    started = _time.perf_counter()
+    seq = Simulator(topology, mining="race", engine="compact", chain_backend=False, seed=seed, **kwargs)
+    seq.run(end_time)
+    base = _time.perf_counter() - started
+    expected = ([b.id for b in seq.block_store.blocks], seq.ledger)
+    rows = [{"workers": 0, "wall": base, "speedup": 1.0, "windows": 0, "edge_cut": 0, "same": True}]
+    for k in workers:
+        # process start-up and the final collect are part of the cost
+        started = _time.perf_counter()
+        with ParallelSimulator(topology, workers=k, seed=seed, **kwargs) as par:
+            par.run(end_time)
+        wall = _time.perf_counter() - started
+        rows.append({"workers": k, "wall": wall, "speedup": base / wall, "windows": par.windows,
+                     "edge_cut": edge_cut(topology, par.owner),
+                     "same": ([b.id for b in par.block_store.blocks], par.ledger) == expected})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel race-mode speedup benchmark")
+    parser.add_argument("--n", type=int, default=500)
+    parser.add_argument("--end-time", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--Ttx", type=float, default=20.0)
+    parser.add_argument("--I", type=float, default=12.0)
+    args = parser.parse_args(argv)
+
+    rows = benchmark(args.n, args.end_time, args.workers, args.seed, Ttx=args.Ttx, I=args.I)
+    print(f"{'workers':>8} {'wall s':>9} {'speedup':>8} {'windows':>8} {'cut':>7}  same")
+    for row in rows:
+        label = row["workers"] or "seq"
+        print(f"{label:>8} {row['wall']:9.2f} {row['speedup']:8.2f} {row['windows']:8} {row['edge_cut']:7}  {row['same']}")
+
+
+if __name__ == "__main__":
+    main()
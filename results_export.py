@@ -0,0 +1,194 @@
+# results_export.py
+#
+# Columnar export of a finished run, in place of Simulator.write_results'
+# one-line-per-arrival text dump:
+#
+#   export_results(sim, "run.npz")
+#   res = load_results("run.npz")
+#   res["arrival"][peer, block]     # first-seen time, nan if never seen
+#
+# The file is an ordinary .npz (np.load reads it too) holding
+#
+#   block_id, block_parent, block_miner, block_height, block_txs,
+#   block_time, block_canonical                 one row per stored block
+#   arrival                                     peers x blocks float64
+#   peer_balance, peer_hash_power, peer_is_fast, peer_is_high_cpu, peer_tip,
+#   peer_known, peer_mined, peer_mempool_txs, peer_mempool_bytes
+#   sim_time, seed
+#
+# Block numbers are positions in the block store (genesis is 0), so
+# block_parent and peer_tip index the block columns. The arrival matrix is
+# streamed into the archive a few peer rows at a time, so exporting never
+# builds it in memory. With compress=False members are stored uncompressed
+# and load_results memory-maps them instead of reading them.
+#
+# Benchmark against the text dump: python results_export.py --n 1000
+import argparse
+import os
+import struct
+import time as _time
+import zipfile
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def _write_array(zf, name, array):
+    with zf.open(name + ".npy", "w", force_zip64=True) as f:
+        np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+
+
+def _write_rows(zf, name, dtype, shape, chunks):
+    """Write an array member of the given shape from an iterable of row chunks."""
+    dtype = np.dtype(dtype)
+    header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape}
+    with zf.open(name + ".npy", "w", force_zip64=True) as f:
+        np.lib.format.write_array_header_2_0(f, header)
+        for chunk in chunks:
+            f.write(np.ascontiguousarray(chunk, dtype=dtype).tobytes())
+
+
+def _arrival_chunks(peers, n_blocks, chunk_rows):
+    for start in range(0, len(peers), chunk_rows):
+        part = peers[start:start + chunk_rows]
+        rows = np.full((len(part), n_blocks), NAN)
+        for k, peer in enumerate(part):
+            known = np.frombuffer(peer.arrival, dtype=np.float64)[:n_blocks]
+            rows[k, :known.size] = known
+        yield rows
+
+
+def export_results(sim, path, compress=True, chunk_rows=256):
+    """Write sim's blocks, arrival matrix and peer summaries to path (.npz). Returns path."""
+    store = sim.block_store
+    n_blocks = len(store.blocks)
+    peers = [sim.peers[pid] for pid in sorted(sim.peers)]
+    table = sim.peer_table
+
+    miner = np.fromiter((b.miner for b in store.blocks), dtype=np.int64, count=n_blocks)
+    mined_at = np.zeros(n_blocks)
+    for i, m in enumerate(miner.tolist()):
+        if m >= 0:
+            mined_at[i] = sim.peers[m].arrival[i]
+    canonical = np.zeros(n_blocks, dtype=bool)
+    i = sim.canonical_index
+    while i >= 0:
+        canonical[i] = True
+        i = store.parent[i]
+
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", compression=mode, allowZip64=True) as zf:
+        columns = {
+            "block_id": np.array([b.id for b in store.blocks]),
+            "block_parent": np.frombuffer(store.parent, dtype=store.parent.typecode),
+            "block_miner": miner,
+            "block_height": np.frombuffer(store.height, dtype=store.height.typecode),
+            "block_txs": np.fromiter((len(b.txns) for b in store.blocks), dtype=np.int64, count=n_blocks),
+            "block_time": mined_at,
+            "block_canonical": canonical,
+            "peer_balance": table.balance,
+            "peer_hash_power": table.hash_power,
+            "peer_is_fast": table.is_fast,
+            "peer_is_high_cpu": table.is_high_cpu,
+            "peer_tip": table.tip,
+            "peer_known": np.array([p.known_count for p in peers], dtype=np.int64),
+            "peer_mined": np.array([len(p.mined_blocks) for p in peers], dtype=np.int64),
+            "peer_mempool_txs": np.array([len(p.mempool) for p in peers], dtype=np.int64),
+            "peer_mempool_bytes": np.array([p.mempool.bytes for p in peers], dtype=np.int64),
+            "sim_time": np.float64(sim.time),
+            "seed": np.array(str(sim.seed)),
+        }
+        for name, column in columns.items():
+            _write_array(zf, name, column)
+        _write_rows(zf, "arrival", np.float64, (len(peers), n_blocks),
+                    _arrival_chunks(peers, n_blocks, chunk_rows))
+    return path
+
+
+def _stored_offset(f, info):
+    """File offset of a stored member's data (after its local zip header)."""
+    f.seek(info.header_offset)
+    local = f.read(30)
+    name_len, extra_len = struct.unpack("<HH", local[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def load_results(path, mmap=True):
+    """
+    {name: array} of an exported run. Members stored uncompressed are
+    memory-mapped read-only when mmap is set; compressed ones are read.
+    """
+    out = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                f.seek(_stored_offset(f, info))
+                version = np.lib.format.read_magic(f)
+                read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) \
+                    else np.lib.format.read_array_header_2_0
+                shape, fortran, dtype = read_header(f)
+                if not dtype.hasobject and 0 not in shape:
+                    out[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=f.tell(),
+                                          order="F" if fortran else "C")
+                    continue
+            with zf.open(info) as member:
+                out[name] = np.lib.format.read_array(member, allow_pickle=False)
+    for name in ("sim_time", "seed"):
+        if name in out:
+            out[name] = out[name][()]
+    return out
+
+
+def benchmark(n=1000, end_time=1200.0, out_dir=".", seed=1, **kwargs):
+    """
+    Export time and file size of the text dump (write_results) against the
+    npz export, compressed and stored, for one race-mode run of n peers.
+    """
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+
+    sim = Simulator(generate_p2p_topology(n, seed=seed), engine="compact", mining="race", seed=seed,
+                    chain_backend=False, **kwargs)
+    sim.run(end_time)
+    rows = []
+    for label, write, target in (
+            ("text", lambda p: sim.write_results(p), "results.txt"),
+            ("npz", lambda p: export_results(sim, p), "results.npz"),
+            ("npz stored", lambda p: export_results(sim, p, compress=False), "results_stored.npz")):
+        target = os.path.join(out_dir, target)
+        started = _time.perf_counter()
+        write(target)
+        wall = _time.perf_counter() - started
+        load = None
+        if target.endswith(".npz"):
+            started = _time.perf_counter()
+            res = load_results(target)
+            float(np.nanmean(res["arrival"]))
+            load = _time.perf_counter() - started
+        rows.append({"format": label, "write_s": wall, "bytes": os.path.getsize(target), "load_s": load})
+        os.remove(target)
+    return sim, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text vs npz results export benchmark")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--end-time", type=float, default=1200.0)
+    parser.add_argument("--seed", type=int, default=1)
+    # few txs and fast blocks: the export size is driven by peers x blocks
+    parser.add_argument("--Ttx", type=float, default=5000.0)
+    parser.add_argument("--I", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    sim, rows = benchmark(args.n, args.end_time, seed=args.seed, Ttx=args.Ttx, I=args.I)
+    print(f"{len(sim.peers)} peers x {len(sim.block_store)} blocks")
+    print(f"{'format':>11} {'write s':>8} {'MB':>8} {'load s':>7}")
+    for row in rows:
+        load = "-" if row["load_s"] is None else f"{row['load_s']:.3f}"
+        print(f"{row['format']:>11} {row['write_s']:8.3f} {row['bytes'] / 1e6:8.2f} {load:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# submission_pipeline.py
+import threading
+import time
+from collections import deque
+
+from web3 import Web3
+
+from chain_client import ChainClient
+
+# what submit() does when the queue is full:
+#   "block"    - wait for room (the simulation slows to chain speed)
+#   "drop"     - discard the new submission
+#   "coalesce" - replace a queued submission with the same key in place,
+#                otherwise wait for room like "block"
+POLICIES = ("block", "drop", "coalesce")
+
+
+class SubmissionPipeline:
+    """
+    Background sender for on-chain calls made from inside the event loop.
+
+    submit() only enqueues. A sender thread builds each transaction through a
+    ChainClient (local nonces, cached gas/chain id), signs it and sends it
+    without waiting for the receipt. A collector thread then polls receipts
+    for the sent hashes, one JSON-RPC batch per round, taking turns over
+    everything in flight; a tx with no receipt receipt_timeout seconds after
+    it was sent (dropped or replaced) counts as failed. Jobs are sent
+    strictly in submission order, so every account's nonces, and therefore
+    its on-chain execution order, follow the order in which the simulator
+    submitted them.
+
+    Status lines and failures go to log(msg) (e.g. Simulator._log_onchain, which traces them).
+    """
+
+    def __init__(self, w3, maxsize=1024, policy="block", log=None,
+                 receipt_batch=32, poll_interval=0.2, receipt_timeout=120.0, client=None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy!r}, expected one of {POLICIES}")
+        self.w3 = w3
+        self.client = client if client is not None else ChainClient(w3)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.log = log or print
+        self.receipt_batch = receipt_batch
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+
+        self._queue = deque()          # jobs: [key, addr, pk, call, label]
+        self._inflight = deque()       # (tx_hash, label, send time) awaiting a receipt
+        self._cond = threading.Condition()
+        self._busy = 0                 # jobs taken off the queue but not yet sent
+        self._closed = False
+
+        self.submitted = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.confirmed = 0
+        self.reverted = 0
+
+        self._sender = threading.Thread(target=self._send_loop, name="onchain-sender", daemon=True)
+        self._collector = threading.Thread(target=self._receipt_loop, name="onchain-receipts", daemon=True)
+        self._sender.start()
+        self._collector.start()
+
+    # --- producer side (simulation thread) ---
+    def submit(self, sender_addr, sender_pk, call, label="tx", key=None):
+        """
+        Queue call for sender. call is a contract function (anything with
+        build_transaction) or a plain tx dict. key identifies submissions that
+        may replace each other under the "coalesce" policy. Returns False if
+        the submission was dropped.
+        """
+        job = [key, Web3.to_checksum_address(sender_addr), sender_pk, call, label]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("submission pipeline is closed")
+            self.submitted += 1
+            if len(self._queue) >= self.maxsize:
+                if self.policy == "drop":
+                    self.dropped += 1
+                    return False
+                if self.policy == "coalesce" and key is not None:
+                    for queued in self._queue:
+                        if queued[0] == key:
+                            queued[:] = job
+                            self.coalesced += 1
+                            return True
+                while len(self._queue) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            self._queue.append(job)
+            self._cond.notify_all()
+        return True
+
+    def pending(self):
+        """Jobs not yet confirmed: queued, being sent, or awaiting a receipt."""
+        with self._cond:
+            return len(self._queue) + self._busy + len(self._inflight)
+
+    def pending_labels(self):
+        """Labels of the jobs pending() counts, in queue then send order."""
+        with self._cond:
+            return [job[4] for job in self._queue] + [label for _, label, _ in self._inflight]
+
+    def flush(self, timeout=None):
+        """Wait until every submitted job has a receipt or has failed. Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while len(self._queue) + self._busy + len(self._inflight):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else self.poll_interval)
+        return True
+
+    def close(self, timeout=None):
+        """Drain outstanding work, then stop the worker threads."""
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._sender.join(timeout)
+        self._collector.join(timeout)
+        return drained
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "confirmed": self.confirmed,
+            "reverted": self.reverted,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "pending": self.pending(),
+        }
+
+    # --- sender thread ---
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                key, addr, pk, call, label = self._queue.popleft()
+                self._busy += 1
+                self._cond.notify_all()
+            try:
+                # the client resyncs and retries once on a nonce rejection
+                tx_hash = self.client.send(addr, pk, call, wait_receipt=False)
+            except Exception as e:
+                self.log(f"{label} onchain failed: {e}")
+                tx_hash = None
+            with self._cond:
+                self._busy -= 1
+                if tx_hash is None:
+                    self.failed += 1
+                else:
+                    self.sent += 1
+                    self._inflight.append((tx_hash, label, time.monotonic()))
+                self._cond.notify_all()
+
+    # --- receipt collector thread ---
+    def _receipt_loop(self):
+        while True:
+            with self._cond:
+                if self._closed and not self._inflight:
+                    return
+                # round robin: the polled entries move to the back, so a tx
+                # that never gets a receipt cannot starve the ones behind it
+                inflight = self._inflight
+                batch = [inflight[i] for i in range(min(self.receipt_batch, len(inflight)))]
+                inflight.rotate(-len(batch))
+            done = set()
+            confirmed = reverted = failed = 0
+            receipts = self.client.receipts([tx_hash for tx_hash, _, _ in batch]) if batch else []
+            now = time.monotonic()
+            for (tx_hash, label, sent_at), receipt in zip(batch, receipts):
+                if receipt is None:
+                    if now - sent_at >= self.receipt_timeout:
+                        failed += 1
+                        self.log(f"{label} onchain receipt failed: no receipt after {self.receipt_timeout:g} s")
+                        done.add(tx_hash)
+                    continue
+                if isinstance(receipt, Exception):
+                    failed += 1
+                    self.log(f"{label} onchain receipt failed: {receipt}")
+                    done.add(tx_hash)
+                    continue
+                if receipt.status == 1:
+                    confirmed += 1
+                else:
+                    reverted += 1
+                self.log(f"{label} onchain tx status: {receipt.status}")
+                done.add(tx_hash)
+            with self._cond:
+                self.confirmed += confirmed
+                self.reverted += reverted
+                self.failed += failed
+                if done:
+                    self._inflight = deque(item for item in self._inflight if item[0] not in done)
+                    self._cond.notify_all()
+                # keep polling promptly while there is a backlog, otherwise idle
+                if len(done) < len(batch) or not batch:
+                    self._cond.wait(self.poll_interval)
@@ -0,0 +1,247 @@
+# sweep.py
+#
+# Monte Carlo sweeps over Simulator configurations:
+#
+#   python sweep.py grid.json --replicates 16 --out sweep_results.csv
+#
+# grid.json maps parameter names to a value or a list of values (one grid
+# axis per list), e.g. {"n": [50, 200], "I": [6, 12, 60], "Ttx": 20,
+# "end_time": 3600}. Graph keys (GRAPH_KEYS) shape the generated topology,
+# end_time bounds the run and every other key is a Simulator argument.
+#
+# Each (grid point, replicate) runs in a worker process with its own seed,
+# and its summary row is appended to the results CSV as soon as it finishes.
+# Rows already in the CSV are skipped on restart, and summaries are also
+# cached by a hash of the full run config and of the simulator source, so
+# an identical run is never repeated, even across different sweeps, and a
+# code change that can alter results invalidates the cache by itself.
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import math
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+# bump to invalidate every cached summary for reasons the source hash
+# cannot see (e.g. a dependency upgrade)
+SWEEP_VERSION = 4
+ROOT = Path(__file__).resolve().parent
+# code that decides what a config produces (files, or packages of .py files)
+SOURCES = ("Simulator.py", "sweep.py", "helper_classes", "helper_functions")
+
+GRAPH_KEYS = ("n", "family", "min_deg", "max_deg", "graph_seed")
+DEFAULTS = {"n": 50, "family": "random", "min_deg": 3, "max_deg": 8, "end_time": 3600.0}
+
+METRICS = ("sim_time", "events", "wall_time", "blocks_mined", "canonical_height", "orphan_rate",
+           "reorgs", "txs", "txs_confirmed", "reward_tvd", "top_miner_share", "fast_peer_share",
+           "tx_relay_events", "tx_dup_ratio")
+
+
+def expand_grid(grid):
+    """[{param: value}] for every combination of the list-valued entries of grid."""
+    axes = {k: v if isinstance(v, (list, tuple)) else [v] for k, v in grid.items()}
+    names = sorted(axes)
+    return [dict(DEFAULTS, **dict(zip(names, values))) for values in itertools.product(*(axes[k] for k in names))]
+
+
+def replicate_seed(base_seed, replicate):
+    """
+    Seed of replicate r. It does not depend on the grid point, so the points
+    of one replicate share their random streams (common random numbers).
+    """
+    return int(np.random.SeedSequence([base_seed, replicate]).generate_state(1, np.uint64)[0])
+
+
+def source_hash(root=ROOT, sources=SOURCES):
+    """Content hash of the .py files under root that SOURCES names."""
+    digest = hashlib.sha256()
+    for name in sources:
+        path = root / name
+        for f in sorted(path.rglob("*.py")) if path.is_dir() else [path]:
+            digest.update(f.relative_to(root).as_posix().encode())
+            digest.update(f.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _current_source():
+    return source_hash()
+
+
+def config_key(config):
+    """Content hash of a complete run config (parameters plus seed) and of the simulator source."""
+    blob = json.dumps({"version": SWEEP_VERSION, "source": _current_source(), "config": config},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+
+def summarize(sim):
+    """Fork and reward-fairness figures of a finished Simulator run."""
+    store = sim.block_store
+    height = store.height[sim.canonical_index]
+    mined = sim.block_counter
+    # canonical blocks per miner (genesis is block number 0)
+    canonical = Counter()
+    i = sim.canonical_index
+    while i > 0:
+        canonical[store.blocks[i].miner] += 1
+        i = store.parent[i]
+    total_hash = sum(p.hash_power for p in sim.peers.values())
+    if height:
+        tvd = 0.5 * sum(abs(canonical[pid] / height - p.hash_power / total_hash) for pid, p in sim.peers.items())
+        top = max(canonical.values()) / height
+        fast = sum(c for pid, c in canonical.items() if sim.peers[pid].is_fast) / height
+    else:
+        tvd = top = fast = math.nan
+    return {
+        "sim_time": sim.time,
+        "events": sim.events_processed,
+        "wall_time": round(sim.run_wall_time, 4),
+        "blocks_mined": mined,
+        "canonical_height": height,
+        "orphan_rate": 1 - height / mined if mined else 0.0,
+        "reorgs": sim.reorg_count,
+        "txs": sim.tx_counter,
+        "txs_confirmed": len(sim.confirmed_txs),
+        "reward_tvd": tvd,
+        "top_miner_share": top,
+        "fast_peer_share": fast,
+        "tx_relay_events": sim.tx_relay_events,
+        "tx_dup_ratio": sim.tx_dup_deliveries / sim.tx_deliveries if sim.tx_deliveries else 0.0,
+    }
+
+
+def run_config(config):
+    """Build the topology and Simulator for config, run it and return summarize()."""
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+    from tracing import NullSink, Tracer
+
+    config = dict(config)
+    seed = config.pop("seed")
+    end_time = config.pop("end_time")
+    graph = {k: config.pop(k) for k in GRAPH_KEYS if k in config}
+    graph_seed = graph.pop("graph_seed", seed)
+    topology = generate_p2p_topology(graph.pop("n"), seed=graph_seed, **graph)
+    # sweeps stay offline whatever ONCHAIN says
+    config.setdefault("chain_backend", False)
+    # summarize() reads counters only; don't keep trace records in every worker
+    sim = Simulator(topology, seed=seed, tracer=Tracer(NullSink()), **config)
+    sim.run(end_time=end_time)
+    return summarize(sim)
+
+
+def _read_done(out, columns):
+    """Keys already in the results file (which must have the same columns)."""
+    if not out.exists() or out.stat().st_size == 0:
+        return set()
+    with out.open(newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames != columns:
+            raise ValueError(f"{out} has columns {reader.fieldnames}, this sweep writes {columns}")
+        return {row["key"] for row in reader}
+
+
+def run_sweep(grid, replicates=8, base_seed=0, out="sweep_results.csv", cache_dir=".sweep_cache",
+              workers=None, progress=None):
+    """
+    Run every grid point replicates times and stream one CSV row per run to
+    out. Returns the number of simulations actually run (cache misses).
+    progress(done, total) is called after each finished row.
+    """
+    points = expand_grid(grid)
+    params = sorted(set().union(*points))
+    columns = ["key", "point", "replicate", "seed", *params, *METRICS]
+    out = Path(out)
+    cache = Path(cache_dir) if cache_dir else None
+    if cache:
+        cache.mkdir(parents=True, exist_ok=True)
+    done = _read_done(out, columns)
+
+    runs = []
+    for p, point in enumerate(points):
+        for r in range(replicates):
+            config = dict(point, seed=replicate_seed(base_seed, r))
+            key = config_key(config)
+            if key not in done:
+                runs.append((key, p, r, config))
+    total = len(done) + len(runs)
+
+    fresh = out.stat().st_size == 0 if out.exists() else True
+    simulated = 0
+    with out.open("a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        if fresh:
+            writer.writeheader()
+
+        def write(key, p, r, config, summary):
+            writer.writerow({"key": key, "point": p, "replicate": r, **config, **summary})
+            f.flush()
+            done.add(key)
+            if progress:
+                progress(len(done), total)
+
+        todo = []
+        for key, p, r, config in runs:
+            hit = cache / f"{key}.json" if cache else None
+            if hit is not None and hit.exists():
+                write(key, p, r, config, json.loads(hit.read_text()))
+            else:
+                todo.append((key, p, r, config))
+        if not todo:
+            return 0
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_config, config): (key, p, r, config) for key, p, r, config in todo}
+            for future in as_completed(futures):
+                key, p, r, config = futures[future]
+                summary = future.result()
+                simulated += 1
+                if cache:
+                    tmp = cache / f"{key}.json.tmp"
+                    tmp.write_text(json.dumps(summary))
+                    tmp.replace(cache / f"{key}.json")
+                write(key, p, r, config, summary)
+    return simulated
+
+
+def load_results(path):
+    """The results CSV as {column: numpy array} (numeric columns as float, others as str)."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return {}
+    columns = {}
+    for name in rows[0]:
+        values = [row[name] for row in rows]
+        try:
+            columns[name] = np.array([float(v) for v in values])
+        except ValueError:
+            columns[name] = np.array(values)
+    return columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Simulator parameter sweep")
+    parser.add_argument("grid", help="JSON file: {param: value or [values]}")
+    parser.add_argument("--replicates", type=int, default=8)
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--out", default="sweep_results.csv")
+    parser.add_argument("--cache", default=".sweep_cache", help="summary cache directory ('' to disable)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    grid = json.loads(Path(args.grid).read_text())
+    simulated = run_sweep(grid, args.replicates, args.base_seed, args.out, args.cache or None, args.workers,
+                          progress=lambda d, t: print(f"\r{d}/{t} runs", end="", flush=True))
+    print(f"\n{simulated} simulated, results in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
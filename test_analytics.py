@@ -0,0 +1,85 @@
+# test_analytics.py
+# Incrementally kept chain metrics must agree with post-processing the finished run.
+import numpy as np
+import pytest
+
+from helper_classes import QuantileSketch
+from helper_functions import generate_p2p_topology
+from parallel_engine import ParallelSimulator
+from Simulator import Simulator
+from tracing import Tracer
+
+
+def _canonical_chain(sim):
+    store, chain = sim.block_store, []
+    i = sim.canonical_index
+    while i > 0:
+        chain.append(i)
+        i = store.parent[i]
+    return chain
+
+
+def _arrival_delays(sim):
+    store = sim.block_store
+    mined_at = {b.id: sim.peers[b.miner].block_arrival[b.id] for b in store.blocks if b.miner >= 0}
+    return [t - mined_at[blk] for peer in sim.peers.values() for blk, t in peer.block_arrival.items()
+            if blk in mined_at and store.blocks[store.index[blk]].miner != peer.id]
+
+
+@pytest.mark.parametrize("mining", ["race", "per_peer"])
+def test_running_metrics_match_post_processing(mining):
+    # short block interval against ~0.5 s propagation: plenty of forks and reorgs
+    sim = Simulator(generate_p2p_topology(60, seed=3), Ttx=20.0, I=1.0, mining=mining, engine="compact",
+                    seed=4, chain_backend=False, analytics=True, tracer=Tracer(categories=("reorg",)))
+    sim.run(end_time=300)
+    a = sim.analytics
+
+    chain = _canonical_chain(sim)
+    mined = len(sim.block_store) - 1
+    assert a.mined == mined and a.canonical_length == len(chain)
+    assert a.orphans == set(range(1, mined + 1)) - set(chain) and a.orphan_count > 0
+    assert a.stale_rate == pytest.approx(a.orphan_count / mined)
+    assert all(a.is_canonical(i) for i in chain)
+
+    depths = [r.values["depth"] for r in sim.tracer.records("reorg")]
+    assert a.reorg_count == sim.reorg_count == len(depths) > 0
+    assert a.reorg_histogram() == {d: depths.count(d) for d in sorted(set(depths))}
+    assert a.max_reorg_depth == max(depths)
+
+    miners = np.bincount([sim.block_store.blocks[i].miner for i in chain], minlength=len(sim.peers))
+    assert a.canonical_blocks.tolist() == miners.tolist()
+    assert a.reward_shares().sum() == pytest.approx(1.0)
+
+    delays = _arrival_delays(sim)
+    assert a.propagation.count == len(delays)
+    exact = np.quantile(delays, [0.5, 0.9, 0.99], method="inverted_cdf")
+    sketch = a.propagation_quantiles((0.5, 0.9, 0.99))
+    assert list(sketch.values()) == pytest.approx(exact.tolist(), rel=0.011)
+
+
+def test_sketch_error_bound_and_merge():
+    values = np.random.default_rng(0).lognormal(0.0, 2.0, 20_000)
+    whole, parts = QuantileSketch(), [QuantileSketch(), QuantileSketch()]
+    for k, x in enumerate(values.tolist()):
+        whole.add(x)
+        parts[k % 2].add(x)
+    q = (0.01, 0.25, 0.5, 0.9, 0.999)
+    exact = np.quantile(values, q, method="inverted_cdf")
+    assert list(whole.quantiles(q).values()) == pytest.approx(exact.tolist(), rel=0.011)
+    parts[0].merge(parts[1])
+    assert parts[0].quantiles(q) == whole.quantiles(q) and parts[0].count == whole.count
+    with pytest.raises(ValueError):
+        whole.merge(QuantileSketch(precision=0.05))
+
+
+@pytest.mark.filterwarnings("ignore:ParallelSimulator is experimental")
+def test_sharded_run_merges_analytics():
+    topology = generate_p2p_topology(30, seed=5)
+    kwargs = dict(seed=11, Ttx=5.0, I=2.0, analytics=True)
+    seq = Simulator(topology, mining="race", engine="compact", chain_backend=False, **kwargs)
+    seq.run(end_time=100)
+    with ParallelSimulator(topology, workers=2, **kwargs) as par:
+        par.run(end_time=100)
+    a, b = seq.analytics.summary(), par.analytics.summary()
+    assert a.pop("propagation_mean") == pytest.approx(b.pop("propagation_mean"))
+    assert a == b and a["propagation_samples"] > 0
@@ -0,0 +1,52 @@
+# test_bench.py
+# The benchmark suite writes comparable JSON reports and flags regressions past the threshold.
+import json
+
+from bench import SUITES, compare, run_suite, select
+from Simulator import EVENT_NAMES
+
+TINY = (
+    {"name": "tiny-scenario", "kind": "scenario", "n": 10, "Ttx": 10.0, "end_time": 100.0},
+    {"name": "tiny-handlers", "kind": "micro", "target": "handlers", "n": 20, "Ttx": 20.0, "end_time": 100.0,
+     "tx_gossip": "inv"},
+)
+
+
+def test_run_suite_writes_report(tmp_path):
+    out = tmp_path / "bench.json"
+    report = run_suite(TINY, out=str(out), log=None)
+    assert json.loads(out.read_text()) == json.loads(json.dumps(report))
+    scenario, handlers = report["results"]
+    assert scenario["events"] > 0 and scenario["events_per_sec"] > 0 and scenario["peak_rss_mb"] > 0
+    assert set(handlers["handlers"]) <= set(EVENT_NAMES) and "MINING_RACE" in handlers["handlers"]
+    assert all(h["calls"] > 0 for h in handlers["handlers"].values())
+    # a report against itself changes nothing
+    assert not any(row[5] for row in compare(report, report, threshold=0.0))
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    def report(eps, rss, us, params=None):
+        return {"results": [
+            {"name": "s", "kind": "scenario", "params": params or {"n": 10}, "events_per_sec": eps,
+             "wall_s": 1.0, "peak_rss_mb": rss},
+            {"name": "h", "kind": "micro", "params": {}, "handlers": {"TX_GEN": {"calls": 5, "us_per_call": us}},
+             "peak_rss_mb": rss},
+        ]}
+
+    base = report(1000.0, 100.0, 10.0)
+    rows = {(name, metric): regressed for name, metric, *_, regressed in
+            compare(base, report(800.0, 100.0, 9.0), threshold=0.1)}
+    assert rows[("s", "events_per_sec")] and not rows[("h", "TX_GEN.us_per_call")]
+    rows = {(name, metric): regressed for name, metric, *_, regressed in
+            compare(base, report(1200.0, 130.0, 12.0), threshold=0.1)}
+    assert not rows[("s", "events_per_sec")] and rows[("s", "peak_rss_mb")] and rows[("h", "TX_GEN.us_per_call")]
+    # a case whose parameters changed is not comparable
+    assert all(name != "s" for name, *_ in compare(base, report(1.0, 1.0, 1.0, params={"n": 20})))
+
+
+def test_suites_have_unique_names_and_select_filters():
+    for cases in SUITES.values():
+        names = [c["name"] for c in cases]
+        assert len(names) == len(set(names))
+    assert [c["name"] for c in select("full", ["peers-1*"])] == ["peers-10", "peers-100", "peers-1000",
+                                                                  "peers-10000", "peers-100000"]
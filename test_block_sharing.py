@@ -0,0 +1,57 @@
+# test_block_sharing.py
+# Blocks are shared by reference between peers instead of being deep-copied
+# on every hop; these checks make sure no handler can mutate a shared block.
+import random
+
+import networkx as nx
+import pytest
+
+from helper_classes import Block, Transaction
+from Simulator import Simulator
+
+
+def _fingerprint(block):
+    return (block.id, block.parent, block.miner, block.size,
+            tuple((tx.id, tx.origin, tx.receiver, tx.amount, tx.size) for tx in block.txns))
+
+
+def _small_sim(monkeypatch, engine="compact"):
+    monkeypatch.delenv("ONCHAIN", raising=False)
+    random.seed(11)
+    G = nx.random_regular_graph(3, 30, seed=3)
+    return Simulator(G, Ttx=5.0, I=12.0, engine=engine)
+
+
+def test_block_and_transaction_are_frozen():
+    tx = Transaction("tx0", 0, 1, 1)
+    blk = Block("blk0", "genesis", 0, [tx])
+    assert isinstance(blk.txns, tuple)
+    with pytest.raises(AttributeError):
+        blk.parent = "other"
+    with pytest.raises(AttributeError):
+        blk.txns = ()
+    with pytest.raises(AttributeError):
+        tx.amount = 100
+    with pytest.raises(AttributeError):
+        del tx.receiver
+
+
+@pytest.mark.parametrize("engine", ["legacy", "compact"])
+def test_handlers_share_blocks_without_mutating_them(monkeypatch, engine):
+    sim = _small_sim(monkeypatch, engine)
+    sim.run(end_time=40)
+
+    seen = {}
+    for peer in sim.peers.values():
+        for blk_id, blk in peer.block_tree.items():
+            if blk_id == "genesis":
+                continue
+            # every peer holds the very same object, never a copy
+            assert seen.setdefault(blk_id, blk) is blk
+    assert seen, "expected at least one mined block"
+    before = {blk_id: _fingerprint(blk) for blk_id, blk in seen.items()}
+
+    sim.run(end_time=80)
+
+    for blk_id, fp in before.items():
+        assert _fingerprint(seen[blk_id]) == fp
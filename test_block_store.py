@@ -0,0 +1,38 @@
+# test_block_store.py
+# One network-wide block store; peers keep compact views that still read like dicts.
+import math
+
+import pytest
+
+from helper_classes import Block, BlockStore, Peer
+
+
+def test_store_numbers_blocks_and_computes_heights():
+    store = BlockStore()
+    a = store.add(Block("a", "genesis", 0, []))
+    b = store.add(Block("b", "a", 1, []))
+    c = store.add(Block("c", "genesis", 2, []))
+    assert (a, b, c) == (1, 2, 3)
+    assert store.add(Block("b", "a", 1, [])) == b
+    assert list(store.parent) == [-1, 0, 1, 0]
+    assert dict(store.heights) == {"genesis": 0, "a": 1, "b": 2, "c": 1}
+    assert store["b"].miner == 1 and len(store) == 4
+
+
+def test_peer_views_are_read_only_and_sparse():
+    store = BlockStore()
+    for k in range(20):
+        store.add(Block(f"b{k}", "genesis" if k == 0 else f"b{k - 1}", 0, []))
+    peer = Peer(0, block_store=store)
+    assert peer.learn(store.index["b17"], 3.5)
+    assert not peer.learn(store.index["b17"], 9.0)
+    peer.current_tip = "b17"
+
+    assert peer.tip == store.index["b17"]
+    assert dict(peer.block_arrival) == {"genesis": 0.0, "b17": 3.5}
+    assert peer.heights["b17"] == 18
+    assert peer.block_tree["b17"] is store["b17"]
+    assert "b3" not in peer.block_tree and len(peer.block_tree) == 2
+    assert math.isnan(peer.arrival[store.index["b3"]])
+    with pytest.raises(TypeError):
+        peer.block_tree["b3"] = store["b3"]
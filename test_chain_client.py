@@ -0,0 +1,56 @@
+# test_chain_client.py
+# Local nonce/gas/chain-id caching and bulk operations, against eth-tester.
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("eth_tester")
+from web3 import EthereumTesterProvider, Web3
+
+from chain_client import ChainClient
+
+
+@pytest.fixture
+def chain():
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    keys = [k.to_hex() if hasattr(k, "to_hex") else str(k)
+            for k in provider.ethereum_tester.backend.account_keys[:4]]
+    return w3, w3.eth.accounts[:4], keys
+
+
+def test_nonce_manager_recovers_from_outside_transactions(chain):
+    w3, accounts, keys = chain
+    client = ChainClient(w3)
+    transfer = {"to": accounts[1], "value": 1, "gas": 21000}
+    assert client.send(accounts[0], keys[0], transfer).status == 1
+    # another sender uses the same account behind the client's back
+    w3.eth.send_transaction({"from": accounts[0], "to": accounts[1], "value": 1})
+    assert client.send(accounts[0], keys[0], transfer).status == 1
+    assert client.nonces.resyncs == 1
+    assert w3.eth.get_transaction_count(accounts[0]) == 3
+
+
+def test_gas_is_estimated_once_per_selector(chain):
+    w3, accounts, keys = chain
+    client = ChainClient(w3)
+    for data in ("0x12345678", "0x12345678aa", "0x12345678bb", "0xdeadbeef"):
+        client.send(accounts[0], keys[0], {"to": accounts[1], "value": 0, "data": data})
+    assert client.gas_estimates == 2
+
+
+def test_bulk_registration_and_reads(chain):
+    w3, accounts, keys = chain
+    artifact = json.loads((Path(__file__).parent / "abi" / "MiningWars.json").read_text())
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact({"from": accounts[0]}))
+    mw = w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+    client = ChainClient(w3)
+    jobs = [(accounts[i], keys[i], mw.functions.registerMiner()) for i in (1, 2, 3)]
+    jobs.append((accounts[1], keys[2], mw.functions.registerMiner()))   # wrong key
+    results = client.send_many(jobs)
+    assert [r.status for r in results[:3]] == [1, 1, 1]
+    assert isinstance(results[3], Exception)
+    assert client.call_many([mw.functions.registered(a) for a in accounts]) == [False, True, True, True]
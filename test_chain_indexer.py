@@ -0,0 +1,106 @@
+# test_chain_indexer.py
+# Event index vs. the contract's own views, incremental syncs and reorgs (eth-tester snapshots).
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("eth_tester")
+from web3 import EthereumTesterProvider, Web3
+
+from chain_indexer import ChainIndexer
+
+ABI_DIR = Path(__file__).resolve().parent / "abi"
+
+
+def _deploy(w3, name, sender, *args):
+    artifact = json.loads((ABI_DIR / f"{name}.json").read_text())
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor(*args).transact({"from": sender}))
+    return w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+
+@pytest.fixture
+def game():
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    owner, *miners = w3.eth.accounts[:5]
+    mw = _deploy(w3, "MiningWars", owner)
+    mt = _deploy(w3, "MiningToken", owner, mw.address)
+    for fn in (mw.functions.setToken(mt.address), mw.functions.setPerBlockReward(10),
+               mw.functions.setSeasonTime(1), mw.functions.startSeason(),
+               mw.functions.setSeasonPrizes(100, 50, 25)):
+        fn.transact({"from": owner})
+    for m in miners:
+        mw.functions.registerMiner().transact({"from": m})
+    return w3, provider.ethereum_tester, mw, mt, owner, miners
+
+
+def _mine(mw, miners, rounds):
+    for k in range(rounds):
+        for j, m in enumerate(miners):
+            mw.functions.submitBlock(1 + (k + j) % 4).transact({"from": m})
+
+
+def test_index_matches_contract_views(game, tmp_path):
+    w3, tester, mw, mt, owner, miners = game
+    _mine(mw, miners, 3)
+    tester.time_travel(w3.eth.get_block("latest").timestamp + 2 * 86400)
+    mw.functions.endSeasonAndDistribute().transact({"from": owner})
+    mw.functions.startSeason().transact({"from": owner})
+    _mine(mw, miners[:2], 2)
+
+    indexer = ChainIndexer(w3, mw, tmp_path / "index.sqlite", batch_blocks=4)
+    assert indexer.sync() > 0
+    assert indexer.block_count() == mw.functions.blockCounter().call()
+    for season in (1, 2):
+        board = indexer.leaderboard(season)
+        assert [score for _, score, _ in board] == sorted((score for _, score, _ in board), reverse=True)
+        for miner, score, _ in board:
+            assert score == mw.functions.seasonScore(season, Web3.to_checksum_address(miner)).call()
+    assert indexer.scores() == {m.lower(): mw.functions.getScore(m).call() for m in miners}
+
+    totals = indexer.reward_totals()
+    for m in miners:
+        assert sum(totals[m.lower()].values()) == mt.functions.balanceOf(m).call()
+    assert totals[miners[0].lower()]["PER_BLOCK"] == 10 * len(indexer.miner_history(miners[0]))
+    (s1, _, _, reward, winners), (s2, *_, none) = indexer.seasons()
+    assert (s1, s2, reward, none) == (1, 2, 10, None)
+    assert totals[winners[0]]["FIRST_WINNER"] == 100
+    assert [season for _, _, season, _, _ in indexer.miner_history(miners[0])] == [1, 1, 1, 2, 2]
+
+
+def test_sync_is_incremental_and_resumes_from_disk(game, tmp_path):
+    w3, tester, mw, mt, owner, miners = game
+    db = tmp_path / "index.sqlite"
+    _mine(mw, miners, 1)
+    indexer = ChainIndexer(w3, mw, db)
+    assert indexer.sync() == 2 * len(miners) + 1       # BlockMined + RewardPaid each, SeasonStarted
+    calls = indexer.get_logs_calls
+    assert indexer.sync() == 0 and indexer.get_logs_calls == calls
+    indexer.close()
+
+    _mine(mw, miners, 1)
+    reopened = ChainIndexer(w3, mw, db)
+    assert reopened.sync() == 2 * len(miners)
+    assert reopened.block_count() == 2 * len(miners)
+
+
+def test_reorg_drops_orphaned_events(game, tmp_path):
+    w3, tester, mw, mt, owner, miners = game
+    indexer = ChainIndexer(w3, mw, tmp_path / "index.sqlite", batch_blocks=3)
+    _mine(mw, miners[:1], 1)
+    indexer.sync()
+    fork = tester.take_snapshot()
+    _mine(mw, miners[1:], 2)
+    indexer.sync()
+    assert len(indexer.leaderboard(1)) == len(miners)
+
+    # a competing branch replaces everything after the snapshot, and is longer
+    tester.revert_to_snapshot(fork)
+    for _ in range(8):
+        mw.functions.submitBlock(7).transact({"from": miners[0]})
+    indexer.sync()
+    assert indexer.reorgs == 1
+    assert indexer.leaderboard(1) == [(miners[0].lower(), mw.functions.getScore(miners[0]).call(), 9)]
+    assert indexer.block_count() == mw.functions.blockCounter().call()
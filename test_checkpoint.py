@@ -0,0 +1,56 @@
+# test_checkpoint.py
+# A run resumed from a snapshot continues bit-identically to one that never stopped.
+import pytest
+
+from checkpoint import CHECKPOINT_VERSION, Checkpointer, load_checkpoint, read_header
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+
+CONFIGS = [dict(engine="compact", mining="per_peer"),
+           dict(engine="legacy", mining="race", tx_gossip="inv", propagation="analytic")]
+
+
+def _sim(**kwargs):
+    return Simulator(generate_p2p_topology(25, seed=7), Ttx=6.0, I=5.0, seed=12, chain_backend=False, **kwargs)
+
+
+def _state(sim):
+    blocks = [(b.id, b.parent, b.miner, [tx.id for tx in b.txns]) for b in sim.block_store.blocks]
+    peers = {pid: (p.tip, p.balance, dict(p.block_arrival), sorted(p.mempool), p.mining_gen)
+             for pid, p in sim.peers.items()}
+    queue = sorted((e[0], e[2], e[3]) if isinstance(e, tuple) else (e.time, e.type, e.peer)
+                   for e in sim.event_queue)
+    return (blocks, peers, dict(sim.ledger), dict(sim.confirmed_txs), sim.tx_counter, sim.events_processed,
+            sim.D, sim.recent_block_timestamps, sim.season_block_counter, dict(sim.season_scores),
+            sim.time, sim.logs, queue, sim.tx_relay_events)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_resumed_run_is_bit_identical(tmp_path, config):
+    straight = _sim(**config)
+    straight.run(end_time=400)
+
+    path = tmp_path / "run.ckpt"
+    ckpt = Checkpointer(path, every=70)
+    interrupted = _sim(**config)
+    ckpt.run(interrupted, end_time=150)            # "dies" after the snapshot taken near t=140
+    assert ckpt.saved == 2 and ckpt.stall_time > 0
+    header = read_header(path)
+    assert header["version"] == CHECKPOINT_VERSION and 140 <= header["time"] < 150
+
+    resumed = load_checkpoint(path)
+    assert resumed.time == header["time"]
+    resumed.run(end_time=400)
+    assert straight.block_counter > 20
+    assert _state(resumed) == _state(straight)
+    # and a branch from the same snapshot replays the same future
+    branch = load_checkpoint(path)
+    branch.run(end_time=400)
+    assert _state(branch) == _state(straight)
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.ckpt"
+    path.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        load_checkpoint(path)
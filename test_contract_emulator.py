@@ -0,0 +1,223 @@
+# test_contract_emulator.py
+# The in-memory MiningWars/MiningToken must agree with the compiled contracts:
+# the same random call sequence runs on an EVM (eth-tester's py-evm, or a
+# local anvil when installed) and on the emulator, comparing every outcome
+# and the contract state after each call.
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from contract_emulator import EmulatedChain, MiningTokenEmulator, MiningWarsEmulator
+
+ABI_DIR = Path(__file__).resolve().parent / "abi"
+GAS = 1_000_000
+
+
+def _artifact(name):
+    return json.loads((ABI_DIR / f"{name}.json").read_text())
+
+
+class EvmChain:
+    """Deployed contracts plus a way to pin the next block's timestamp."""
+
+    def __init__(self, w3, set_next_timestamp):
+        self.w3 = w3
+        self.set_next_timestamp = set_next_timestamp
+        self.accounts = w3.eth.accounts[:6]
+        owner = self.accounts[0]
+        mw, mt = _artifact("MiningWars"), _artifact("MiningToken")
+        receipt = self._deploy(mw, owner)
+        self.mw = w3.eth.contract(address=receipt.contractAddress, abi=mw["abi"])
+        receipt = self._deploy(mt, owner, self.mw.address)
+        self.mt = w3.eth.contract(address=receipt.contractAddress, abi=mt["abi"])
+
+    def _deploy(self, artifact, sender, *args):
+        factory = self.w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+        tx_hash = factory.constructor(*args).transact({"from": sender, "gas": 5_000_000})
+        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
+
+    def transact(self, sender, method, *args):
+        """Returns (status, revert message, block timestamp or None)."""
+        fn = getattr(self.mw.functions, method)(*args)
+        try:
+            fn.call({"from": sender})
+            message = ""
+        except Exception as e:
+            message = str(e)
+        try:
+            receipt = self.w3.eth.wait_for_transaction_receipt(fn.transact({"from": sender, "gas": GAS}))
+        except Exception as e:
+            return 0, message or str(e), None
+        stamp = self.w3.eth.get_block(receipt.blockNumber).timestamp
+        return receipt.status, message, stamp
+
+    def latest_timestamp(self):
+        return self.w3.eth.get_block("latest").timestamp
+
+
+def _eth_tester_chain():
+    pytest.importorskip("eth_tester")
+    from web3 import EthereumTesterProvider, Web3
+    provider = EthereumTesterProvider()
+    return EvmChain(Web3(provider), provider.ethereum_tester.time_travel), None
+
+
+def _anvil_chain():
+    if shutil.which("anvil") is None:
+        pytest.skip("anvil not installed")
+    from web3 import Web3
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(["anvil", "--port", str(port), "--silent"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    w3 = Web3(Web3.HTTPProvider(f"http://127.0.0.1:{port}"))
+    for _ in range(100):
+        if w3.is_connected():
+            break
+        time.sleep(0.1)
+    else:
+        proc.kill()
+        pytest.skip("anvil did not start")
+
+    def set_next_timestamp(ts):
+        w3.provider.make_request("evm_setNextBlockTimestamp", [ts])
+    return EvmChain(w3, set_next_timestamp), proc
+
+
+def _state(mw, mt, accounts, season):
+    """Comparable snapshot; mw/mt are (name -> value) getters."""
+    lower = [a.lower() for a in accounts]
+    fields = ("blockCounter", "currentSeason", "seasonStartTime", "seasonEndTime", "perBlockReward",
+              "currentSeasonPlayers", "pause", "firstPrize", "secondPrize", "thirdPrize",
+              "first", "second", "third", "rewardsToken", "owner")
+    snap = {f: mw(f) for f in fields}
+    for f in ("first", "second", "third", "rewardsToken", "owner"):
+        snap[f] = snap[f].lower()
+    snap["scores"] = [mw("getScore", a) for a in lower]
+    snap["registered"] = [mw("registered", a) for a in lower]
+    snap["season"] = [mw("seasonScore", season, a) for a in lower]
+    snap["balances"] = [mt("balanceOf", a) for a in lower]
+    snap["supply"] = mt("totalSupply")
+    return snap
+
+
+def _evm_state(evm, season):
+    from web3 import Web3
+
+    def getter(contract):
+        def get(name, *args):
+            args = [Web3.to_checksum_address(a) if isinstance(a, str) else a for a in args]
+            return getattr(contract.functions, name)(*args).call()
+        return get
+    return _state(getter(evm.mw), getter(evm.mt), evm.accounts, season)
+
+
+def _emu_state(mw, mt, accounts, season):
+    def get_mw(name, *args):
+        if name == "registered":
+            return mw.isRegistered(*args)
+        if name == "seasonScore":
+            return mw.getSeasonScore(*args)
+        attr = getattr(mw, name)
+        return attr(*args) if callable(attr) else attr
+
+    def get_mt(name, *args):
+        attr = getattr(mt, name)
+        return attr(*args) if callable(attr) else attr
+    return _state(get_mw, get_mt, accounts, season)
+
+
+def _random_call(rng, accounts):
+    owner = accounts[0] if rng.random() < 0.85 else rng.choice(accounts)
+    anyone = rng.choice(accounts)
+    return rng.choices([
+        (anyone, "registerMiner", ()),
+        (anyone, "submitBlock", (rng.choice([0, 1, 2, 3, 5, 8]),)),
+        (owner, "startSeason", ()),
+        (owner, "endSeasonAndDistribute", ()),
+        (owner, "setSeasonPrizes", (rng.randint(0, 900), rng.randint(0, 500), rng.randint(0, 100))),
+        (owner, "setPerBlockReward", (rng.randint(0, 20),)),
+        (owner, "setPause", (rng.random() < 0.3,)),
+        (owner, "setSeasonTime", (rng.choice([1, 2]),)),
+    ], weights=[3, 12, 2, 2, 1, 1, 1, 0.5])[0]
+
+
+@pytest.mark.parametrize("make_chain", [_eth_tester_chain, _anvil_chain], ids=["eth_tester", "anvil"])
+def test_emulator_matches_evm(make_chain):
+    evm, proc = make_chain()
+    try:
+        rng = random.Random(int(os.getenv("EMULATOR_DIFF_SEED", "7")))
+        accounts = evm.accounts
+        chain = EmulatedChain(timestamp=evm.latest_timestamp())
+        mw = chain.deploy(MiningWarsEmulator, accounts[0], address=evm.mw.address)
+        mt = chain.deploy(MiningTokenEmulator, accounts[0], mw.address, address=evm.mt.address)
+
+        now = evm.latest_timestamp() + 10
+        script = [(accounts[0], "setSeasonTime", (1,)), (accounts[0], "submitBlock", (1,)),
+                  (accounts[1], "registerMiner", ()), (accounts[1], "submitBlock", (1,)),
+                  (accounts[0], "startSeason", ()), (accounts[1], "submitBlock", (1,)),
+                  (accounts[0], "setToken", (evm.mt.address,)), (accounts[1], "submitBlock", (2,))]
+        script += [_random_call(rng, accounts) for _ in range(int(os.getenv("EMULATOR_DIFF_CALLS", "100")))]
+
+        outcomes = set()
+        for step, (sender, method, args) in enumerate(script, 1):
+            now += rng.choice([13, 600, 3 * 3600, 9 * 3600, 30 * 3600])
+            # stay clear of the season boundaries, where a second of drift flips the outcome
+            while min(abs(now - mw.seasonEndTime), abs(now - mw.seasonStartTime)) < 30:
+                now += 60
+            evm.set_next_timestamp(now)
+            status, message, stamp = evm.transact(sender, method, *args)
+            chain.timestamp = stamp if stamp is not None else now
+            receipt = chain.transact(sender, mw, method, *args)
+
+            where = f"{method}{args} from {sender}"
+            assert receipt.status == status, f"{where}: evm {status} ({message}) vs emulator {receipt}"
+            if not status and receipt.reason:
+                assert receipt.reason in message, where
+            outcomes.add((method, status))
+            now = max(now, stamp or now)
+            # full state comparisons are ~30 eth_calls each
+            if step % 10 == 0 or step == len(script):
+                assert _emu_state(mw, mt, accounts, mw.currentSeason) == _evm_state(evm, mw.currentSeason), where
+
+        # the sequence actually exercised both paths of the interesting calls
+        assert {("submitBlock", 1), ("submitBlock", 0), ("endSeasonAndDistribute", 1)} <= outcomes
+    finally:
+        if proc is not None:
+            proc.kill()
+
+
+def test_simulator_runs_with_emulated_contracts(monkeypatch):
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+
+    monkeypatch.delenv("ONCHAIN", raising=False)
+    random.seed(2)
+    sim = Simulator(generate_p2p_topology(30, seed=2), Ttx=50.0, engine="compact",
+                    chain_backend="emulator")
+    sim.run(end_time=600)
+    mw = sim.chain.miningwars
+    assert sim.block_counter > 0 and mw.blockCounter == sim.block_counter
+    miners = {sim.peer_accounts[pid]["addr"] for pid in sim.peers}
+    assert sum(sim.chain.get_score(a) for a in miners) == sum(d for _, _, d, _ in mw.blocks)
+    assert sum(sim.chain.balance_of(a) for a in miners) == 10 * sim.block_counter
+
+
+def test_chain_backend_requires_every_contract_call():
+    from chain_backend import ChainBackend, EmulatorBackend
+
+    class Partial(ChainBackend):
+        def register_miners(self, accounts):
+            return []
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial()
+    assert EmulatorBackend.__abstractmethods__ == frozenset()
@@ -0,0 +1,32 @@
+# test_engines.py
+# The compact tuple engine must replay the legacy Event engine exactly for the same seed.
+import pytest
+
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+
+
+def _state(sim):
+    blocks = [(b.id, b.parent, b.miner, [tx.id for tx in b.txns]) for b in sim.block_store.blocks]
+    peers = {pid: (p.tip, dict(p.block_arrival), sorted(p.mempool._pos)) for pid, p in sim.peers.items()}
+    return (blocks, peers, dict(sim.ledger), dict(sim.confirmed_txs), sim.canonical_tip, sim.tx_counter,
+            sim.reorg_count, sim.reinstated_txs, dict(sim.season_scores), sim.D, sim.time, sim.events_processed,
+            sim.gossip_stats(), sim.logs)
+
+
+@pytest.mark.parametrize("mining, propagation", [("per_peer", "flood"), ("race", "flood"), ("race", "analytic")])
+def test_compact_engine_replays_legacy_engine(mining, propagation, monkeypatch):
+    monkeypatch.setenv("SEASON_BLOCK_LENGTH", "10")
+    topology = generate_p2p_topology(30, seed=6)
+    runs = {}
+    for engine in ("legacy", "compact"):
+        sim = Simulator(topology, Ttx=10.0, I=1.5, engine=engine, mining=mining, propagation=propagation,
+                        seed=21, chain_backend=False)
+        sim.run(end_time=300)
+        assert sim.events_processed > 5_000 and sim.run_wall_time > 0
+        assert sim.events_per_sec == pytest.approx(sim.events_processed / sim.run_wall_time)
+        runs[engine] = sim
+    legacy, compact = runs["legacy"], runs["compact"]
+    # forks, reorgs and season ends all happened, identically
+    assert compact.reorg_count > 0 and len(compact.tracer.records("season")) > 0
+    assert _state(compact) == _state(legacy)
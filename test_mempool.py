@@ -0,0 +1,99 @@
+# test_mempool.py
+# Bounded, fee-ordered mempool and size-limited block templates.
+import random
+
+from helper_classes import Mempool, Transaction
+
+
+def _tx(i, fee, size=1024):
+    return Transaction(f"tx{i}", 0, 1, 1, size_bytes=size, fee=fee)
+
+
+def test_evicts_lowest_fee_rate_first():
+    pool = Mempool(max_count=3)
+    for i, fee in enumerate([5, 1, 9]):
+        assert pool.add(_tx(i, fee))
+    assert pool.add(_tx(3, 7))          # pushes out tx1 (fee 1)
+    assert "tx1" not in pool
+    assert not pool.add(_tx(4, 2))      # cheaper than everything left
+    assert sorted(pool) == ["tx0", "tx2", "tx3"]
+    assert pool.evictions == 2
+    assert pool.peak_count == 3
+
+
+def test_byte_cap_and_removal_keep_heap_consistent():
+    rng = random.Random(1)
+    pool = Mempool(max_bytes=50 * 1024)
+    live = {}
+    for i in range(2000):
+        tx = _tx(i, rng.randint(1, 100), size=rng.choice([256, 1024, 4096]))
+        if pool.add(tx):
+            live[tx.id] = tx
+        if rng.random() < 0.3 and len(pool):
+            victim = rng.choice(list(pool))
+            del pool[victim]
+        live = {k: v for k, v in live.items() if k in pool}
+        assert pool.bytes <= 50 * 1024
+        assert pool.bytes == sum(tx.size for tx in pool.values())
+    # root of the heap is the cheapest entry
+    rates = [tx.fee / tx.size for tx in pool.values()]
+    assert pool.values()[0].fee / pool.values()[0].size == min(rates)
+
+
+def test_template_respects_size_and_priority():
+    pool = Mempool()
+    for i, fee in enumerate([3, 8, 1, 8, 5]):
+        pool.add(_tx(i, fee))
+    chosen = pool.template(3 * 1024, exclude={"tx1"})
+    # tx1 is confirmed: skipped and dropped; tx3 (fee 8) first, then fee 5, fee 3
+    assert [tx.id for tx in chosen] == ["tx3", "tx4", "tx0"]
+    assert "tx1" not in pool
+
+
+def test_template_walk_matches_full_sort():
+    rng = random.Random(3)
+    pool = Mempool()
+    for i in range(500):
+        pool.add(_tx(i, rng.randint(0, 10), size=rng.choice([250, 1024, 4096])))
+    ranked = [tx for _, tx in sorted(pool._heap, key=lambda entry: entry[0], reverse=True)]
+    for max_bytes in (0, 3000, 50_000, 10**9):
+        room, expected = max_bytes, []
+        for tx in ranked:
+            if tx.size <= room:
+                expected.append(tx)
+                room -= tx.size
+        assert pool.template(max_bytes) == expected
+    assert pool.template() == ranked and len(pool) == 500
+
+
+def test_pools_only_hold_txs_not_seen_included():
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+
+    sim = Simulator(generate_p2p_topology(40, seed=5), Ttx=5.0, I=10.0, engine="compact", seed=3,
+                    chain_backend=False)
+    sim.run(end_time=600)
+    store, confirmed = sim.block_store, sim.confirmed_txs
+    assert sim.block_counter > 30 and len(confirmed) > 2000
+    unconfirmed = sim.tx_counter - len(confirmed)
+    for peer in sim.peers.values():
+        assert len(peer.mempool) <= unconfirmed + sum(len(store.blocks[i].txns) for i in range(len(store.blocks))
+                                                      if not peer.knows(i))
+        # a pooled tx that is confirmed sits in a block still on its way to this peer
+        assert all(not peer.knows(store.index[confirmed[tx_id]]) for tx_id in peer.mempool if tx_id in confirmed)
+
+
+def test_capped_pools_keep_live_txs():
+    from helper_functions import generate_p2p_topology
+    from Simulator import Simulator
+
+    sim = Simulator(generate_p2p_topology(40, seed=5), Ttx=5.0, I=10.0, engine="compact", seed=3,
+                    chain_backend=False, mempool_max_count=50)
+    sim.run(end_time=600)
+    confirmed, store = sim.confirmed_txs, sim.block_store
+    assert sim.mempool_stats()["evictions"] > 0
+    # caps are spent on txs still waiting for a block, so blocks keep confirming them
+    for peer in sim.peers.values():
+        assert len(peer.mempool) <= 50
+        assert all(not peer.knows(store.index[confirmed[tx_id]]) for tx_id in peer.mempool if tx_id in confirmed)
+    assert len(confirmed) > 0.3 * sim.tx_counter
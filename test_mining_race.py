@@ -0,0 +1,32 @@
+# test_mining_race.py
+# Network-wide mining race: Fenwick winner selection and block rate.
+import random
+
+import networkx as nx
+
+from helper_classes import FenwickTree
+from Simulator import Simulator
+
+
+def test_fenwick_find_and_update():
+    tree = FenwickTree([1.0, 0.0, 2.0, 3.0, 0.0])
+    assert tree.total == 6.0
+    assert [tree.find(x) for x in (0.0, 0.99, 1.0, 2.99, 3.0, 5.99)] == [0, 0, 2, 2, 3, 3]
+    tree.set(1, 4.0)
+    tree.add(3, -3.0)
+    assert tree.total == 7.0
+    assert [tree.find(x) for x in (0.5, 1.0, 4.99, 5.0, 6.99)] == [0, 1, 1, 2, 2]
+
+
+def test_race_mode_mines_at_target_rate(monkeypatch):
+    monkeypatch.delenv("ONCHAIN", raising=False)
+    random.seed(3)
+    G = nx.random_regular_graph(3, 30, seed=4)
+    sim = Simulator(G, Ttx=50.0, I=12.0, engine="compact", mining="race")
+    sim.run(end_time=1200)
+    assert 60 <= sim.block_counter <= 140
+    assert sim.stale_pops == 0
+    # weight changes go straight into the tree
+    sim.set_hash_power(0, 0.0)
+    assert sim.hash_tree.weights[0] == 0.0
+    assert sim.hash_tree.find(0.0) != 0
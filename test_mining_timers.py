@@ -0,0 +1,37 @@
+# test_mining_timers.py
+# Each peer keeps at most one live mining timer; superseded ones are dropped
+# when popped, and queue_stats reports the live heap and stale pops.
+from collections import Counter
+
+from helper_functions import generate_p2p_topology
+from Simulator import BLOCK_MINED, Simulator
+
+
+def test_one_live_timer_per_peer_and_bounded_heap():
+    n = 40
+    topology = generate_p2p_topology(n, seed=2)
+    # no txs: the heap holds mining timers, block relays and one idle TX_GEN per peer
+    sim = Simulator(topology, Ttx=0, I=5.0, engine="compact", mining="per_peer", seed=1, chain_backend=False)
+    links = int(topology.offsets[-1])
+    heap_sizes, live_sizes = [], []
+    for k in range(1, 21):
+        sim.run(end_time=k * 200.0)
+        mining = [ev for ev in sim.event_queue if ev[2] == BLOCK_MINED]
+        live = Counter(ev[3] for ev in mining if ev[4] == sim.peers[ev[3]].mining_gen)
+        assert max(live.values()) == 1
+        assert all(live[pid] == int(p.mining_pending) for pid, p in sim.peers.items())
+
+        stats = sim.queue_stats()
+        stale = len(mining) - sum(live.values())
+        assert stats["heap_size"] == len(sim.event_queue)
+        assert stats["live_heap_size"] == len(sim.event_queue) - stale
+        heap_sizes.append(stats["heap_size"])
+        live_sizes.append(stats["live_heap_size"])
+
+    assert sim.block_counter > 500
+    # tip changes superseded timers, and those were dropped as they came up
+    assert 0 < stats["stale_pops"] < stats["mining_pops"]
+    assert stats["stale_ratio"] == stats["stale_pops"] / stats["mining_pops"]
+    # neither the live heap nor the whole one grows with the length of the run
+    assert max(live_sizes) <= 2 * n + links
+    assert max(heap_sizes[10:]) <= 2 * max(heap_sizes[:10])
@@ -0,0 +1,49 @@
+# test_parallel_engine.py
+# Sharded race-mode runs must reproduce the sequential engine exactly; the partitioner keeps shards balanced.
+import numpy as np
+import pytest
+
+from helper_functions import edge_cut, generate_p2p_topology, partition_topology
+from parallel_engine import ParallelSimulator
+from Simulator import Simulator
+
+KWARGS = dict(seed=11, Ttx=5.0, I=10.0)
+
+
+def _state(sim):
+    blocks = [(b.id, b.parent, b.miner, [tx.id for tx in b.txns]) for b in sim.block_store.blocks]
+    peers = {pid: (p.tip, p.balance, dict(p.block_arrival)) for pid, p in sim.peers.items()}
+    return (blocks, peers, dict(sim.ledger), dict(sim.confirmed_txs), sim.canonical_tip, sim.tx_counter,
+            sim.reorg_count, sim.season_scores, sim.D, sim.time, sim.events_processed, sim.tx_relay_events)
+
+
+@pytest.mark.parametrize("workers, gossip", [(2, "flood"), (3, "flood"), (2, "inv")])
+def test_sharded_run_matches_sequential_engine(workers, gossip, monkeypatch):
+    # short seasons so season ends (replicated in every shard) happen too
+    monkeypatch.setenv("SEASON_BLOCK_LENGTH", "5")
+    topology = generate_p2p_topology(30, seed=5)
+    seq = Simulator(topology, mining="race", engine="compact", chain_backend=False, tx_gossip=gossip, **KWARGS)
+    seq.run(end_time=150)
+    assert seq.block_counter > 5 and seq.tx_counter > 0
+
+    with pytest.warns(UserWarning, match="experimental"):
+        par = ParallelSimulator(topology, workers=workers, tx_gossip=gossip, **KWARGS)
+    with par:
+        par.run(end_time=150)
+    assert par.workers == workers and par.windows > 0
+    assert _state(par) == _state(seq)
+
+
+def test_partition_is_balanced_and_cuts_fewer_links_than_random():
+    topology = generate_p2p_topology(600, seed=2)
+    owner = partition_topology(topology, 4)
+    sizes = np.bincount(owner, minlength=4)
+    assert sizes.sum() == 600 and sizes.max() <= np.ceil(150 * 1.03)
+    shuffled = np.random.default_rng(0).permutation(owner)
+    assert edge_cut(topology, owner) < edge_cut(topology, shuffled)
+
+
+@pytest.mark.parametrize("override", [dict(mining="per_peer"), dict(engine="legacy"), dict(chain_backend="emulator")])
+def test_fixed_simulator_arguments_are_rejected(override):
+    with pytest.raises(ValueError, match=next(iter(override))):
+        ParallelSimulator(generate_p2p_topology(10, seed=1), workers=2, **override)
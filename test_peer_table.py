@@ -0,0 +1,41 @@
+# test_peer_table.py
+# Peer state lives in NumPy columns; Peer objects and the ledger are views of them.
+import pickle
+
+import numpy as np
+
+from helper_classes import Peer, PeerTable
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+
+
+def test_credits_accumulate_and_peers_write_through():
+    table = PeerTable(4, is_high_cpu=[True, False, True, False], initial_balance=10)
+    table.credit([1, 3, 1], [5, 2, 1])
+    assert table.balance.tolist() == [10, 16, 10, 12]
+    assert table.total_hash_power == 6.0
+
+    peer = Peer(1, table=table)
+    assert (peer.balance, peer.hash_power, peer.is_high_cpu) == (16, 1.0, False)
+    peer.hash_power = 4.0
+    peer.tip = 7
+    assert table.hash_power[1] == 4.0 and table.tip[1] == 7
+    # a standalone peer keeps a one-row table of its own
+    alone = Peer(5, is_high_cpu=False, initial_balance=3)
+    assert (alone.id, alone.balance, alone.hash_power) == (5, 3, 1.0)
+    copy = pickle.loads(pickle.dumps(peer))
+    assert copy.balance == 16 and copy.tip == 7
+
+
+def test_simulator_ledger_is_the_balance_column():
+    sim = Simulator(generate_p2p_topology(20, seed=1), Ttx=2.0, I=5.0, engine="compact", seed=4,
+                    chain_backend=False)
+    sim.run(end_time=200)
+    table = sim.peer_table
+    assert sim.block_counter > 0
+    assert dict(sim.ledger) == {pid: p.balance for pid, p in sim.peers.items()}
+    assert sim.ledger == dict(enumerate(table.balance.tolist()))
+    assert sim.ledger.get(99) is None and 3 in sim.ledger
+    assert sum(sim.season_scores.values()) == sim.season_block_counter
+    assert [p.tip for p in sim.peers.values()] == table.tip.tolist()
+    assert np.isclose(table.total_hash_power, sum(p.hash_power for p in sim.peers.values()))
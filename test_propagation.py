@@ -0,0 +1,48 @@
+# test_propagation.py
+# Analytic propagation must reproduce hop-by-hop flood arrival times exactly.
+import random
+
+import networkx as nx
+
+from Simulator import Simulator
+
+
+def _arrivals(monkeypatch, propagation, **kwargs):
+    monkeypatch.delenv("ONCHAIN", raising=False)
+    random.seed(5)
+    G = nx.random_regular_graph(4, 40, seed=2)
+    sim = Simulator(G, Ttx=8.0, I=12.0, engine="compact", propagation=propagation, **kwargs)
+    sim.run(end_time=400)
+    return sim, {(pid, blk): t for pid, peer in sim.peers.items()
+                 for blk, t in peer.block_arrival.items()}
+
+
+def test_analytic_matches_flood(monkeypatch):
+    flood_sim, flood = _arrivals(monkeypatch, "flood")
+    # a tiny LRU forces rows to be evicted and recomputed during the run
+    sim, analytic = _arrivals(monkeypatch, "analytic", arrival_cache_rows=4)
+    assert flood_sim.block_counter > 5
+    assert analytic == flood
+    assert len(sim.arrival_table._rows) <= 4
+    assert sim.arrival_table.misses > 4
+
+
+def test_runs_sharing_a_topology_do_not_disturb_each_other():
+    import numpy as np
+
+    from helper_functions import generate_p2p_topology
+
+    topology = generate_p2p_topology(30, seed=3)
+    base = topology.delay.copy()
+    kwargs = dict(Ttx=8.0, I=12.0, engine="compact", fast_frac=0.5, chain_backend=False)
+    first = Simulator(topology, seed=1, **kwargs)
+    # another run with other slow peers, built before the first one runs
+    other = Simulator(topology, seed=2, **kwargs)
+    assert not np.array_equal(first.topology.delay, other.topology.delay)
+    first.run(end_time=300)
+    alone = Simulator(topology, seed=1, **kwargs)
+    alone.run(end_time=300)
+    assert first.block_counter > 5
+    assert [dict(p.block_arrival) for p in first.peers.values()] == \
+        [dict(p.block_arrival) for p in alone.peers.values()]
+    assert np.array_equal(topology.delay, base)
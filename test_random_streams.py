@@ -0,0 +1,64 @@
+# test_random_streams.py
+# Per-simulator random streams: bit-reproducible runs, chunking-independent variates, O(1) receiver picks.
+import pickle
+
+import numpy as np
+
+from helper_classes import RandomStreams
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+
+
+def _run(seed, **kwargs):
+    sim = Simulator(generate_p2p_topology(25, seed=3), Ttx=30.0, engine="compact", seed=seed,
+                    chain_backend=False, **kwargs)
+    sim.run(end_time=300)
+    arrivals = {pid: dict(p.block_arrival) for pid, p in sim.peers.items()}
+    return sim, (arrivals, dict(sim.ledger), sim.tx_counter, sim.canonical_tip)
+
+
+def test_runs_are_bit_reproducible_from_the_seed():
+    sim, first = _run(9)
+    assert sim.block_counter > 0 and sim.tx_counter > 0
+    assert _run(9)[1] == first
+    assert _run(10)[1] != first
+
+
+def test_variates_do_not_depend_on_chunk_size():
+    small, large = RandomStreams(4, chunk=7), RandomStreams(4, chunk=5000)
+    for make, stream in (("exponential", "mining"), ("uniform", "race")):
+        a, b = getattr(small, make)(stream), getattr(large, make)(stream)
+        assert [a() for _ in range(50)] == [b() for _ in range(50)]
+
+
+def test_keyed_variates_depend_only_on_key_and_draw_number():
+    a = RandomStreams(4).keyed_uniform("tx", np.zeros(50, dtype=np.int64))
+    b = RandomStreams(4, chunk=9).keyed_uniform("tx", np.zeros(50, dtype=np.int64), chunk=3)
+    # 40 draws per key cross a's block boundary and many of b's
+    forward = [a(i) for i in range(50) for _ in range(40)]
+    # another interleaving, another block size and vectorised draws give the same values
+    first = b.take(np.arange(50))
+    rest = {i: [b(i) for _ in range(20)] for i in reversed(range(50))}
+    again = b.take(np.arange(49, -1, -1))[::-1]
+    rest = {i: [*rest[i], again[i], *(b(i) for _ in range(18))] for i in range(50)}
+    assert forward == [v for i in range(50) for v in [first[i], *rest[i]]]
+    # counters count computed values: whole blocks
+    assert a.counters.tolist() == [64] * 50 and b.counters.tolist() == [42] * 50
+    assert len(set(forward)) == 2000 and all(0.0 <= u < 1.0 for u in forward)
+    assert RandomStreams(5).keyed_uniform("tx", np.zeros(1, dtype=np.int64))(0) != forward[0]
+    # a pickled stream carries on mid-block
+    copy = pickle.loads(pickle.dumps(a))
+    assert [copy(7) for _ in range(30)] == [a(7) for _ in range(30)]
+    # roughly uniform
+    u = RandomStreams(1).keyed_uniform("tx", np.zeros(20_000, dtype=np.int64)).take(np.arange(20_000))
+    assert abs(u.mean() - 0.5) < 0.01 and np.histogram(u, 10, (0, 1))[0].min() > 1800
+
+
+def test_receivers_are_other_peers_chosen_uniformly():
+    sim = Simulator(generate_p2p_topology(12, seed=1), Ttx=5.0, engine="compact", seed=1, chain_backend=False)
+    sim.run(end_time=300)
+    txs = {tx.id: tx for blk in sim.block_store.blocks for tx in blk.txns}
+    assert len(txs) > 300
+    assert all(tx.receiver != tx.origin and 0 <= tx.receiver < 12 for tx in txs.values())
+    counts = np.bincount([tx.receiver for tx in txs.values()], minlength=12)
+    assert counts.min() > 0.5 * counts.mean()
@@ -1,4 +1,5 @@
 # scripts/test_read.py
+import os
 from web3_client import w3, miningwars, miningtoken, call_view
 print("chain id:", w3.eth.chain_id)
 print("latest block:", w3.eth.block_number)
@@ -10,3 +11,14 @@ try:
     print(call_view(miningtoken.functions.minter()))
 except Exception:
     print("minter() not present")
+
+# bulk history comes from the local event index, not getAllBlocks()
+from chain_indexer import ChainIndexer
+indexer = ChainIndexer(w3, miningwars, os.getenv("INDEX_DB", "miningwars_index.sqlite"),
+                       start_block=int(os.getenv("INDEX_START_BLOCK", "0")))
+print("indexed events:", indexer.sync(), "up to block", indexer.last_block)
+season = call_view(miningwars.functions.currentSeason())
+print(f"season {season} leaderboard:")
+for miner, score, blocks in indexer.leaderboard(season):
+    print(f"  {miner} score={score} blocks={blocks}")
+print("reward totals:", indexer.reward_totals())
@@ -0,0 +1,62 @@
+# test_reorg.py
+# A reorg takes the abandoned branch's txs out of the confirmed index and hands
+# them back to mempools, from where they are mined again.
+import networkx as nx
+import pytest
+
+from helper_classes import Transaction
+from Simulator import Simulator
+
+
+@pytest.mark.parametrize("engine", ["compact", "legacy"])
+def test_reorg_reinstates_orphaned_txs(monkeypatch, engine):
+    monkeypatch.delenv("ONCHAIN", raising=False)
+    G = nx.Graph([(0, 1)])
+    # no tx generation and mining timers far beyond the test: blocks are mined by hand
+    sim = Simulator(G, Ttx=0, I=1e9, engine=engine, mining="race", seed=3, chain_backend=False)
+    a, b = sim.peers[0], sim.peers[1]
+    tx_a = Transaction("txA", 0, 1, 1, fee=5)
+    tx_b = Transaction("txB", 1, 0, 1, fee=5)
+    a.mempool.add(tx_a)
+    b.mempool.add(tx_b)
+
+    # peers 0 and 1 mine competing blocks at height 1 before hearing of each other's
+    reward = sim.block_reward
+    sim._mine_block(a, 1.0)
+    sim._mine_block(b, 1.0)
+    orphan_id = sim.block_store.blocks[1].id
+    assert sim.confirmed_txs == {"txA": orphan_id} and sim.reorg_count == 0
+    # receivers are paid by canonical blocks only: txA yes, txB (on the fork) not yet
+    assert (sim.ledger[0], sim.ledger[1]) == (100 + reward, 100 + reward + 1)
+    # peer 1 extends its own branch: peer 0's block is orphaned
+    sim._mine_block(b, 1.0)
+    assert sim.reorg_count == 1 and sim.reinstated_txs == 1
+    assert "txA" not in sim.confirmed_txs and sim.confirmed_txs["txB"] == sim.block_store.blocks[2].id
+    # txA's payout is taken back, txB's made
+    assert (sim.ledger[0], sim.ledger[1]) == (100 + reward + 1, 100 + 2 * reward)
+
+    sim.run(end_time=5.0)
+    assert "txA" in a.mempool and "txA" in b.mempool
+    assert sim.peers[0].tip == sim.canonical_index
+    # handing txA back to peer 0 is not gossip; peer 0 relaying it to peer 1 is
+    assert sim.tx_relay_events == 1 and sim.tx_deliveries == 1 and sim.tx_dup_deliveries == 0
+
+    sim._mine_block(a, 6.0)
+    assert sim.confirmed_txs["txA"] == sim.block_store.blocks[-1].id
+    assert sim.block_store.height[sim.canonical_index] == 3
+    # mined twice, paid once
+    assert (sim.ledger[0], sim.ledger[1]) == (100 + 2 * reward + 1, 100 + 2 * reward + 1)
+
+
+def test_ledger_total_follows_the_canonical_chain(monkeypatch):
+    from helper_functions import generate_p2p_topology
+
+    monkeypatch.setenv("SEASON_BLOCK_LENGTH", str(10 ** 9))
+    sim = Simulator(generate_p2p_topology(30, seed=6), Ttx=10.0, I=1.5, engine="compact", seed=21,
+                    chain_backend=False)
+    sim.run(end_time=300)
+    assert sim.reorg_count > 0 and sim.reinstated_txs > 0
+    # every block pays its miner; a tx has left its sender and reached its
+    # receiver only while it is confirmed (all txs move 1 coin)
+    in_flight = sim.tx_counter - len(sim.confirmed_txs)
+    assert sum(sim.ledger.values()) == 100 * 30 + sim.block_reward * sim.block_counter - in_flight
@@ -0,0 +1,56 @@
+# test_retarget.py
+# Difficulty moves against the observed block rate and brings block intervals back to I.
+import pytest
+
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+
+
+def _sim(**kwargs):
+    return Simulator(generate_p2p_topology(20, seed=4), Ttx=0, I=10.0, engine="compact", seed=2,
+                     chain_backend=False, **kwargs)
+
+
+@pytest.mark.parametrize("interval, factor", [(5.0, 2.0), (8.0, 1.25), (12.5, 0.8), (40.0, 0.5)])
+def test_retarget_scales_d_by_target_over_observed_interval(interval, factor):
+    sim = _sim()
+    d = sim.D
+    sim.recent_block_timestamps = [k * interval for k in range(sim.retarget_interval - 1)]
+    assert not sim._retarget(100.0)
+    sim.recent_block_timestamps.append((sim.retarget_interval - 1) * interval)
+    assert sim._retarget(100.0)
+    assert sim.D == pytest.approx(d * factor)
+    # the window restarts at the last timestamp instead of sliding
+    assert sim.recent_block_timestamps == [(sim.retarget_interval - 1) * interval]
+
+
+@pytest.mark.parametrize("mining", ["race", "per_peer"])
+def test_difficulty_follows_hash_power_back_to_target_interval(mining):
+    sim = _sim(mining=mining)
+    sim.run(end_time=2000)
+    for scale in (4.0, 0.25):
+        d, start, blocks = sim.D, sim.time, sim.block_counter
+        for pid, peer in sim.peers.items():
+            sim.set_hash_power(pid, peer.hash_power * scale)
+        sim.run(end_time=start + 3000)
+        # more hash power: blocks come faster, so D goes up (and down again after)
+        retargets = [r for r in sim.tracer.records("retarget") if r.time > start]
+        assert (sim.D > d) == (scale > 1)
+        # intervals are back near I once D caught up
+        settled = [r.time for r in retargets[2:]]
+        mean_interval = (settled[-1] - settled[0]) / ((len(settled) - 1) * (sim.retarget_interval - 1))
+        assert 0.7 * sim.I < mean_interval < 1.4 * sim.I
+        assert sim.block_counter - blocks > 100
+
+
+@pytest.mark.parametrize("mistune", [8.0, 0.125])
+def test_mistuned_difficulty_settles_instead_of_running_away(mistune):
+    # scaling D by observed / I (the original rule) feeds back: slow blocks
+    # raise D further and fast ones lower it, so D runs away from either side
+    sim = _sim()
+    sim.D *= mistune
+    sim._reset_mining_timers(0.0)
+    sim.run(end_time=1500)
+    blocks = sim.block_counter
+    sim.run(end_time=4500)
+    assert 0.8 * 300 < sim.block_counter - blocks < 1.25 * 300
@@ -0,0 +1,41 @@
+# test_startup.py
+# The pure-simulation path must import and run offline, without the web3 or
+# plotting stacks, within an import-time budget (python -X importtime).
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+IMPORT_BUDGET_MS = float(os.getenv("SIM_IMPORT_BUDGET_MS", "1000"))
+HEAVY = ("web3", "eth_account", "matplotlib", "networkx")
+
+SCRIPT = """
+import sys
+import Simulator
+from helper_functions import generate_p2p_topology
+loaded = [m for m in {heavy!r} if m in sys.modules]
+sim = Simulator.Simulator(generate_p2p_topology(20, seed=1), engine="compact")
+sim.run(end_time=60)
+print(",".join(loaded) or "-", sim.block_counter)
+"""
+
+
+def test_offline_import_and_run_within_budget():
+    env = dict(os.environ, ONCHAIN="", RPC_URL="http://127.0.0.1:9")   # nothing listens there
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", SCRIPT.format(heavy=HEAVY)],
+                          cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    loaded, blocks = proc.stdout.split()[-2:]
+    assert loaded == "-", f"heavy modules imported on the simulation path: {loaded}"
+    assert int(blocks) > 0
+
+    # "import time: self [us] | cumulative | name" lines; the top-level entry for Simulator
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cum, name = line[len("import time:"):].split("|")
+            if not name.startswith(" " * 2) and cum.strip().isdigit():
+                cumulative[name.strip()] = int(cum)
+    assert cumulative["Simulator"] / 1000 < IMPORT_BUDGET_MS
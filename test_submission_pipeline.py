@@ -0,0 +1,103 @@
+# test_submission_pipeline.py
+# Background on-chain sender, exercised against eth-tester's in-process chain
+# (and a scripted client for receipts that never come).
+import time
+from types import SimpleNamespace
+
+import pytest
+from web3 import EthereumTesterProvider, Web3
+
+from submission_pipeline import SubmissionPipeline
+
+
+@pytest.fixture
+def chain():
+    pytest.importorskip("eth_tester")
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    keys = [k.to_hex() if hasattr(k, "to_hex") else str(k)
+            for k in provider.ethereum_tester.backend.account_keys[:3]]
+    return w3, w3.eth.accounts[:3], keys
+
+
+def _transfer(to, wei):
+    return {"to": to, "value": wei, "gas": 21000}
+
+
+def test_sends_in_order_per_account_and_collects_receipts(chain):
+    w3, accounts, keys = chain
+    logs = []
+    pipe = SubmissionPipeline(w3, log=logs.append, poll_interval=0.01)
+    start = {a: w3.eth.get_transaction_count(a) for a in accounts[:2]}
+    for i in range(10):
+        sender = i % 2
+        assert pipe.submit(accounts[sender], keys[sender], _transfer(accounts[2], i + 1), label=f"pay{i}")
+    assert pipe.close(timeout=30)
+
+    stats = pipe.stats()
+    assert stats["confirmed"] == 10 and stats["failed"] == 0 and stats["pending"] == 0
+    assert len(logs) == 10 and all(msg.endswith("onchain tx status: 1") for msg in logs)
+    # nonces were assigned locally in submission order
+    for sender in (0, 1):
+        assert w3.eth.get_transaction_count(accounts[sender]) == start[accounts[sender]] + 5
+
+
+def test_failures_are_logged_not_raised(chain):
+    w3, accounts, keys = chain
+    logs = []
+    pipe = SubmissionPipeline(w3, log=logs.append, poll_interval=0.01)
+    # key does not match the sender: the node rejects the signed tx
+    pipe.submit(accounts[0], keys[1], _transfer(accounts[2], 1), label="bad")
+    pipe.submit(accounts[1], keys[1], _transfer(accounts[2], 1), label="good")
+    assert pipe.close(timeout=30)
+    assert pipe.failed == 1 and pipe.confirmed == 1
+    assert any(msg.startswith("bad onchain failed") for msg in logs)
+
+
+@pytest.mark.parametrize("policy", ["drop", "coalesce"])
+def test_backpressure_when_queue_is_full(chain, policy):
+    w3, accounts, keys = chain
+    pipe = SubmissionPipeline(w3, maxsize=1, policy=policy, log=lambda msg: None, poll_interval=0.01)
+    # holding the lock keeps the sender from draining the queue meanwhile
+    with pipe._cond:
+        assert pipe.submit(accounts[0], keys[0], _transfer(accounts[2], 1), key="k")
+        accepted = pipe.submit(accounts[0], keys[0], _transfer(accounts[2], 2), key="k")
+        assert len(pipe._queue) == 1
+    assert pipe.close(timeout=30)
+    if policy == "drop":
+        assert not accepted and pipe.dropped == 1
+    else:
+        assert accepted and pipe.coalesced == 1
+    assert pipe.confirmed == 1
+
+
+class _LossyClient:
+    """Sends instantly; every hash gets a receipt except the lost ones."""
+
+    def __init__(self, lost):
+        self.lost = set(lost)
+
+    def send(self, addr, pk, call, wait_receipt=True):
+        return call["nonce"]
+
+    def receipts(self, tx_hashes):
+        return [None if h in self.lost else SimpleNamespace(status=1) for h in tx_hashes]
+
+
+def test_lost_txs_time_out_without_starving_the_rest():
+    client = _LossyClient(lost={0, 1})
+    logs = []
+    pipe = SubmissionPipeline(None, client=client, log=logs.append, receipt_batch=2, poll_interval=0.01,
+                              receipt_timeout=0.5)
+    account = "0x" + "11" * 20
+    # hold the sender back until everything is queued: the lost txs fill the first receipt batch
+    with pipe._cond:
+        for nonce in range(6):
+            pipe.submit(account, None, {"nonce": nonce}, label=f"tx{nonce}")
+    started = time.monotonic()
+    assert pipe.flush(timeout=0.3) is False and pipe.pending_labels() == ["tx0", "tx1"]
+    assert pipe.confirmed == 4
+    assert pipe.close(timeout=10)
+    assert 0.5 <= time.monotonic() - started < 10
+    assert pipe.failed == 2 and pipe.pending() == 0
+    assert any(msg.startswith("tx0 onchain receipt failed: no receipt") for msg in logs)
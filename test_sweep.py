@@ -0,0 +1,64 @@
+# test_sweep.py
+# Seeded runs are reproducible; sweeps stream rows, resume and reuse the summary cache,
+# which a change to the simulator source invalidates.
+import csv
+
+import sweep
+from sweep import config_key, expand_grid, load_results, replicate_seed, run_config, run_sweep
+
+GRID = {"n": 12, "min_deg": 2, "max_deg": 4, "Ttx": 60.0, "I": [6.0, 12.0], "engine": "compact",
+        "end_time": 400.0}
+
+
+def _without_timing(summary):
+    return {k: v for k, v in summary.items() if k != "wall_time"}
+
+
+def test_seeded_runs_are_reproducible():
+    config = dict(expand_grid(GRID)[0], seed=replicate_seed(0, 0))
+    first = _without_timing(run_config(config))
+    assert first["blocks_mined"] > 0
+    assert _without_timing(run_config(config)) == first
+    assert _without_timing(run_config(dict(config, seed=replicate_seed(0, 1)))) != first
+
+
+def test_sweep_resumes_and_reuses_cache(tmp_path):
+    out, cache = tmp_path / "results.csv", tmp_path / "cache"
+    assert run_sweep(GRID, replicates=2, out=out, cache_dir=cache, workers=2) == 4
+    with out.open() as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4 and {r["I"] for r in rows} == {"6.0", "12.0"}
+
+    # finished rows are skipped on restart
+    assert run_sweep(GRID, replicates=3, out=out, cache_dir=cache, workers=2) == 2
+    assert len(load_results(out)["key"]) == 6
+
+    # a fresh results file is refilled from the cache without simulating
+    again = tmp_path / "again.csv"
+    assert run_sweep(GRID, replicates=3, out=again, cache_dir=cache) == 0
+    a, b = load_results(out), load_results(again)
+    order_a, order_b = a["key"].argsort(), b["key"].argsort()
+    assert (a["orphan_rate"][order_a] == b["orphan_rate"][order_b]).all()
+
+
+def test_source_changes_invalidate_cached_summaries(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "Sim.py").write_text("D = 1\n")
+    (tmp_path / "pkg" / "part.py").write_text("x = 1\n")
+    (tmp_path / "pkg" / "notes.txt").write_text("ignored")
+    sources = ("Sim.py", "pkg")
+    before = sweep.source_hash(tmp_path, sources)
+    (tmp_path / "pkg" / "notes.txt").write_text("still ignored")
+    assert sweep.source_hash(tmp_path, sources) == before
+    (tmp_path / "pkg" / "part.py").write_text("x = 2\n")
+    after = sweep.source_hash(tmp_path, sources)
+    assert after != before
+
+    # the same config gets another key once the source differs
+    config = dict(expand_grid(GRID)[0], seed=1)
+    monkeypatch.setattr(sweep, "_current_source", lambda: before)
+    old = config_key(config)
+    monkeypatch.setattr(sweep, "_current_source", lambda: after)
+    assert config_key(config) != old
+    # and every simulator module is covered
+    assert {"Simulator.py", "helper_classes", "helper_functions"} <= set(sweep.SOURCES)
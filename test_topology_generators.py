@@ -0,0 +1,38 @@
+# test_topology_generators.py
+# Generated graphs must be simple, connected and within the degree bounds.
+import numpy as np
+import pytest
+
+from helper_functions import generate_p2p_edges, generate_p2p_topology, generate_random_p2p_graph
+from helper_functions.topology_generators import FAMILIES, connected_components
+
+
+@pytest.mark.parametrize("family", FAMILIES)
+@pytest.mark.parametrize("n,min_deg,max_deg", [(3, 2, 2), (5, 1, 2), (10, 2, 2), (60, 3, 8), (500, 2, 4)])
+def test_connected_bounded_simple(family, n, min_deg, max_deg):
+    for seed in range(10):
+        src, dst = generate_p2p_edges(n, family, min_deg, max_deg, seed=seed)
+        deg = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+        assert deg.min() >= min(min_deg, n - 1)
+        assert deg.max() <= max_deg
+        assert (src != dst).all()
+        keys = np.minimum(src, dst) * n + np.maximum(src, dst)
+        assert np.unique(keys).size == keys.size
+        assert (connected_components(n, src, dst) == 0).all()
+
+
+def test_seeded_generation_is_reproducible():
+    a = generate_p2p_topology(1000, "scale_free", 2, 12, seed=42)
+    b = generate_p2p_topology(1000, "scale_free", 2, 12, seed=42)
+    assert np.array_equal(a.offsets, b.offsets)
+    assert np.array_equal(a.neighbors, b.neighbors)
+    assert np.array_equal(a.base_delay, b.base_delay)
+
+
+def test_networkx_wrapper_keeps_its_contract():
+    import networkx as nx
+
+    G = generate_random_p2p_graph(min_peers=20, max_peers=30, min_deg=1, max_deg=2, seed=7)
+    assert 20 <= G.number_of_nodes() <= 30
+    assert nx.is_connected(G)
+    assert all(1 <= d <= 2 for _, d in G.degree())
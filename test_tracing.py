@@ -0,0 +1,71 @@
+# test_tracing.py
+# Structured trace: bounded ring, chunked JSONL file, null sink, per-category channels, list-like Simulator.logs.
+import pickle
+
+import pytest
+
+from helper_functions import generate_p2p_topology
+from Simulator import Simulator
+from tracing import JsonlSink, NullSink, RingSink, Tracer, format_record, read_jsonl
+
+
+def _sim(tracer, **kwargs):
+    # I=3 on 40 peers retargets and ends a season within 400 s
+    sim = Simulator(generate_p2p_topology(40, seed=2), Ttx=30.0, I=3.0, engine="compact", seed=6,
+                    chain_backend=False, tracer=tracer, **kwargs)
+    sim.run(end_time=400)
+    return sim
+
+
+def test_ring_keeps_the_latest_records_and_logs_stay_compatible(capsys):
+    ring = RingSink(capacity=5)
+    sim = _sim(Tracer(ring, categories=("retarget", "season", "block")))
+    blocks = [r for r in ring.records() if r[0] == "block"]
+    assert len(ring.records()) == 5 and ring.dropped == ring.emitted - 5
+    assert ring.emitted > sim.block_counter                  # one block record each, plus retargets
+    assert blocks and blocks[-1][2] == sim.block_store.blocks[-1].miner
+    assert sim.logs == [format_record(r) for r in ring.records()]
+    # seasons are traced, not printed
+    assert "SEASON END" not in capsys.readouterr().out
+
+    default = _sim(None)
+    assert any(line.startswith("Retarget: D ") for line in default.logs)
+    assert any(line.startswith("[SEASON END] block_counter=") for line in default.logs)
+
+
+def test_jsonl_sink_writes_in_chunks(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    sink = JsonlSink(path, buffer_records=64)
+    sim = _sim(Tracer(sink, categories="all"))
+    assert sink.written % 64 == 0 and len(sink.records()) < 64
+    sim.tracer.close()
+    records = read_jsonl(path)
+    assert len(records) == sink.written >= sim.block_counter
+    assert {r.category for r in records} >= {"block", "retarget", "season"}
+    mined = [r for r in records if r.category == "block"]
+    assert [r.block for r in mined] == [b.id for b in sim.block_store.blocks[1:]]
+
+
+def test_disabled_categories_have_no_channel():
+    tracer = Tracer(NullSink(), categories=("season",))
+    assert tracer.channel("block") is None and tracer.channel("season") is not None
+    sim = _sim(tracer)
+    assert sim._trace_block is None and sim.logs == []
+    with pytest.raises(ValueError):
+        Tracer(categories=("blocks",))
+
+
+def test_logs_still_take_appends_and_assignment():
+    sim = _sim(None)
+    lines = list(sim.logs)
+    assert lines and sim.logs == lines and len(sim.logs) == len(lines)
+    sim.logs.append("note from a caller")
+    assert sim.logs[-1] == "note from a caller" and sim.tracer.records("log")[-1].time == sim.time
+    sim.logs = []
+    assert sim.logs == [] and len(sim.logs) == 0
+    sim.logs = ["a", "b"]
+    assert list(sim.logs) == ["a", "b"] and "b" in sim.logs
+    sim.run(end_time=800)
+    assert sim.logs[:2] == ["a", "b"] and len(sim.logs) > 2
+    # checkpoints and worker pipes carry the lines, not the tracer
+    assert pickle.loads(pickle.dumps(sim.logs)) == list(sim.logs)
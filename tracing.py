@@ -0,0 +1,280 @@
+# tracing.py
+#
+# Structured simulation trace with pluggable sinks:
+#
+#   sim = Simulator(G, tracer=Tracer(JsonlSink("run.jsonl"), categories="all"))
+#   sim.run(3600)
+#   sim.tracer.close()
+#
+# A record is the plain tuple (category, time, peer, block id, values dict);
+# it is only turned into text or JSON when a sink writes it out or a reader
+# asks for it (format_record, Simulator.logs). Emitters hold one channel per
+# category, which is None when the category is disabled, so a disabled
+# category costs a single `if` at the call site and builds nothing.
+#
+# Sinks implement emit, records, flush, clear (forget the records they
+# hold; files keep what they wrote) and close.
+import json
+import sys
+import threading
+from collections import deque, namedtuple
+
+# record categories and how each one reads as text
+FORMATS = {
+    "retarget": "Retarget: D {old:.3f} -> {new:.3f} (factor {factor:.3f})",
+    "season": "[SEASON END] block_counter={block_counter}, winners={winners}",
+    "onchain": "{msg}",
+    "block": "t={time:.3f} block {block} mined by peer {peer} (height {height}, {txs} txs)",
+    "reorg": "t={time:.3f} reorg to {block}: {depth} blocks abandoned, {reinstated} txs reinstated",
+    "log": "{msg}",
+}
+CATEGORIES = tuple(FORMATS)
+# what Simulator.logs used to collect, plus lines callers append to it
+DEFAULT_CATEGORIES = ("retarget", "season", "onchain", "log")
+
+TraceRecord = namedtuple("TraceRecord", "category time peer block values")
+
+
+def format_record(record):
+    """One record as the log line it stands for."""
+    category, time, peer, block, values = record
+    return FORMATS[category].format(time=time, peer=peer, block=block, **(values or {}))
+
+
+def record_to_dict(record):
+    category, time, peer, block, values = record
+    return {"category": category, "time": time, "peer": peer, "block": block, "values": values or {}}
+
+
+class RingSink:
+    """Keeps the most recent capacity records in memory."""
+
+    def __init__(self, capacity=10_000):
+        self.buffer = deque(maxlen=capacity)
+        self.emitted = 0
+
+    def emit(self, record):
+        self.buffer.append(record)
+        self.emitted += 1
+
+    def records(self):
+        return list(self.buffer)
+
+    @property
+    def dropped(self):
+        """Records pushed out of the ring by newer ones."""
+        return self.emitted - len(self.buffer)
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        self.buffer.clear()
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """
+    Appends records to path as JSON lines. Records are buffered as tuples
+    and serialised buffer_records at a time, so the file is written in
+    large chunks; flush() (or close()) writes out the rest.
+    """
+
+    def __init__(self, path, buffer_records=4096):
+        self.path = path
+        self.buffer_records = buffer_records
+        self._buf = []
+        self._lock = threading.Lock()   # on-chain statuses come from a sender thread
+        self._file = open(path, "a", encoding="utf-8")
+        self.written = 0
+
+    def emit(self, record):
+        with self._lock:
+            self._buf.append(record)
+            if len(self._buf) >= self.buffer_records:
+                self._write()
+
+    def _write(self):
+        buf, self._buf = self._buf, []
+        if buf:
+            self._file.write("".join(json.dumps(record_to_dict(r), default=str) + "\n" for r in buf))
+            self.written += len(buf)
+
+    def __getstate__(self):
+        # checkpoints: everything so far goes to the file, which is reopened for appending
+        self.flush()
+        return {"path": self.path, "buffer_records": self.buffer_records, "written": self.written}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["buffer_records"])
+        self.written = state["written"]
+
+    def records(self):
+        """Records not written out yet (the file holds the rest; see read_jsonl)."""
+        return list(self._buf)
+
+    def flush(self):
+        with self._lock:
+            self._write()
+            self._file.flush()
+
+    def clear(self):
+        # held records are the unwritten ones: they go to the file
+        self.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class StreamSink:
+    """Formats every record and writes it to stream (stdout by default), like the old prints."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, record):
+        print(format_record(record), file=self.stream or sys.stdout)
+
+    def records(self):
+        return []
+
+    def flush(self):
+        (self.stream or sys.stdout).flush()
+
+    def clear(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class NullSink:
+    """Discards everything."""
+
+    def emit(self, record):
+        pass
+
+    def records(self):
+        return []
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Channel:
+    """Emitter for one enabled category: channel(t, peer, block, values)."""
+    __slots__ = ("category", "sink")
+
+    def __init__(self, category, sink):
+        self.category = category
+        self.sink = sink
+
+    def __call__(self, t, peer=None, block=None, values=None):
+        self.sink.emit((self.category, t, peer, block, values))
+
+
+class Tracer:
+    """
+    Routes records of the enabled categories to one sink. categories is an
+    iterable of names from CATEGORIES, or "all".
+    """
+
+    def __init__(self, sink=None, categories=DEFAULT_CATEGORIES):
+        self.sink = sink if sink is not None else RingSink()
+        categories = CATEGORIES if categories == "all" else tuple(categories)
+        unknown = set(categories) - set(CATEGORIES)
+        if unknown:
+            raise ValueError(f"unknown trace categories {sorted(unknown)}, expected some of {CATEGORIES}")
+        self.categories = frozenset(categories)
+
+    def channel(self, category):
+        """Emitter for category, or None when it is disabled."""
+        if category not in FORMATS:
+            raise ValueError(f"unknown trace category {category!r}, expected one of {CATEGORIES}")
+        return _Channel(category, self.sink) if category in self.categories else None
+
+    def records(self, category=None):
+        """Records the sink still holds, as TraceRecords (optionally one category only)."""
+        return [TraceRecord._make(r) for r in self.sink.records() if category is None or r[0] == category]
+
+    def lines(self, category=None):
+        """The same records, formatted."""
+        return [format_record(r) for r in self.records(category)]
+
+    def log(self, t, msg):
+        """Trace a free-text line (category "log") if that category is enabled."""
+        if "log" in self.categories:
+            self.sink.emit(("log", t, None, None, {"msg": msg}))
+
+    def flush(self):
+        self.sink.flush()
+
+    def clear(self):
+        """Forget the records the sink holds."""
+        self.sink.clear()
+
+    def close(self):
+        self.sink.close()
+
+
+class TraceLog:
+    """
+    List-like stand-in for the log list Simulator.logs used to be. Reads
+    see the formatted records the tracer's sink still holds; append(line)
+    traces line as a "log" record at clock(), and clear() forgets the held
+    records. Compares equal to the list of lines and pickles as one.
+    """
+
+    def __init__(self, tracer, clock):
+        self.tracer = tracer
+        self.clock = clock
+
+    def append(self, line):
+        self.tracer.log(self.clock(), line)
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def clear(self):
+        self.tracer.clear()
+
+    def __iter__(self):
+        return iter(self.tracer.lines())
+
+    def __len__(self):
+        return len(self.tracer.sink.records())
+
+    def __getitem__(self, i):
+        return self.tracer.lines()[i]
+
+    def __contains__(self, line):
+        return line in self.tracer.lines()
+
+    def __eq__(self, other):
+        if isinstance(other, TraceLog):
+            other = list(other)
+        return self.tracer.lines() == other if isinstance(other, list) else NotImplemented
+
+    def __repr__(self):
+        return repr(self.tracer.lines())
+
+    def __reduce__(self):
+        return (list, (self.tracer.lines(),))
+
+
+def read_jsonl(path):
+    """TraceRecords back from a JsonlSink file."""
+    with open(path, encoding="utf-8") as f:
+        return [TraceRecord(d["category"], d["time"], d["peer"], d["block"], d["values"])
+                for d in map(json.loads, f)]
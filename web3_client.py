@@ -1,9 +1,11 @@
 # web3_client.py
+#
+# Nothing here connects or imports web3 at import time: w3, the contracts
+# and the shared client are created on first access (module __getattr__),
+# so the simulator imports and runs offline unless on-chain calls are made.
 import os, json
 from pathlib import Path
 from dotenv import load_dotenv
-from web3 import Web3
-from eth_account import Account
 
 load_dotenv()   # loads .env in project root
 
@@ -11,50 +13,71 @@ RPC = os.getenv("RPC_URL", "http://127.0.0.1:8545")
 MW_ADDR = os.getenv("MININGWARS_ADDRESS")
 MT_ADDR = os.getenv("MININGTOKEN_ADDRESS")
 
-w3 = Web3(Web3.HTTPProvider(RPC))
-assert w3.is_connected(), "Cannot connect to RPC"
+# ABIs produced by forge build / forge inspect, next to this file
+ABI_DIR = Path(__file__).resolve().parent / "abi"
+MW_ABI_PATH = ABI_DIR / "MiningWars.json"
+MT_ABI_PATH = ABI_DIR / "MiningToken.json"
 
-# load ABIs produced by forge build / forge inspect
-MW_ABI_PATH = Path("abi/MiningWars.json")
-MT_ABI_PATH = Path("abi/MiningToken.json")
+_lazy = {}
 
-MW_ARTIFACT = json.loads(MW_ABI_PATH.read_text())
-MT_ARTIFACT = json.loads(MT_ABI_PATH.read_text())
+def _load_abi(path):
+    return json.loads(path.read_text())["abi"]
 
-MW_ABI = MW_ARTIFACT["abi"]
-MT_ABI = MT_ARTIFACT["abi"]
+def _connect():
+    from web3 import Web3
+    w3 = Web3(Web3.HTTPProvider(RPC))
+    assert w3.is_connected(), "Cannot connect to RPC"
+    return w3
 
-miningwars = w3.eth.contract(address=Web3.to_checksum_address(MW_ADDR), abi=MW_ABI)
-miningtoken = w3.eth.contract(address=Web3.to_checksum_address(MT_ADDR), abi=MT_ABI)
+def _contract(addr, abi_path):
+    from web3 import Web3
+    return __getattr__("w3").eth.contract(address=Web3.to_checksum_address(addr), abi=_load_abi(abi_path))
 
-def send_signed_tx(sender_addr: str, sender_pk: str, tx_dict: dict, wait_receipt=True):
+def _client():
+    from chain_client import ChainClient
+    w3 = __getattr__("w3")
+    # shared client: local nonces, cached chain id / gas price / per-selector gas
+    return ChainClient(w3, gas_price=w3.to_wei("1", "gwei"))
+
+_FACTORIES = {
+    "w3": _connect,
+    "MW_ABI": lambda: _load_abi(MW_ABI_PATH),
+    "MT_ABI": lambda: _load_abi(MT_ABI_PATH),
+    "miningwars": lambda: _contract(MW_ADDR, MW_ABI_PATH),
+    "miningtoken": lambda: _contract(MT_ADDR, MT_ABI_PATH),
+    "client": _client,
+}
+
+def __getattr__(name):
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _lazy:
+        _lazy[name] = factory()
+    return _lazy[name]
+
+def send_signed_tx(sender_addr: str, sender_pk: str, tx_dict, wait_receipt=True):
     """
-    Signs and sends a transaction dict (built via contract_fn.build_transaction()).
+    Signs and sends a transaction: a tx dict (e.g. from contract_fn.build_transaction())
+    or the contract function itself, which skips build_transaction's own lookups.
     Returns receipt if wait_receipt is True, else tx_hash.
     """
-    sender = Web3.to_checksum_address(sender_addr)
-    # ensure nonce
-    tx_dict.setdefault("nonce", w3.eth.get_transaction_count(sender))
-    # estimate or default gas
-    if "gas" not in tx_dict:
-        try:
-            tx_dict["gas"] = w3.eth.estimate_gas(tx_dict)
-        except Exception:
-            tx_dict["gas"] = 300000
-    # set gasPrice when not using EIP-1559 fields
-    if "maxFeePerGas" not in tx_dict and "gasPrice" not in tx_dict:
-        tx_dict["gasPrice"] = w3.to_wei("1", "gwei")
-
-    signed = w3.eth.account.sign_transaction(tx_dict, private_key=sender_pk)
-    # signed.raw_transaction (web3.py v6) -> use this for sending
-    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-    if wait_receipt:
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        return receipt
-    return tx_hash
+    return __getattr__("client").send(sender_addr, sender_pk, tx_dict, wait_receipt=wait_receipt)
+
+def register_miners(accounts):
+    """
+    registerMiner for every (addr, pk) in one JSON-RPC batch.
+    Returns a receipt (or the exception raised) per account, in order.
+    """
+    miningwars = __getattr__("miningwars")
+    return __getattr__("client").send_many([(addr, pk, miningwars.functions.registerMiner()) for addr, pk in accounts])
+
+def read_scores(addrs):
+    """getScore for every address in one JSON-RPC batch."""
+    from web3 import Web3
+    miningwars = __getattr__("miningwars")
+    return __getattr__("client").call_many([miningwars.functions.getScore(Web3.to_checksum_address(a)) for a in addrs])
 
 def call_view(fn_call):
     """Call a read-only function: pass contract.functions.foo(...)"""
     return fn_call.call()
-
-print("done")
\ No newline at end of file